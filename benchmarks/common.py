@@ -0,0 +1,81 @@
+""" Helpers shared by the benchmarks: the repository path, latency summaries and JSON results.
+"""
+
+import dataclasses
+import datetime
+import json
+import pathlib
+import platform
+import subprocess
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class LatencySummary:
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @classmethod
+    def of(cls, seconds: Sequence[float]) -> "LatencySummary":
+        if len(seconds) == 0:
+            return cls(count=0, mean_ms=0.0, p50_ms=0.0, p99_ms=0.0, max_ms=0.0)
+
+        ms = np.asarray(seconds, dtype=np.float64) * 1000
+        return cls(
+            count=len(ms),
+            mean_ms=float(ms.mean()),
+            p50_ms=float(np.percentile(ms, 50)),
+            p99_ms=float(np.percentile(ms, 99)),
+            max_ms=float(ms.max()),
+        )
+
+
+def get_revision() -> Optional[str]:
+    """ Returns the commit the benchmarks are run at, so results of commits can be compared.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+def write_results(benchmark: str, results: Any, output: Optional[pathlib.Path]) -> None:
+    """ Writes the results with the revision and the platform to the file or to stdout.
+    """
+    document = {
+        "benchmark": benchmark,
+        "revision": get_revision(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": _to_json(results),
+    }
+
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if output is None:
+        print(text)
+    else:
+        output.write_text(text + "\n", encoding="utf-8")
+
+
+def _to_json(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: _to_json(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+
+    return value
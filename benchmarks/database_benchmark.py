@@ -0,0 +1,229 @@
+""" Measures a words database on synthetic vocabularies, see `synthetic_vocabulary.py`.
+
+Every case (a vocabulary size, a storage and a words index) is run in a fresh
+interpreter, so memory of one case does not leak into another. A case measures:
+- load time without the index cache (cold) and with it (warm);
+- memory allocated by a loaded database and the peak of its loading;
+- p50/p99 latencies of `get_similar_words` and `get_similar_forms` for misspelled queries;
+- throughput of `update_word_form` and `delete_word_form`.
+
+Query results are not cached, so every query is computed.
+
+Usage (from the repository root): python -m benchmarks.database_benchmark [--sizes 10000 100000 1000000] [--output results.json]
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import pathlib
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, TypeVar
+
+from benchmarks.common import ROOT, LatencySummary, write_results
+from benchmarks.synthetic_vocabulary import VocabularySpec, generate_rows, open_storage, write_storage
+from engine.core import databases
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+_T = TypeVar("_T")
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class Case:
+    forms: int
+    storage: str
+    words_index: str
+    queries: int
+    count: int
+    writes: int
+    seed: int
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class CaseResult:
+    case: Case
+    words: int
+    generate_s: float
+    load_cold_s: float
+    load_warm_s: float
+    memory_mb: float
+    memory_peak_mb: float
+    similar_words: LatencySummary
+    similar_forms: LatencySummary
+    updates_per_s: float
+    deletes_per_s: float
+
+
+def run_case(case: Case, directory: pathlib.Path) -> CaseResult:
+    path = directory / f"vocabulary-{case.forms}.{'sqlite' if case.storage == 'sqlite' else 'tsv'}"
+
+    started = time.perf_counter()
+    rows = generate_rows(VocabularySpec(forms=case.forms, seed=case.seed))
+    write_storage(rows, case.storage, path)
+    generate_s = time.perf_counter() - started
+
+    load_cold_s, _ = _timed(lambda: _open_database(case, path, index_cache=False))
+    _open_database(case, path, index_cache=True)  # builds the index cache
+    load_warm_s, _ = _timed(lambda: _open_database(case, path, index_cache=True))
+    memory_mb, memory_peak_mb = _measure_memory(lambda: _open_database(case, path, index_cache=False))
+
+    database = _open_database(case, path, index_cache=True)
+    draws = random.Random(case.seed)
+    queries = [draws.choice(rows) for _ in range(case.queries)]
+
+    similar_words = [
+        _timed(lambda: list(database.get_similar_words(_misspell(draws, word), case.count)))[0]
+        for word, _, _ in queries
+    ]
+    similar_forms = [
+        _timed(lambda: list(database.get_similar_forms(word, _misspell(draws, form), case.count)))[0]
+        for word, form, _ in queries
+    ]
+
+    # new forms of known words, so a write changes forms of a word rather than creating one
+    written = [
+        WordFormInfo(word=word, form=f"{form}~{i}", description="benchmark")
+        for i, (word, form, _) in enumerate(draws.choice(rows) for _ in range(case.writes))
+    ]
+    updates_s, _ = _timed(lambda: [database.update_word_form(info) for info in written])
+    deletes_s, _ = _timed(lambda: [database.delete_word_form(info.word, info.form) for info in written])
+
+    return CaseResult(
+        case=case,
+        words=len({word for word, _, _ in rows}),
+        generate_s=generate_s,
+        load_cold_s=load_cold_s,
+        load_warm_s=load_warm_s,
+        memory_mb=memory_mb,
+        memory_peak_mb=memory_peak_mb,
+        similar_words=LatencySummary.of(similar_words),
+        similar_forms=LatencySummary.of(similar_forms),
+        updates_per_s=len(written) / updates_s if updates_s > 0 else 0.0,
+        deletes_per_s=len(written) / deletes_s if deletes_s > 0 else 0.0,
+    )
+
+
+def _open_database(case: Case, path: pathlib.Path, *, index_cache: bool) -> databases.WordsDatabase:
+    return databases.WordsDatabase(
+        storage=open_storage(case.storage, path),
+        options=databases.WordsDatabaseOptions(
+            words_index=databases.WordsIndexKind(case.words_index),
+            index_cache=index_cache,
+            query_cache_size=0,
+        ),
+    )
+
+
+def _timed(action: Callable[[], _T]) -> tuple[float, _T]:
+    started = time.perf_counter()
+    result = action()
+    return time.perf_counter() - started, result
+
+
+def _measure_memory(action: Callable[[], Any]) -> tuple[float, float]:
+    """ Returns megabytes held by the result of the action and the peak of its run.
+
+    NOTE: tracing slows allocations down, so it is never mixed with timings.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = action()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return current / 2**20, peak / 2**20
+
+
+def _misspell(draws: random.Random, text: str) -> str:
+    """ Makes a typo: replaces, inserts or deletes a letter of the text.
+    """
+    if len(text) == 0:
+        return text
+
+    at = draws.randrange(len(text))
+    letter = draws.choice(text)
+    match draws.randrange(3):
+        case 0:
+            return text[:at] + letter + text[at + 1:]
+        case 1:
+            return text[:at] + letter + text[at:]
+        case _:
+            return text[:at] + text[at + 1:]
+
+
+def _run_isolated(case: Case) -> CaseResult:
+    """ Runs the case in a fresh interpreter; returns its result.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.database_benchmark", "--case", json.dumps(dataclasses.asdict(case))],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"case {case} has failed:\n{result.stderr}")
+
+    fields = json.loads(result.stdout)
+    return CaseResult(**{
+        **fields,
+        "case": case,
+        "similar_words": LatencySummary(**fields["similar_words"]),
+        "similar_forms": LatencySummary(**fields["similar_forms"]),
+    })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="forms of vocabularies")
+    parser.add_argument("--storages", nargs="+", choices=["csv", "journal", "sqlite"], default=["csv", "sqlite"])
+    parser.add_argument("--indexes", nargs="+", choices=[x.value for x in databases.WordsIndexKind], default=["scan"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--count", type=int, default=20, help="variants of a query")
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=pathlib.Path, help="a JSON file; results are printed if it is omitted")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        with tempfile.TemporaryDirectory(prefix="words-benchmark-") as directory:
+            result = run_case(Case(**json.loads(args.case)), pathlib.Path(directory))
+
+        fields = dataclasses.asdict(result)
+        del fields["case"]
+        print(json.dumps(fields))
+        return 0
+
+    results: list[CaseResult] = []
+    for forms in args.sizes:
+        for storage in args.storages:
+            for words_index in args.indexes:
+                case = Case(
+                    forms=forms, storage=storage, words_index=words_index,
+                    queries=args.queries, count=args.count, writes=args.writes, seed=args.seed,
+                )
+                result = _run_isolated(case)
+                results.append(result)
+                print(
+                    f"{forms:>9} {storage:7} {words_index:15}"
+                    f" load {result.load_cold_s:7.2f}s/{result.load_warm_s:.2f}s"
+                    f" mem {result.memory_mb:7.1f}MB"
+                    f" words p50/p99 {result.similar_words.p50_ms:.1f}/{result.similar_words.p99_ms:.1f}ms"
+                    f" forms p50/p99 {result.similar_forms.p50_ms:.2f}/{result.similar_forms.p99_ms:.2f}ms"
+                    f" writes {result.updates_per_s:.0f}/{result.deletes_per_s:.0f} op/s",
+                    file=sys.stderr,
+                )
+
+    write_results("database", results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
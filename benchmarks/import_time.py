@@ -0,0 +1,90 @@
+""" Guards import time of the engine entry points against regressions.
+
+Every entry point is imported in a fresh interpreter with `python -X importtime`;
+its cumulative import time must fit the budget and it must not load modules that
+belong to other entry points (e.g. pandas for headless queries).
+
+Usage (from the repository root): python -m benchmarks.import_time [--runs N] [--scale X]
+"""
+
+import argparse
+import dataclasses
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+WIDGETS = ("IPython", "ipywidgets")
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class EntryPoint:
+    module: str
+    budget_ms: float
+    forbidden: tuple[str, ...]
+
+
+ENTRY_POINTS = [
+    EntryPoint(module="engine", budget_ms=25, forbidden=("numpy", "pandas", *WIDGETS)),
+    EntryPoint(module="engine.engine", budget_ms=250, forbidden=("pandas", *WIDGETS)),
+    EntryPoint(module="engine.core.databases.headless", budget_ms=500, forbidden=("pandas", *WIDGETS)),
+    EntryPoint(module="engine.core.databases.database", budget_ms=1200, forbidden=WIDGETS),
+]
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """ Returns cumulative import time of the module in milliseconds and all modules it has imported.
+    """
+    code = f"import sys; sys.path.insert(0, {str(ROOT)!r}); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+
+    imported: set[str] = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+
+    return total_us / 1000, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="the best of the runs is compared with the budget")
+    parser.add_argument("--scale", type=float, default=1.0, help="a multiplier of budgets for slower machines")
+    args = parser.parse_args()
+
+    failed = False
+    for entry in ENTRY_POINTS:
+        runs = [measure(entry.module) for _ in range(args.runs)]
+        best_ms = min(elapsed for elapsed, _ in runs)
+        budget_ms = entry.budget_ms * args.scale
+        leaked = sorted({
+            name.split(".")[0]
+            for _, imported in runs
+            for name in imported
+            if name.split(".")[0] in entry.forbidden
+        })
+
+        ok = best_ms <= budget_ms and len(leaked) == 0
+        failed = failed or not ok
+        print(
+            f"{'ok' if ok else 'FAIL':4} {entry.module:40} {best_ms:8.1f} ms / {budget_ms:.0f} ms"
+            + (f", loads {', '.join(leaked)}" if leaked else "")
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
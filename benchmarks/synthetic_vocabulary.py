@@ -0,0 +1,147 @@
+""" Generates synthetic vocabularies of a given number of word forms.
+
+Words are random stems of Latin (with diacritics), Cyrillic and Greek letters; the
+number of forms per word follows a Zipf distribution, so most words have a couple
+of forms and a few have dozens, as in inflected languages. Forms share the stem
+of their word and differ by suffixes. The same seed gives the same vocabulary.
+
+Usage (from the repository root): python -m benchmarks.synthetic_vocabulary FORMS PATH [--storage {csv,journal,sqlite}] [--seed N]
+"""
+
+import argparse
+import dataclasses
+import pathlib
+import random
+import sys
+
+import numpy as np
+
+from engine.core import databases
+
+# a vocabulary row: (word, form, description)
+Row = tuple[str, str, str]
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class Script:
+    name: str
+    letters: str
+    weight: float
+
+
+SCRIPTS = [
+    Script(name="latin", letters="abcdefghijklmnopqrstuvwxyzáàâäçéèêëíîïñóôöúùûüøåæœß", weight=0.5),
+    Script(name="cyrillic", letters="абвгдеёжзийклмнопрстуфхцчшщъыьэюя", weight=0.35),
+    Script(name="greek", letters="αβγδεζηθικλμνξοπρςστυφχψωάέήίόύώ", weight=0.15),
+]
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class VocabularySpec:
+    forms: int
+    seed: int = 0
+    zipf_exponent: float = 1.8  # forms per word; the lower it is, the longer the tail
+    max_forms: int = 64  # forms of a single word
+    stem_lengths: tuple[int, int] = (3, 10)  # inclusive
+    suffixes: int = 96  # distinct suffixes of a script
+
+
+def generate_rows(spec: VocabularySpec) -> list[Row]:
+    """ Returns `spec.forms` distinct (word, form, description) rows grouped by words.
+    """
+    assert spec.forms >= 0 and spec.max_forms <= spec.suffixes
+    rng = np.random.default_rng(spec.seed)
+    # per-word draws are small, which the stdlib generator makes much faster than numpy
+    draws = random.Random(spec.seed)
+
+    suffixes = {
+        script.name: _make_suffixes(draws, script, spec.suffixes)
+        for script in SCRIPTS
+    }
+    weights = np.array([script.weight for script in SCRIPTS])
+
+    rows: list[Row] = []
+    words: set[str] = set()
+    while len(rows) < spec.forms:
+        # words are drawn by chunks, as a vectorized draw is much cheaper than a per-word one
+        chunk = max(16, (spec.forms - len(rows)) // 2)
+        counts = np.minimum(rng.zipf(spec.zipf_exponent, size=chunk), spec.max_forms)
+        scripts = rng.choice(len(SCRIPTS), size=chunk, p=weights / weights.sum())
+        lengths = rng.integers(spec.stem_lengths[0], spec.stem_lengths[1] + 1, size=chunk)
+
+        for count, script_id, length in zip(counts.tolist(), scripts.tolist(), lengths.tolist()):
+            script = SCRIPTS[script_id]
+            stem = "".join(draws.choices(script.letters, k=length))
+            pool = suffixes[script.name]
+
+            # the first suffix makes the word itself, so every word is one of its forms
+            chosen = draws.sample(pool, count)
+            word = stem + chosen[0]
+            if word in words:
+                continue
+            words.add(word)
+
+            for suffix in chosen[:spec.forms - len(rows)]:
+                rows.append((word, stem + suffix, f"{script.name} form {len(rows)}"))
+
+            if len(rows) >= spec.forms:
+                break
+
+    return rows
+
+
+def write_storage(rows: list[Row], storage: str, path: pathlib.Path) -> "databases.storages.StorageBase":
+    """ Replaces the database at the path with the rows; returns its storage.
+    """
+    import pandas as pd
+
+    # files derived from the database, such as an index cache or a SQLite journal, are stale too
+    for stale in [path, *path.parent.glob(path.name + ".*"), *path.parent.glob(path.name + "-*")]:
+        stale.unlink(missing_ok=True)
+
+    fields = databases.WordsDatabase.Fields
+    dump = pd.DataFrame(rows, columns=[fields.WORD, fields.FORM, fields.DESCRIPTION])
+
+    target = open_storage(storage, path)
+    target.save_dump(dump)
+    return target
+
+
+def open_storage(storage: str, path: pathlib.Path) -> "databases.storages.StorageBase":
+    storages = databases.storages
+    match storage:
+        case "csv":
+            return storages.CSVStorage(options=storages.CSVStorageOptions(path=path))
+        case "journal":
+            return storages.JournalStorage(options=storages.JournalStorageOptions(path=path))
+        case "sqlite":
+            return storages.SQLiteStorage(options=storages.SQLiteStorageOptions(path=path))
+        case _:
+            raise ValueError(f"unknown storage '{storage}'")
+
+
+def _make_suffixes(draws: random.Random, script: Script, count: int) -> list[str]:
+    # an empty suffix stands for a bare stem
+    suffixes = {""}
+    while len(suffixes) < count:
+        suffixes.add("".join(draws.choices(script.letters, k=draws.randint(1, 4))))
+
+    return sorted(suffixes)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("forms", type=int)
+    parser.add_argument("path", type=pathlib.Path)
+    parser.add_argument("--storage", choices=["csv", "journal", "sqlite"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = generate_rows(VocabularySpec(forms=args.forms, seed=args.seed))
+    write_storage(rows, args.storage, args.path)
+    print(f"{len(rows)} forms of {len({word for word, _, _ in rows})} words are written to '{args.path}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+""" Replays keystroke sessions through a headless `WordInputForm`.
+
+The form is built without a notebook frontend and driven through its widgets as a
+frontend would: a keystroke assigns a new value to a text field, a click presses a
+button. Without a running event loop suggestions are searched inline, so the time
+of a keystroke includes its search and the update of the suggestion list.
+
+A session file is a JSON document:
+    {"sessions": [{"name": "...", "events": [{"field": "word", "key": "a"}, ...]}]}
+where a key is a character to type, "<backspace>", "<clear>", "<submit>", "<delete>"
+or "<select:N>" that picks the N-th suggestion. Sessions are generated from the
+vocabulary if no file is given; `--record` saves them for later runs.
+
+Usage (from the repository root): python -m benchmarks.typing_replay [--forms 100000] [--sessions FILE | --record FILE] [--output results.json]
+"""
+
+import argparse
+import collections
+import dataclasses
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Iterator
+
+from benchmarks.common import LatencySummary, write_results
+from benchmarks.synthetic_vocabulary import Row, VocabularySpec, generate_rows, open_storage, write_storage
+from engine.core import databases
+
+BACKSPACE = "<backspace>"
+CLEAR = "<clear>"
+SUBMIT = "<submit>"
+DELETE = "<delete>"
+SELECT = "<select:{}>"
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class KeystrokeEvent:
+    key: str
+    field: str = "word"  # word, form or description; only typed keys use it
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class TypingSession:
+    name: str
+    events: list[KeystrokeEvent]
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class ReplayResult:
+    forms: int
+    storage: str
+    sessions: int
+    events: int
+    keystrokes: LatencySummary
+    latencies_by_key: dict[str, LatencySummary]
+    options_updates: int
+    options_bytes: int  # JSON size of the suggestion lists sent to the frontend
+
+
+class FormDriver:
+    """ Finds widgets of a word input form and acts on them as a frontend does.
+    """
+
+    def __init__(self, form: Any) -> None:
+        from ipywidgets import widgets
+
+        found = list(self.__walk(form.get_widget()))
+        self.__fields = {
+            widget.description.removesuffix(":").lower(): widget
+            for widget in found
+            if isinstance(widget, widgets.Text)
+        }
+        self.__buttons = {
+            widget.description.split()[0]: widget
+            for widget in found
+            if isinstance(widget, widgets.Button)
+        }
+        (self.__suggestions,) = [widget for widget in found if isinstance(widget, widgets.Select)]
+
+        self.options_updates = 0
+        self.options_bytes = 0
+        self.__suggestions.observe(self.__on_options_changed, names="options")
+
+    def apply(self, event: KeystrokeEvent) -> None:
+        if event.key == SUBMIT:
+            self.__buttons["submit"].click()
+        elif event.key == DELETE:
+            self.__buttons["delete"].click()
+        elif event.key.startswith("<select:"):
+            options = self.__suggestions.options
+            position = int(event.key.removeprefix("<select:").removesuffix(">"))
+            if position < len(options):
+                self.__suggestions.value = options[position]
+        elif event.key == BACKSPACE:
+            field = self.__fields[event.field]
+            field.value = field.value[:-1]
+        elif event.key == CLEAR:
+            self.__fields[event.field].value = ""
+        else:
+            field = self.__fields[event.field]
+            field.value = field.value + event.key
+
+    def __on_options_changed(self, change: dict[str, Any]) -> None:
+        self.options_updates += 1
+        self.options_bytes += len(json.dumps(list(change["new"]), ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def __walk(cls, widget: Any) -> Iterator[Any]:
+        # a layout refers to the same widgets by its areas and its children
+        seen: set[int] = set()
+        stack = [widget]
+        while stack:
+            widget = stack.pop()
+            if id(widget) in seen:
+                continue
+            seen.add(id(widget))
+            yield widget
+
+            stack.extend(getattr(widget, "children", None) or ())
+            for area in ("header", "left_sidebar", "center", "right_sidebar", "footer"):
+                if (child := getattr(widget, area, None)) is not None:
+                    stack.append(child)
+
+
+def generate_sessions(rows: list[Row], count: int, seed: int) -> list[TypingSession]:
+    """ Makes sessions that look up a known word with a corrected typo and add or delete its form.
+    """
+    draws = random.Random(seed)
+    sessions: list[TypingSession] = []
+    for number in range(count):
+        word, form, _ = draws.choice(rows)
+        events = _type_with_typo(draws, "word", word)
+        events.append(KeystrokeEvent(key=SELECT.format(1)))
+
+        if draws.random() < 0.8:
+            events.extend(_type_with_typo(draws, "form", form + draws.choice(word)))
+            events.extend(KeystrokeEvent(field="description", key=key) for key in "note")
+            events.append(KeystrokeEvent(key=SUBMIT))
+        else:
+            events.extend(_type_with_typo(draws, "form", form))
+            events.append(KeystrokeEvent(key=DELETE))
+
+        sessions.append(TypingSession(name=f"session-{number}", events=events))
+
+    return sessions
+
+
+def load_sessions(path: pathlib.Path) -> list[TypingSession]:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        TypingSession(name=session["name"], events=[KeystrokeEvent(**event) for event in session["events"]])
+        for session in document["sessions"]
+    ]
+
+
+def save_sessions(path: pathlib.Path, sessions: list[TypingSession]) -> None:
+    document = {"sessions": [dataclasses.asdict(session) for session in sessions]}
+    path.write_text(json.dumps(document, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def replay(database: Any, sessions: list[TypingSession], *, count: int) -> tuple[FormDriver, dict[str, list[float]]]:
+    """ Replays the sessions in one form; returns its driver and latencies of events by their keys.
+    """
+    from engine.views.notebook_io_impl import ElementConfig, WordInputForm, WordInputFormOptions
+
+    form = WordInputForm(
+        word_input_options=WordInputFormOptions(similar_words_count=count, similar_forms_count=count),
+        database=database,
+        config=ElementConfig(),
+    )
+    driver = FormDriver(form)
+
+    latencies: dict[str, list[float]] = collections.defaultdict(list)
+    for session in sessions:
+        for event in session.events:
+            started = time.perf_counter()
+            driver.apply(event)
+            elapsed = time.perf_counter() - started
+
+            key = event.key.split(":")[0].strip("<>") if event.key.startswith("<") else "type"
+            latencies[key].append(elapsed)
+
+        # the next session starts from an empty form
+        for field in ("description", "form", "word"):
+            driver.apply(KeystrokeEvent(field=field, key=CLEAR))
+
+    return driver, latencies
+
+
+def _type_with_typo(draws: random.Random, field: str, text: str) -> list[KeystrokeEvent]:
+    events: list[KeystrokeEvent] = []
+    typo_at = draws.randrange(len(text)) if len(text) > 1 else None
+    for at, key in enumerate(text):
+        if at == typo_at:
+            events.append(KeystrokeEvent(field=field, key=draws.choice(text)))
+            events.append(KeystrokeEvent(field=field, key=BACKSPACE))
+        events.append(KeystrokeEvent(field=field, key=key))
+
+    return events
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--forms", type=int, default=100_000, help="forms of the synthetic vocabulary")
+    parser.add_argument("--storage", choices=["csv", "journal", "sqlite"], default="csv")
+    parser.add_argument("--count", type=int, default=20, help="suggestions of a keystroke")
+    parser.add_argument("--seed", type=int, default=0)
+    sessions_source = parser.add_mutually_exclusive_group()
+    sessions_source.add_argument("--sessions", type=pathlib.Path, help="a file of recorded sessions")
+    sessions_source.add_argument("--record", type=pathlib.Path, help="a file the generated sessions are saved to")
+    parser.add_argument("--generated", type=int, default=50, help="sessions to generate")
+    parser.add_argument("--output", type=pathlib.Path, help="a JSON file; results are printed if it is omitted")
+    args = parser.parse_args()
+
+    rows = generate_rows(VocabularySpec(forms=args.forms, seed=args.seed))
+    if args.sessions is not None:
+        sessions = load_sessions(args.sessions)
+    else:
+        sessions = generate_sessions(rows, args.generated, args.seed)
+        if args.record is not None:
+            save_sessions(args.record, sessions)
+
+    with tempfile.TemporaryDirectory(prefix="words-replay-") as directory:
+        path = pathlib.Path(directory) / "vocabulary.tsv"
+        write_storage(rows, args.storage, path)
+        database = databases.WordsDatabase(
+            storage=open_storage(args.storage, path),
+            options=databases.WordsDatabaseOptions(),
+        )
+
+        driver, latencies = replay(database, sessions, count=args.count)
+
+    result = ReplayResult(
+        forms=args.forms,
+        storage=args.storage,
+        sessions=len(sessions),
+        events=sum(len(session.events) for session in sessions),
+        keystrokes=LatencySummary.of([x for key, values in latencies.items() if key in ("type", "backspace") for x in values]),
+        latencies_by_key={key: LatencySummary.of(values) for key, values in sorted(latencies.items())},
+        options_updates=driver.options_updates,
+        options_bytes=driver.options_bytes,
+    )
+    print(
+        f"{result.events} events of {result.sessions} sessions:"
+        f" keystroke p50/p99 {result.keystrokes.p50_ms:.2f}/{result.keystrokes.p99_ms:.2f}ms,"
+        f" {result.options_updates} suggestion updates of {result.options_bytes} bytes",
+        file=sys.stderr,
+    )
+
+    write_results("typing-replay", result, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
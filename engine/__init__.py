@@ -4,8 +4,18 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 
-from .engine import Engine  # noqa: E402
+from typing import TYPE_CHECKING  # noqa: E402
+
+from engine.core.system.lazy_imports import make_lazy_exports  # noqa: E402
+
+if TYPE_CHECKING:
+    from .engine import Engine
 
 __all__ = [
     "Engine",
 ]
+
+# the engine is imported on first access, so `import engine.core...` does not load its dependencies
+__getattr__, __dir__ = make_lazy_exports(__name__, {
+    "Engine": ".engine",
+})
@@ -1,6 +1,41 @@
-from .database import WordsDatabase, WordsDatabaseOptions
+from typing import TYPE_CHECKING
+
+from engine.core.system.lazy_imports import make_lazy_exports
+
+if TYPE_CHECKING:
+    from . import storages
+    from .change_events import BatchCommitted, WordFormDeleted, WordFormUpserted
+    from .database import WordsDatabase, WordsDatabaseOptions, WordsIndexKind
+    from .headless import HeadlessWordsDatabase
+    from .query_server import QueryServer
+    from .remote_database import RemoteWordDatabase
+    from .remote_protocol import RemoteDatabaseError
 
 __all__ = [
+    "BatchCommitted",
+    "HeadlessWordsDatabase",
+    "QueryServer",
+    "RemoteDatabaseError",
+    "RemoteWordDatabase",
+    "WordFormDeleted",
+    "WordFormUpserted",
     "WordsDatabase",
     "WordsDatabaseOptions",
+    "WordsIndexKind",
+    "storages",
 ]
+
+# the database and the storages load pandas, which the headless queries do without
+__getattr__, __dir__ = make_lazy_exports(__name__, {
+    "BatchCommitted": ".change_events",
+    "HeadlessWordsDatabase": ".headless",
+    "QueryServer": ".query_server",
+    "RemoteDatabaseError": ".remote_protocol",
+    "RemoteWordDatabase": ".remote_database",
+    "WordFormDeleted": ".change_events",
+    "WordFormUpserted": ".change_events",
+    "WordsDatabase": ".database",
+    "WordsDatabaseOptions": ".database",
+    "WordsIndexKind": ".database",
+    "storages": ".storages",
+})
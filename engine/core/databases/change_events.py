@@ -0,0 +1,112 @@
+import asyncio
+import dataclasses
+import logging
+from typing import ClassVar, Optional
+
+from engine.core.system import BUS, BusDeviceId, BusEventType, BusMessage
+
+from .storage_base import StorageChange, StorageChangeKind
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class WordFormUpserted(BusMessage):
+    EVENT_TYPE: ClassVar[BusEventType] = "word-form-upserted"
+
+    word: str
+    form: str
+    description: str
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class WordFormDeleted(BusMessage):
+    EVENT_TYPE: ClassVar[BusEventType] = "word-form-deleted"
+
+    word: str
+    form: str
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class BatchCommitted(BusMessage):
+    """ Follows the word form events of one applied batch.
+    """
+
+    EVENT_TYPE: ClassVar[BusEventType] = "batch-committed"
+
+    upserted: int
+    deleted: int
+
+
+ChangeEvent = WordFormUpserted | WordFormDeleted | BatchCommitted
+
+
+class ChangeEventsPublisher:
+    """ Sends events of applied changes over the BUS in order they were applied.
+
+    The BUS is bound to an event loop, so events are sent by tasks of the running loop
+    or, from other threads, of the loop the publisher has seen last.
+
+    NOTE: without any running event loop (e.g. out of a notebook) events are not sent.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, *, device_id: BusDeviceId) -> None:
+        self.__device_id = device_id
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__tail: Optional[asyncio.Future[None]] = None
+        self.__tasks: set[asyncio.Future[None]] = set()
+
+        try:
+            self.__loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    @property
+    def device_id(self) -> BusDeviceId:
+        return self.__device_id
+
+    def publish(self, changes: list[StorageChange]) -> None:
+        """ Schedules sending of events of the applied changes followed by `BatchCommitted`.
+
+        NOTE: it is expected to be called in order the changes are applied.
+        """
+        try:
+            self.__loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self.__loop is None or not self.__loop.is_running():
+                self.logger.debug("no running event loop; change events are not sent")
+                return
+
+        # batches are queued by the loop in order they are published from any thread
+        self.__loop.call_soon_threadsafe(self.__enqueue, self.__make_events(changes))
+
+    def __enqueue(self, events: list[ChangeEvent]) -> None:
+        assert self.__loop is not None
+        task = self.__loop.create_task(self.__send(events, self.__tail))
+        task.add_done_callback(self.__tasks.discard)
+        self.__tasks.add(task)
+        self.__tail = task
+
+    async def __send(self, events: list[ChangeEvent], previous: Optional[asyncio.Future[None]]) -> None:
+        # a batch waits for the previous one, so listeners see batches in order they were applied
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+
+        for event in events:
+            await BUS.send_message(self.__device_id, event.EVENT_TYPE, event)
+
+    @staticmethod
+    def __make_events(changes: list[StorageChange]) -> list[ChangeEvent]:
+        events: list[ChangeEvent] = []
+        for change in changes:
+            match change.kind:
+                case StorageChangeKind.UPSERT:
+                    events.append(WordFormUpserted(word=change.word, form=change.form, description=change.description))
+                case StorageChangeKind.DELETE:
+                    events.append(WordFormDeleted(word=change.word, form=change.form))
+                case _:
+                    raise NotImplementedError()
+
+        deleted = sum(isinstance(event, WordFormDeleted) for event in events)
+        events.append(BatchCommitted(upserted=len(events) - deleted, deleted=deleted))
+        return events
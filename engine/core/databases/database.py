@@ -1,7 +1,13 @@
+import atexit
+import contextlib
+import enum
+import itertools
+import logging
+import pathlib
+import threading
 from dataclasses import InitVar
-from typing import Any, Callable, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
 
-import Levenshtein
 import numpy as np
 import pandas as pd
 import pydantic
@@ -9,71 +15,595 @@ import pydantic
 from engine.core.protocols.words_databse_protocol import (
     WordDatabaseProtocol,
     WordFormInfo,
+    WordSearchSessionProtocol,
 )
 
-from .storage_base import StorageBase
+from .descriptions import LazyDescriptions
+from .flush_scheduler import FlushScheduler
+from .index_cache import CacheArrays, IndexCache
+from .query_cache import QueryCache, QueryCacheStats, QueryKey, QueryKind
+from .indexes import (
+    BKTreeWordsIndex,
+    LengthBucketsWordsIndex,
+    QGramWordsIndex,
+    TrieWordsIndex,
+    WeightedScorer,
+    WordsIndexBase,
+    weighted_distance,
+)
+from .search_session import WordsSearchSession
+from .storage_base import (
+    DescriptionsReader,
+    Dump,
+    DumpFields,
+    StorageBase,
+    StorageChange,
+    StorageChangeKind,
+)
+from .vocabulary import WordsVocabulary
+from .word_forms_store import WordFormsStore
+from .words_snapshot import WordsSnapshot
+
+if TYPE_CHECKING:
+    from engine.core.system import Instrumentation
+
+    from .change_events import ChangeEventsPublisher
+
+# a batch is not measured, as it only collects changes; they are measured once applied
+_INSTRUMENTED_METHODS = sorted(WordDatabaseProtocol.__abstractmethods__ - {"batch"})
+
+# a words index is rebuilt once queries scan more changed words than this or a 1/16 of all words
+_MIN_INDEX_DELTA = 1024
+
+
+class WordsIndexKind(str, enum.Enum):
+    SCAN = "scan"
+    BK_TREE = "bk-tree"
+    LENGTH_BUCKETS = "length-buckets"
+    QGRAM = "q-gram"  # approximate, see `qgram_candidates`
 
 
 @pydantic.dataclasses.dataclass(kw_only=True, frozen=True)
 class WordsDatabaseOptions:
-    pass
+    words_index: WordsIndexKind = WordsIndexKind.SCAN
+    scoring_workers: int = -1  # -1 stands for all cores
+
+    # the q-gram index scores only words sharing the most grams with a query;
+    # more candidates give a better recall, which `measure_recall` reports
+    qgram_size: int = 2
+    qgram_candidates: int = 2000
+    index_cache: bool = True  # keep prebuilt structures in a file next to the storage
+
+    # changes are persisted from a background thread after a delay or a number of edits;
+    # such a database is kept alive until it is closed, its changes are flushed at exit
+    write_behind: bool = False
+    flush_delay: float = 1.0  # seconds
+    flush_edits: int = 1000
+
+    # descriptions are read from the storage on demand if the storage supports it;
+    # storages that rewrite the whole dump copy unchanged descriptions row by row
+    lazy_descriptions: bool = False
+    descriptions_cache_size: int = 1024
+
+    query_cache_size: int = 1024  # similarity query results; 0 disables the cache
+
+    # applied changes are sent over the BUS to the device as `WordFormUpserted`,
+    # `WordFormDeleted` and `BatchCommitted` messages; None disables the events
+    events_device_id: Optional[str] = None  # a BusDeviceId; the bus is imported once it is set
+
+    # latencies of the protocol methods and storage calls, scanned candidates and
+    # written bytes are collected, see `get_instrumentation`
+    instrumentation: bool = False
 
 
 @pydantic.dataclasses.dataclass(kw_only=True)
 class WordsDatabase(WordDatabaseProtocol):
-    class Fields:
-        DESCRIPTION = "__desc__"
-        FORM = "__form__"
-        WORD = "__word__"
+    Fields = DumpFields
 
     storage: StorageBase
 
     options: InitVar[WordsDatabaseOptions]
 
+    logger = logging.getLogger()
+
     def __post_init__(self, options: WordsDatabaseOptions) -> None:
-        self.__words = self.__load_words_dump().copy()  # avaid errors
         self.__options = options
+        self.__instrumentation: Optional["Instrumentation"] = None
+        if options.instrumentation:
+            from engine.core.system.instrumentation import Instrumentation
+            self.__instrumentation = Instrumentation(namespace="words_database")
+        self.__scorer = WeightedScorer(workers=options.scoring_workers)
+        self.__query_cache = QueryCache(max_size=options.query_cache_size)
+        self.__change_events: Optional["ChangeEventsPublisher"] = None
+        if options.events_device_id is not None:
+            from . import change_events
+            self.__change_events = change_events.ChangeEventsPublisher(device_id=options.events_device_id)
+        self.__words_trie: Optional[TrieWordsIndex] = None
 
-    def get_similar_words(self, base: str, count: int) -> Iterable[str]:
-        return self.__get_similar_variants_by_index(self.__words.index, base, count)
+        # rows are only needed for mutations, so they are not loaded if the cache is valid
+        self.__store: Optional[WordFormsStore] = None
+        self.__is_changed = False
 
-    def get_similar_forms(self, word: str, base: str, count: int) -> Iterable[str]:
-        if word not in self.__words.index:
-            return []
+        # changes of a batch open by the thread; they are applied on exit of the outermost one
+        self.__local = threading.local()
 
-        slice = self.__words.loc[word]
-        return self.__get_similar_variants_by_index(slice.index, base, count)
+        # queries read the published snapshot, see `WordsSnapshot`; a writer holds the mutex
+        self.__mutex = threading.RLock()
+        self.__trie_mutex = threading.Lock()
 
-    def update_word_form(self, info: WordFormInfo) -> None:
-        key = (info.word, info.form)
-        row = pd.Series({
-            self.Fields.FORM: info.form,
-            self.Fields.WORD: info.word,
-            self.Fields.DESCRIPTION: info.description,
-        })
-
-        if key in self.__words.index:
-            self.__words.loc[key, :] = row
-            print("word updated")  # TODO: use logger
+        # changes that are applied in memory but have not been persisted yet
+        self.__flush_mutex = threading.Lock()
+        self.__unflushed: list[StorageChange] = []
+        self.__flush_scheduler: Optional[FlushScheduler] = None
+        if options.write_behind:
+            self.__flush_scheduler = FlushScheduler(
+                flush=self.flush,
+                delay=options.flush_delay,
+                max_edits=options.flush_edits,
+                name="words-database-flush",
+            )
+            atexit.register(self.flush)
+
+        self.__index_cache = self.__open_index_cache()
+        self.__index_cache_key: Any = None
+
+        if arrays := self.__load_index_cache():
+            self.__vocabulary = WordsVocabulary.from_arrays(arrays)
+            if "trie_terminals" in arrays:
+                self.__words_trie = TrieWordsIndex.from_arrays(arrays, *self.__get_words())
         else:
-            patch = pd.DataFrame([row])
-            self.__add_index(patch)
-            self.__words = pd.concat([self.__words, patch])
-            print("word created")  # TODO: use logger
+            self.__store, dump = self.__load_store()
+            self.__vocabulary = WordsVocabulary.from_rows(
+                dump[self.Fields.WORD].to_numpy(),
+                dump[self.Fields.FORM].to_numpy(),
+            )
+            del dump
+
+            self.__save_index_cache()
+
+        self.__snapshot = WordsSnapshot(
+            version=0,
+            vocabulary=self.__vocabulary.get_snapshot(),
+            index=self.__build_words_index(),
+        )
+
+        if self.__instrumentation is not None:
+            # methods are replaced only if they are measured, so a disabled instrumentation costs nothing
+            for name in _INSTRUMENTED_METHODS:
+                setattr(self, name, self.__instrumentation.wrap(name, getattr(self, name)))
+
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        index = self.__snapshot.index
+        exact = index is None or index.is_exact
+        key = QueryKey(kind=QueryKind.WORDS, exact=exact, word="", base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar_words(base, count, max_distance),
+        )
+
+    def get_similar_words_batch(self, bases: Iterable[str], count: int) -> Iterable[Iterable[str]]:
+        assert count > 0
+        vocabulary = self.__snapshot.vocabulary
+        words = vocabulary.get_words()
+        mask = vocabulary.get_words_mask()
+        tops = self.__scorer.get_similar_batch(list(bases), words, count, mask=mask, orders=vocabulary.get_orders())
+        return [words[top].tolist() for top in tops]
+
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        key = QueryKey(kind=QueryKind.FORMS, exact=True, word=word, base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar_forms(word, base, count, max_distance),
+        )
 
-        self.storage.save_dump(self.__words)
+    def measure_recall(self, bases: Iterable[str], count: int) -> float:
+        """ Returns a share of the exact scan results that the words index finds for the bases.
+
+        NOTE: words of equal distance are interchangeable, so a result is found if the
+        index returns a word of the same distance at its rank.
+        """
+        assert count > 0
+        bases = list(bases)
+        snapshot = self.__snapshot
+        words = snapshot.vocabulary.get_words()
+        mask = snapshot.vocabulary.get_words_mask()
+        orders = snapshot.vocabulary.get_orders()
+        exact_tops = self.__scorer.get_similar_batch(bases, words, count, mask=mask, orders=orders)
+
+        found, expected = 0, 0
+        for base, exact_top in zip(bases, exact_tops):
+            exact = [weighted_distance(base, word) for word in words[exact_top].tolist()]
+            approximate, _ = snapshot.get_similar_words(self.__scorer, base, count, None)
+            approximate = [weighted_distance(base, word) for word in approximate]
+            found += sum(x == y for x, y in zip(exact, approximate))
+            expected += len(exact)
+
+        return found / expected if expected > 0 else 1.0
+
+    def get_instrumentation(self) -> Optional["Instrumentation"]:
+        return self.__instrumentation
+
+    def get_events_device_id(self) -> Optional[str]:
+        """ Returns the BUS device change events are sent to or None if they are disabled.
+        """
+        return self.__options.events_device_id
+
+    def get_query_cache_stats(self) -> QueryCacheStats:
+        return self.__query_cache.get_stats()
+
+    def get_word_form_info(self, word: str, form: str) -> Optional[WordFormInfo]:
+        # NOTE: descriptions are not a part of snapshots, so a lookup waits for a running change
+        with self.__mutex:
+            store = self.__get_store()
+            row = store.find(word, form)
+            if row < 0:
+                return None
+
+            return WordFormInfo(
+                description=store.get_description(row),
+                form=form,
+                word=word,
+            )
+
+    def get_forms(self, word: str) -> Iterable[str]:
+        return self.__snapshot.vocabulary.get_forms(word).tolist()
+
+    def open_search_session(self) -> WordSearchSessionProtocol:
+        with self.__mutex:
+            if self.__words_trie is None:
+                self.__words_trie = TrieWordsIndex()
+                self.__words_trie.add_words(*self.__get_words())
+                self.__save_index_cache()
+
+        return WordsSearchSession(
+            words_trie=self.__words_trie,
+            trie_mutex=self.__trie_mutex,
+            get_vocabulary=lambda: self.__snapshot.vocabulary,
+            query_cache=self.__query_cache,
+            instrumentation=self.__instrumentation,
+        )
+
+    def update_word_form(self, info: WordFormInfo) -> None:
+        self.update_word_forms([info])
 
     def delete_word_form(self, word: str, form: str) -> None:
-        key = (word, form)
+        self.delete_word_forms([(word, form)])
+
+    def update_word_forms(self, infos: Iterable[WordFormInfo]) -> None:
+        with self.batch():
+            self.__local.batch.extend(
+                StorageChange(
+                    kind=StorageChangeKind.UPSERT,
+                    word=info.word,
+                    form=info.form,
+                    description=info.description,
+                )
+                for info in infos
+            )
+
+    def delete_word_forms(self, keys: Iterable[tuple[str, str]]) -> None:
+        with self.batch():
+            self.__local.batch.extend(
+                StorageChange(
+                    kind=StorageChangeKind.DELETE,
+                    word=word,
+                    form=form,
+                )
+                for word, form in keys
+            )
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """ Collects changes and applies them at once on exit of the outermost batch.
+
+        NOTE: queries made inside a batch do not see its changes; a batch collects changes of
+        the thread that has opened it, and batches of threads are applied one at a time.
+        """
+        changes: Optional[list[StorageChange]] = getattr(self.__local, "batch", None)
+        if changes is not None:
+            # a nested batch is a part of the outer one, but its failure discards only its own changes
+            size = len(changes)
+            try:
+                yield
+            except BaseException:
+                del changes[size:]
+                raise
+            return
+
+        changes = self.__local.batch = []
+        try:
+            yield
+        finally:
+            self.__local.batch = None
+
+        self.__apply_changes(changes)
+
+    def flush(self) -> None:
+        """ Persists changes that are delayed by the write-behind mode.
+        """
+        with self.__flush_mutex:
+            with self.__mutex:
+                if len(self.__unflushed) == 0:
+                    return
+
+                changes, self.__unflushed = self.__unflushed, []
+
+            try:
+                self.__save_changes(changes)
+            except BaseException:
+                with self.__mutex:
+                    self.__unflushed[:0] = changes
+                raise
+
+    def close(self) -> None:
+        """ Flushes delayed changes and stops the write-behind mode; later changes are persisted at once.
+        """
+        if self.__flush_scheduler is not None:
+            self.__flush_scheduler.close()
+            self.__flush_scheduler = None
+            atexit.unregister(self.flush)
+
+        self.flush()
+
+    # ------------------| changes
+
+    def __apply_changes(self, changes: list[StorageChange]) -> None:
+        """ Merges the changes into the stored rows, persists them and refreshes the indexes.
 
-        if key in self.__words.index:
-            self.__words.drop(index=key, inplace=True)
+        Changes of the same word form are merged into the last one; the rows are rolled
+        back if the storage has failed to persist the changes.
 
-            self.storage.save_dump(self.__words)
-            print("word deleted from database")  # TODO: use logger
+        NOTE: in the write-behind mode the changes are persisted later by `flush`.
+        """
+        if len(changes) == 0:
+            return
+
+        with self.__mutex:
+            applied = self.__merge_changes(changes)
+            if self.__change_events is not None and len(applied) > 0:
+                self.__change_events.publish(applied)
+
+        if self.__flush_scheduler is not None and len(applied) > 0:
+            self.__flush_scheduler.notify(len(applied))
+
+    def __merge_changes(self, changes: list[StorageChange]) -> list[StorageChange]:
+        store = self.__get_store()
+        size = store.size
+
+        # the last change of a word form wins; word forms are created in order they were added first
+        merged = {(change.word, change.form): change for change in changes}
+
+        updated: list[tuple[int, str]] = []
+        deleted: list[tuple[int, str]] = []
+        created_rows: list[int] = []
+        created_keys: list[tuple[str, str]] = []
+        deleted_keys: list[tuple[str, str]] = []
+        applied: list[StorageChange] = []
+
+        for key, change in merged.items():
+            row = store.find(*key)
+            match change.kind:
+                case StorageChangeKind.UPSERT if row < 0:
+                    created_rows.append(store.append(change.word, change.form, change.description))
+                    created_keys.append(key)
+                case StorageChangeKind.UPSERT:
+                    updated.append((row, store.get_description(row)))
+                    store.set_description(row, change.description)
+                case StorageChangeKind.DELETE if row < 0:
+                    continue
+                case StorageChangeKind.DELETE:
+                    deleted.append((row, store.delete(row)))
+                    deleted_keys.append(key)
+                case _:
+                    raise NotImplementedError()
+
+            applied.append(change)
+
+        if len(applied) == 0:
+            return applied
+
+        if self.__flush_scheduler is not None:
+            self.__unflushed.extend(applied)
+        else:
+            try:
+                self.__save_changes(applied)
+            except BaseException:
+                # the store is rolled back in reverse order
+                store.truncate(size)
+                for row, description in deleted:
+                    store.restore(row, description)
+                for row, description in reversed(updated):
+                    store.set_description(row, description)
+                raise
+
+        # rows are renumbered by a compaction, but their ordinals are kept
+        created_orders = [store.get_ordinal(row) for row in created_rows]
+        store.compact()
+        self.__is_changed = True
+        self.__refresh_vocabulary(created=created_keys, created_orders=created_orders, deleted=deleted_keys)
+
+        self.logger.info(
+            "word forms are changed: %d updated, %d created, %d deleted",
+            len(updated), len(created_keys), len(deleted_keys),
+        )
+
+        return applied
+
+    def __refresh_vocabulary(
+        self, created: list[tuple[str, str]], created_orders: list[int], deleted: list[tuple[str, str]],
+    ) -> None:
+        # deletions go first, so a word that has lost all forms and got a new one is moved to the end
+        removed_words = [word for word, form in deleted if self.__vocabulary.remove_form(word, form)]
+        added_words = self.__vocabulary.add_forms(created, created_orders)
+
+        # a word is ranked by its first row, which changes once its first form is deleted
+        moved_words = [
+            word
+            for word in dict.fromkeys(word for word, _ in deleted)
+            if self.__vocabulary.has_word(word) and self.__update_word_order(word)
+        ]
+
+        # an index is told about a moved word as about a removed and added one
+        added_words, removed_words = added_words + moved_words, removed_words + moved_words
+        if self.__words_trie is not None:
+            with self.__trie_mutex:
+                for word in removed_words:
+                    self.__words_trie.remove_word(word)
+                self.__words_trie.add_words(added_words, [self.__vocabulary.get_order(word) for word in added_words])
+
+        # the snapshot is published first, so queries cached at the new generation see it
+        self.__publish_snapshot(added_words, removed_words)
+        self.__query_cache.invalidate(
+            added_words=added_words,
+            removed_words=removed_words,
+            changed_words=[word for word, _ in itertools.chain(created, deleted)],
+        )
+
+    def __update_word_order(self, word: str) -> bool:
+        """ Sets the order of the word to the ordinal of its first row; returns True if it has changed.
+        """
+        store = self.__get_store()
+        order = store.get_ordinal(store.find(word, self.__vocabulary.get_forms(word)[0]))
+        if order == self.__vocabulary.get_order(word):
+            return False
+
+        self.__vocabulary.set_order(word, order)
+        return True
+
+    def __publish_snapshot(self, added_words: list[str], removed_words: list[str]) -> None:
+        """ Publishes the next snapshot; the words index is rebuilt once it is too far behind.
+        """
+        snapshot = self.__snapshot
+        vocabulary = self.__vocabulary.get_snapshot()
+        if snapshot.index is None:
+            self.__snapshot = WordsSnapshot(version=snapshot.version + 1, vocabulary=vocabulary)
+            return
+
+        # a word added after the index was built is just dropped, an indexed one is filtered out
+        added = dict.fromkeys(snapshot.added_words.tolist())
+        removed = set(snapshot.removed_words)
+        for word in removed_words:
+            if word in added:
+                del added[word]
+            else:
+                removed.add(word)
+        added.update(dict.fromkeys(added_words))
+
+        if len(added) + len(removed) > max(_MIN_INDEX_DELTA, len(self.__vocabulary) // 16):
+            self.__snapshot = WordsSnapshot(
+                version=snapshot.version + 1,
+                vocabulary=vocabulary,
+                index=self.__build_words_index(),
+            )
+            return
+
+        self.__snapshot = WordsSnapshot(
+            version=snapshot.version + 1,
+            vocabulary=vocabulary,
+            index=snapshot.index,
+            added_words=np.array(list(added), dtype=object),
+            added_orders=np.array([vocabulary.get_order(word) for word in added], dtype=np.int64),
+            removed_words=frozenset(removed),
+        )
+
+    # ------------------| instrumentation
+
+    def __measure(self, operation: str) -> contextlib.AbstractContextManager[None]:
+        if self.__instrumentation is None:
+            return contextlib.nullcontext()
+
+        return self.__instrumentation.measure(operation)
+
+    def __read_keys(self) -> Optional[tuple[pd.DataFrame, DescriptionsReader]]:
+        with self.__measure("storage.read_keys"):
+            return self.storage.read_keys()
+
+    def __save_changes(self, changes: list[StorageChange]) -> None:
+        if self.__instrumentation is None:
+            self.storage.save_changes(self.__dump_rows, changes)
+            return
+
+        before = self.__get_source_files()
+        with self.__instrumentation.measure("storage.save_changes"):
+            self.storage.save_changes(self.__dump_rows, changes)
+
+        # files that have been replaced count as written whole, others by their growth
+        written = 0
+        for path, (inode, size) in self.__get_source_files().items():
+            before_inode, before_size = before.get(path, (None, 0))
+            written += size if inode != before_inode else max(0, size - before_size)
+
+        self.__instrumentation.observe("written_bytes", "storage.save_changes", written)
+
+    def __get_source_files(self) -> dict[pathlib.Path, tuple[int, int]]:
+        files: dict[pathlib.Path, tuple[int, int]] = {}
+        for path in self.storage.get_source_paths():
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                files[path] = (stat.st_ino, stat.st_size)
+
+        return files
+
+    def __observe_scanned(self, operation: str, scanned: int) -> None:
+        if self.__instrumentation is not None:
+            self.__instrumentation.observe("scanned_candidates", operation, scanned)
+
+    # ------------------| helpers
+
+    def __get_store(self) -> WordFormsStore:
+        if self.__store is None:
+            self.__store, _ = self.__load_store()
+
+        return self.__store
+
+    def __load_store(self) -> tuple[WordFormsStore, pd.DataFrame]:
+        """ Returns the store and the frame it was made of.
+        """
+        if self.__options.lazy_descriptions and (keys := self.__read_keys()) is not None:
+            dump, reader = keys
+            descriptions = LazyDescriptions(reader, len(dump), self.__options.descriptions_cache_size)
+            return WordFormsStore.from_frame(dump, descriptions), dump
+
+        dump = self.__load_words_dump()
+        return WordFormsStore.from_frame(dump), dump
+
+    def __dump_rows(self) -> Dump:
+        # the store may be changed by a writer while a flush thread reads it
+        with self.__mutex:
+            return self.__get_store().to_dump()
+
+    def __open_index_cache(self) -> Optional[IndexCache]:
+        sources = self.storage.get_source_paths()
+        if not self.__options.index_cache or len(sources) == 0:
+            return None
+
+        return IndexCache.for_sources(sources)
+
+    def __load_index_cache(self) -> Optional[CacheArrays]:
+        if self.__index_cache is None:
+            return None
+
+        self.__index_cache_key = self.__index_cache.make_key()
+        return self.__index_cache.load(self.__index_cache_key)
+
+    def __save_index_cache(self) -> None:
+        # the cache must describe the sources it is keyed by
+        if self.__index_cache is None or self.__is_changed:
+            return
+
+        arrays = self.__vocabulary.to_arrays()
+        if arrays is None:
+            return
+
+        if self.__words_trie is not None:
+            arrays.update(self.__words_trie.to_arrays())
+
+        try:
+            self.__index_cache.save(self.__index_cache_key, arrays)
+        except OSError:
+            self.logger.warning("index cache cannot be saved", exc_info=True)
 
     def __load_words_dump(self) -> pd.DataFrame:
-        dump = self.storage.read_dump()
+        with self.__measure("storage.read_dump"):
+            dump = self.storage.read_dump()
         if dump is None:
             dump = pd.DataFrame(columns=[
                 self.Fields.WORD,
@@ -81,36 +611,44 @@ class WordsDatabase(WordDatabaseProtocol):
                 self.Fields.DESCRIPTION,
             ])
 
-        self.__add_index(dump)
         return dump
 
-    def __add_index(self, df: pd.DataFrame) -> None:
-        df.set_index(
-            [self.Fields.WORD, self.Fields.FORM],
-            verify_integrity=True,
-            inplace=True,
-            drop=False,
-        )
+    def __build_words_index(self) -> Optional[WordsIndexBase]:
+        match self.__options.words_index:
+            case WordsIndexKind.SCAN:
+                return None
+            case WordsIndexKind.BK_TREE:
+                index = BKTreeWordsIndex()
+            case WordsIndexKind.LENGTH_BUCKETS:
+                index = LengthBucketsWordsIndex(scorer=self.__scorer)
+            case WordsIndexKind.QGRAM:
+                index = QGramWordsIndex(
+                    scorer=self.__scorer,
+                    q=self.__options.qgram_size,
+                    candidates=self.__options.qgram_candidates,
+                )
+            case _:
+                raise NotImplementedError()
 
-    def __get_similar_variants_by_index(self, index: pd.Index, base: str, count: int) -> Iterable[str]:
-        assert count > 0
-        variants = index.get_level_values(0).to_series().drop_duplicates()
-        distances: pd.Series = variants.apply(self.__make_distance_function(base))  # type: ignore
-        distances = distances.astype(np.int32, copy=False)
-
-        top = distances.nsmallest(count)
-        return variants.loc[top.index]
-
-    def __make_distance_function(self, base: str) -> Callable[[Any], np.int32]:
-        FINES = (
-            1,  # insert
-            5,  # delete
-            2,  # replace
-        )
+        index.add_words(*self.__get_words())
+        return index
+
+    def __get_words(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Returns alive words and their orders.
+        """
+        words = self.__vocabulary.get_words()
+        orders = self.__vocabulary.get_orders()
+        mask = self.__vocabulary.get_words_mask()
+        return (words, orders) if mask is None else (words[mask], orders[mask])
 
-        def scorrer(word: Any) -> np.int32:
-            assert isinstance(word, str)
-            dist = Levenshtein.distance(base, word, weights=FINES)
-            return np.int32(dist)
+    def __get_similar_words(self, base: str, count: int, max_distance: Optional[int]) -> Iterable[str]:
+        words, scanned = self.__snapshot.get_similar_words(self.__scorer, base, count, max_distance)
+        self.__observe_scanned("get_similar_words", scanned)
+        return words
 
-        return scorrer
+    def __get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int]) -> Iterable[str]:
+        assert count > 0
+        forms = self.__snapshot.vocabulary.get_forms(word)
+        self.__observe_scanned("get_similar_forms", len(forms))
+        top = self.__scorer.get_similar(base, forms, count, max_distance=max_distance)
+        return forms[top].tolist()
@@ -0,0 +1,96 @@
+import functools
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .storage_base import DescriptionsReader, LazyDump
+
+
+class LazyDescriptions:
+    """ Descriptions of rows that are read from a storage on demand.
+
+    Only changed and appended descriptions are kept in memory; read ones are kept
+    in a small LRU cache. The container supports the list operations used by
+    `WordFormsStore`.
+    """
+
+    def __init__(self, reader: DescriptionsReader, size: int, cache_size: int) -> None:
+        self.__reader = reader
+        self.__size = size
+
+        # rows of the reader; None stands for the identity map of the first rows
+        self.__source_rows: Optional[np.ndarray] = None
+        self.__source_size = size
+        self.__changed: dict[int, str] = {}
+
+        self.__read = functools.lru_cache(maxsize=cache_size)(reader.read_description)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(self.__size):
+            yield self[row]
+
+    def __getitem__(self, row: int) -> str:
+        description = self.__changed.get(row)
+        if description is not None:
+            return description
+
+        assert row < self.__source_size
+        source_row = row if self.__source_rows is None else int(self.__source_rows[row])
+        return self.__read(source_row)
+
+    def __setitem__(self, row: int, description: str) -> None:
+        assert row < self.__size
+        self.__changed[row] = description
+
+    def __delitem__(self, rows: slice) -> None:
+        """ Supports only `del descriptions[size:]`.
+        """
+        assert rows.stop is None and rows.step is None
+        size = rows.start
+
+        self.__changed = {row: value for row, value in self.__changed.items() if row < size}
+        self.__size = min(self.__size, size)
+
+    def append(self, description: str) -> None:
+        self.__changed[self.__size] = description
+        self.__size += 1
+
+    def take(self, rows: np.ndarray) -> "LazyDescriptions":
+        """ Returns descriptions of the rows renumbered in order they are given.
+        """
+        positions = {row: position for position, row in enumerate(rows.tolist()) if row in self.__changed}
+
+        taken = LazyDescriptions.__new__(LazyDescriptions)
+        taken.__reader = self.__reader
+        taken.__size = len(rows)
+        taken.__source_rows = self.__get_source_rows()[rows]
+        taken.__source_size = len(rows)
+        taken.__changed = {position: self.__changed[row] for row, position in positions.items()}
+        taken.__read = self.__read
+        return taken
+
+    def to_dump(self, keys: pd.DataFrame) -> LazyDump:
+        """ Returns a dump of the keys and these descriptions without reading them.
+        """
+        assert len(keys) == self.__size
+        return LazyDump(
+            keys=keys,
+            reader=self.__reader,
+            source_rows=self.__get_source_rows(),
+            changed=dict(self.__changed),
+        )
+
+    def __get_source_rows(self) -> np.ndarray:
+        source_rows = np.full(self.__size, -1, dtype=np.int64)
+        if self.__source_rows is None:
+            count = min(self.__size, self.__source_size)
+            source_rows[:count] = np.arange(count)
+        else:
+            count = min(self.__size, len(self.__source_rows))
+            source_rows[:count] = self.__source_rows[:count]
+
+        return source_rows
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class FlushScheduler:
+    """ Calls `flush` from a background thread to coalesce bursts of edits.
+
+    A flush happens once `delay` seconds have passed since the first unflushed edit
+    or the number of unflushed edits has reached `max_edits`, whichever is earlier.
+    A failed flush is retried `delay` seconds later, even without new edits.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, *, flush: Callable[[], None], delay: float, max_edits: int, name: str) -> None:
+        self.__flush = flush
+        self.__delay = delay
+        self.__max_edits = max_edits
+
+        self.__condition = threading.Condition()
+        self.__edits = 0
+        self.__first_edit_time = 0.0
+        self.__retrying = False
+        self.__closed = False
+
+        self.__thread: Optional[threading.Thread] = threading.Thread(
+            target=self.__run,
+            name=name,
+            daemon=True,  # an exit hook of the owner flushes the rest
+        )
+        self.__thread.start()
+
+    def notify(self, edits: int) -> None:
+        with self.__condition:
+            if self.__edits == 0:
+                self.__first_edit_time = time.monotonic()
+
+            self.__edits += edits
+            self.__condition.notify()
+
+    def close(self) -> None:
+        """ Stops the thread; edits that have not been flushed yet are left to the owner.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+
+        thread, self.__thread = self.__thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __run(self) -> None:
+        while (edits := self.__wait_flush()) > 0:
+            try:
+                self.__flush()
+            except Exception:
+                self.logger.exception("write-behind flush has failed; the changes are kept for the next one")
+                self.__retry(edits)
+
+    def __retry(self, edits: int) -> None:
+        """ Returns edits of a failed flush and re-arms the timer.
+        """
+        with self.__condition:
+            self.__edits += edits
+            self.__first_edit_time = time.monotonic()
+            self.__retrying = True
+
+    def __wait_flush(self) -> int:
+        """ Waits for the next flush; returns the number of edits to flush or 0 once the scheduler is closed.
+        """
+        with self.__condition:
+            while self.__edits == 0 and not self.__closed:
+                self.__condition.wait()
+
+            # a retry always waits for the delay, so a failing flush is not called in a loop
+            deadline = self.__first_edit_time + self.__delay
+            while not self.__closed and (self.__retrying or self.__edits < self.__max_edits):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+
+                self.__condition.wait(timeout)
+
+            if self.__closed:
+                return 0
+
+            edits, self.__edits = self.__edits, 0
+            self.__retrying = False
+            return edits
@@ -0,0 +1,63 @@
+import pathlib
+from typing import Iterable, Optional, Sequence
+
+from engine.core.protocols.words_databse_protocol import WordSearchSessionProtocol
+
+from .index_cache import IndexCache
+from .indexes import WeightedScorer
+from .query_cache import QueryCache, QueryKey, QueryKind
+from .vocabulary import WordsVocabulary
+
+
+class HeadlessWordsDatabase(WordSearchSessionProtocol):
+    """ Read-only similarity queries over the index cache of a database.
+
+    Neither the rows nor pandas are loaded: the vocabulary is mapped from the cache
+    that a `WordsDatabase` has saved next to its storage, see `open`.
+
+    NOTE: changes made to the storage after the database has been opened are not seen.
+    """
+
+    def __init__(self, *, vocabulary: WordsVocabulary, scoring_workers: int = -1, query_cache_size: int = 1024) -> None:
+        self.__vocabulary = vocabulary
+        self.__scorer = WeightedScorer(workers=scoring_workers)
+        self.__query_cache = QueryCache(max_size=query_cache_size)
+
+    @classmethod
+    def open(
+        cls, sources: Sequence[pathlib.Path], *,
+        scoring_workers: int = -1,
+        query_cache_size: int = 1024,
+    ) -> Optional["HeadlessWordsDatabase"]:
+        """ Opens the index cache of a storage with the source files; returns None if there is no valid cache.
+        """
+        cache = IndexCache.for_sources(sources)
+        arrays = cache.load(cache.make_key())
+        if arrays is None:
+            return None
+
+        return cls(
+            vocabulary=WordsVocabulary.from_arrays(arrays),
+            scoring_workers=scoring_workers,
+            query_cache_size=query_cache_size,
+        )
+
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        key = QueryKey(kind=QueryKind.WORDS, exact=True, word="", base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar(self.__vocabulary.get_words(), base, count, max_distance),
+        )
+
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        key = QueryKey(kind=QueryKind.FORMS, exact=True, word=word, base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar(self.__vocabulary.get_forms(word), base, count, max_distance),
+        )
+
+    def get_forms(self, word: str) -> Iterable[str]:
+        return self.__vocabulary.get_forms(word).tolist()
+
+    def __get_similar(self, variants: Sequence[str], base: str, count: int, max_distance: Optional[int]) -> list[str]:
+        assert count > 0
+        top = self.__scorer.get_similar(base, variants, count, max_distance=max_distance)
+        return [variants[x] for x in top.tolist()]
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pathlib
+import struct
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+_MAGIC = b"VDBINDEX"
+_VERSION = 3
+_ALIGNMENT = 64
+# a key hashes the head and the tail of a source, which catches rewrites of the same size and mtime
+_HASH_SPAN = 64 * 1024
+
+CacheArrays = dict[str, np.ndarray]
+
+
+class IndexCache:
+    """ Sidecar file with prebuilt arrays of a database.
+
+    The cache is keyed by size, mtime and a hash of the head and the tail of every
+    source file and is ignored once any of them changes. Arrays are memory-mapped
+    without copying.
+
+    Every save writes a new generation file (`<name>.<generation>`), as a mapped file
+    can be neither replaced nor removed on Windows; generations that are no longer
+    mapped are removed by later saves.
+
+    Layout: magic, header length (u64), JSON header, arrays aligned by 64 bytes.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, path: pathlib.Path, sources: Sequence[pathlib.Path]) -> None:
+        self.__path = path
+        self.__sources = list(sources)
+
+    @classmethod
+    def for_sources(cls, sources: Sequence[pathlib.Path]) -> "IndexCache":
+        """ Returns the cache kept next to the first source.
+        """
+        return cls(sources[0].with_name(sources[0].name + ".index"), sources)
+
+    def get_generations(self) -> list[tuple[int, pathlib.Path]]:
+        """ Returns files of saved generations, the latest first.
+        """
+        generations = []
+        for path in self.__path.parent.glob(self.__path.name + ".*"):
+            suffix = path.name.removeprefix(self.__path.name + ".")
+            if suffix.isdigit():
+                generations.append((int(suffix), path))
+
+        return sorted(generations, reverse=True)
+
+    def make_key(self) -> list[dict[str, Any]]:
+        return [self.__describe(path) for path in self.__sources]
+
+    def load(self, key: list[dict[str, Any]]) -> Optional[CacheArrays]:
+        """ Returns the cached arrays of the latest generation if it was saved with the key.
+        """
+        generations = self.get_generations()
+        if len(generations) == 0:
+            return None
+
+        _, path = generations[0]
+        try:
+            with path.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if buffer[:len(_MAGIC)] != _MAGIC:
+                return None
+
+            (header_size,) = struct.unpack_from("<Q", buffer, len(_MAGIC))
+            header_begin = len(_MAGIC) + 8
+            header = json.loads(buffer[header_begin:header_begin + header_size])
+
+            if header["version"] != _VERSION or header["key"] != key:
+                return None
+
+            return {
+                name: self.__map_array(buffer, info)
+                for name, info in header["arrays"].items()
+            }
+        except (OSError, ValueError, KeyError):
+            self.logger.warning("index cache '%s' is broken and will be rebuilt", path, exc_info=True)
+            return None
+
+    def save(self, key: list[dict[str, Any]], arrays: CacheArrays) -> None:
+        header_begin = len(_MAGIC) + 8
+
+        # the header size depends on offsets, so they are computed for a header of a sufficient size
+        descriptions: dict[str, dict[str, Any]] = {}
+        reserve = 1024 + 256 * len(arrays) + len(json.dumps(key))
+        offset = self.__align(header_begin + reserve)
+        for name, values in arrays.items():
+            descriptions[name] = {
+                "dtype": values.dtype.str,
+                "shape": list(values.shape),
+                "offset": offset,
+            }
+            offset = self.__align(offset + values.nbytes)
+
+        header = json.dumps({
+            "version": _VERSION,
+            "key": key,
+            "arrays": descriptions,
+        }).encode("utf-8")
+        assert header_begin + len(header) <= self.__align(header_begin + reserve)
+
+        generations = self.get_generations()
+        generation = generations[0][0] + 1 if len(generations) > 0 else 0
+        path = self.__path.with_name(f"{self.__path.name}.{generation}")
+
+        temp = self.__path.with_name(self.__path.name + ".tmp")
+        with temp.open("wb") as file:
+            file.write(_MAGIC)
+            file.write(struct.pack("<Q", len(header)))
+            file.write(header)
+
+            for name, values in arrays.items():
+                file.seek(descriptions[name]["offset"])
+                file.write(np.ascontiguousarray(values).tobytes())
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        # the new file is never mapped yet, so it can be replaced everywhere
+        os.replace(temp, path)
+
+        # a cache of older versions is a single file without a generation
+        stales = [stale for _, stale in generations]
+        if self.__path.exists():
+            stales.append(self.__path)
+
+        for stale in stales:
+            try:
+                stale.unlink()
+            except OSError:
+                # e.g. the generation is still mapped on Windows
+                self.logger.debug("index cache '%s' is in use and is kept", stale)
+
+    def __map_array(self, buffer: mmap.mmap, info: dict[str, Any]) -> np.ndarray:
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"]))
+        if count == 0:
+            return np.empty(info["shape"], dtype=dtype)
+
+        return np.frombuffer(buffer, dtype=dtype, count=count, offset=info["offset"]).reshape(info["shape"])
+
+    def __describe(self, path: pathlib.Path) -> dict[str, Any]:
+        if not path.exists():
+            return {"path": path.name}
+
+        stat = path.stat()
+        digest = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as file:
+            digest.update(file.read(_HASH_SPAN))
+            if stat.st_size > _HASH_SPAN:
+                file.seek(max(_HASH_SPAN, stat.st_size - _HASH_SPAN))
+                digest.update(file.read(_HASH_SPAN))
+
+        return {
+            "path": path.name,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest.hexdigest(),
+        }
+
+    @staticmethod
+    def __align(offset: int) -> int:
+        return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
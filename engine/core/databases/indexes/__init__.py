@@ -0,0 +1,23 @@
+from .bk_tree_index import BKTreeWordsIndex
+from .common import (
+    DISTANCE_WEIGHTS,
+    WordsIndexBase,
+    weighted_distance,
+)
+from .length_buckets_index import LengthBucketsWordsIndex
+from .qgram_index import QGramWordsIndex
+from .scoring import WeightedScorer, select_top
+from .trie_index import TrieSearch, TrieWordsIndex
+
+__all__ = [
+    "BKTreeWordsIndex",
+    "DISTANCE_WEIGHTS",
+    "LengthBucketsWordsIndex",
+    "QGramWordsIndex",
+    "TrieSearch",
+    "TrieWordsIndex",
+    "WeightedScorer",
+    "WordsIndexBase",
+    "select_top",
+    "weighted_distance",
+]
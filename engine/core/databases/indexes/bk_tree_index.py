@@ -0,0 +1,131 @@
+import heapq
+from typing import AbstractSet, Iterable, Optional
+
+from .common import DISTANCE_WEIGHTS, WordsIndexBase, weighted_distance
+
+# reversing an edit script turns insertions into deletions and vice versa,
+# so d(b, a) <= _ASYMMETRY * d(a, b) for the weighted distance
+_ASYMMETRY = max(DISTANCE_WEIGHTS[0], DISTANCE_WEIGHTS[1]) / min(DISTANCE_WEIGHTS[0], DISTANCE_WEIGHTS[1])
+
+
+class _BKNode:
+    __slots__ = ("word", "ordinal", "alive", "children")
+
+    def __init__(self, word: str, ordinal: int) -> None:
+        self.word = word
+        self.ordinal = ordinal
+        self.alive = True
+        self.children: dict[int, _BKNode] = {}
+
+
+class BKTreeWordsIndex(WordsIndexBase):
+    """ Burkhard-Keller tree over the weighted Levenshtein distance.
+
+    A child is keyed by the distance from its word to the parent's one. As the
+    distance is not symmetric, a subtree keyed with `k` may contain a word within
+    `r` from the query only if `d(query, parent) - r <= k <= d(query, parent) + A * r`,
+    where `A` is the ratio of the deletion and insertion costs.
+
+    Removed words are kept as tombstones until they outnumber the alive ones.
+    """
+
+    def __init__(self) -> None:
+        self.__root: Optional[_BKNode] = None
+        self.__nodes: dict[str, _BKNode] = {}
+        self.__next_ordinal = 0
+        self.__dead_count = 0
+
+    def __len__(self) -> int:
+        return len(self.__nodes) - self.__dead_count
+
+    def add_word(self, word: str, order: Optional[int] = None) -> None:
+        ordinal = self.__next_ordinal if order is None else order
+        self.__next_ordinal = max(self.__next_ordinal, ordinal + 1)
+
+        if node := self.__nodes.get(word):
+            if not node.alive:
+                node.alive = True
+                self.__dead_count -= 1
+            node.ordinal = ordinal
+            return
+
+        node = _BKNode(word, ordinal)
+        self.__nodes[word] = node
+
+        if self.__root is None:
+            self.__root = node
+            return
+
+        parent = self.__root
+        while True:
+            key = weighted_distance(word, parent.word)
+            child = parent.children.get(key)
+            if child is None:
+                parent.children[key] = node
+                return
+            parent = child
+
+    def remove_word(self, word: str) -> None:
+        node = self.__nodes.get(word)
+        if node is None or not node.alive:
+            return
+
+        node.alive = False
+        self.__dead_count += 1
+
+        if self.__dead_count > len(self):
+            self.__rebuild()
+
+    def get_similar_words(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> Iterable[str]:
+        assert count > 0
+        if self.__root is None:
+            return []
+
+        # a max-heap of the best candidates: (-distance, -ordinal, word)
+        best: list[tuple[int, int, str]] = []
+        max_radius = float("inf") if max_distance is None else max_distance
+
+        def radius() -> float:
+            return min(-best[0][0], max_radius) if len(best) == count else max_radius
+
+        stack = [self.__root]
+        while stack:
+            node = stack.pop()
+            distance = weighted_distance(base, node.word)
+            self.scanned_candidates += 1
+
+            if node.alive and distance <= max_radius and node.word not in excluded:
+                item = (-distance, -node.ordinal, node.word)
+                if len(best) < count:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+            limit = radius()
+            lower, upper = distance - limit, distance + _ASYMMETRY * limit
+            children = [
+                (abs(key - distance), child)
+                for key, child in node.children.items()
+                if lower <= key <= upper
+            ]
+
+            # the closest subtrees are visited first to shrink the radius sooner
+            children.sort(key=lambda x: x[0], reverse=True)
+            stack.extend(child for _, child in children)
+
+        best.sort(reverse=True)
+        return [word for _, _, word in best]
+
+    def __rebuild(self) -> None:
+        alive = sorted(
+            (node for node in self.__nodes.values() if node.alive),
+            key=lambda node: node.ordinal,
+        )
+
+        self.__root = None
+        self.__nodes = {}
+        self.__dead_count = 0
+        self.add_words([node.word for node in alive], [node.ordinal for node in alive])
@@ -0,0 +1,56 @@
+import abc
+from typing import AbstractSet, Iterable, Optional, Sequence
+
+import Levenshtein
+
+DISTANCE_WEIGHTS = (
+    1,  # insert
+    5,  # delete
+    2,  # replace
+)
+
+
+def weighted_distance(base: str, word: str) -> int:
+    return Levenshtein.distance(base, word, weights=DISTANCE_WEIGHTS)
+
+
+class WordsIndexBase(abc.ABC):
+    """ An abstract for indexes over distinct words of a database.
+
+    NOTE: words of equal distance are ranked by their orders; a word added without
+    an order follows all words added before it.
+    """
+
+    # a total number of candidates whose distances to queries have been computed
+    scanned_candidates = 0
+
+    # an approximate index may miss some of the most similar words
+    is_exact = True
+
+    @abc.abstractmethod
+    def add_word(self, word: str, order: Optional[int] = None) -> None:
+        pass
+
+    @abc.abstractmethod
+    def remove_word(self, word: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def get_similar_words(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> Iterable[str]:
+        """ Returns up to `count` most similar words that are not farther than `max_distance`.
+
+        Excluded words are skipped as removed ones, e.g. words removed since a shared index was built.
+        """
+        pass
+
+    def add_words(self, words: Iterable[str], orders: Optional[Sequence[int]] = None) -> None:
+        if orders is None:
+            for word in words:
+                self.add_word(word)
+            return
+
+        for word, order in zip(words, orders):
+            self.add_word(word, int(order))
@@ -0,0 +1,135 @@
+import array
+from typing import AbstractSet, Iterable, Optional
+
+import numpy as np
+
+from .common import DISTANCE_WEIGHTS, WordsIndexBase
+from .scoring import WeightedScorer
+
+_INSERT, _DELETE, _ = DISTANCE_WEIGHTS
+
+
+class _Bucket:
+    __slots__ = ("words", "ordinals", "alive", "dead_count")
+
+    def __init__(self) -> None:
+        self.words: list[str] = []
+        self.ordinals = array.array("q")
+        self.alive = bytearray()
+        self.dead_count = 0
+
+
+class LengthBucketsWordsIndex(WordsIndexBase):
+    """ Words grouped by length and scanned in order of a length-based lower bound.
+
+    A word of length `L` is at least `(L - l) * insert` or `(l - L) * delete` away
+    from a base of length `l`. Buckets are scanned from the lowest bound, each by
+    one native call with the current k-th best distance as a cutoff, and the scan
+    stops at the first bucket whose bound exceeds it.
+
+    Removed words are kept as dead entries until they outnumber the alive ones of a bucket.
+    """
+
+    def __init__(self, *, scorer: WeightedScorer) -> None:
+        self.__scorer = scorer
+        self.__buckets: dict[int, _Bucket] = {}
+        self.__positions: dict[str, tuple[int, int]] = {}
+        self.__next_ordinal = 0
+
+    def __len__(self) -> int:
+        return len(self.__positions)
+
+    def add_word(self, word: str, order: Optional[int] = None) -> None:
+        if word in self.__positions:
+            self.remove_word(word)
+
+        ordinal = self.__next_ordinal if order is None else order
+        self.__next_ordinal = max(self.__next_ordinal, ordinal + 1)
+
+        bucket = self.__buckets.setdefault(len(word), _Bucket())
+        self.__positions[word] = (len(word), len(bucket.words))
+
+        bucket.words.append(word)
+        bucket.ordinals.append(ordinal)
+        bucket.alive.append(1)
+
+    def remove_word(self, word: str) -> None:
+        position = self.__positions.pop(word, None)
+        if position is None:
+            return
+
+        length, index = position
+        bucket = self.__buckets[length]
+        bucket.alive[index] = 0
+        bucket.dead_count += 1
+
+        if 2 * bucket.dead_count > len(bucket.words):
+            self.__squeeze(length, bucket)
+
+    def get_similar_words(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> Iterable[str]:
+        assert count > 0
+
+        # positions of excluded words by lengths of their buckets
+        excluded_positions: dict[int, list[int]] = {}
+        for word in excluded:
+            position = self.__positions.get(word)
+            if position is not None:
+                excluded_positions.setdefault(position[0], []).append(position[1])
+
+        # the best candidates ordered by (distance, ordinal)
+        best_distances = np.empty(0, dtype=np.int64)
+        best_ordinals = np.empty(0, dtype=np.int64)
+        best_words = np.empty(0, dtype=object)
+
+        for bound, length in sorted((self.__get_lower_bound(len(base), length), length) for length in self.__buckets):
+            cutoff = max_distance
+            if len(best_distances) == count:
+                cutoff = int(best_distances[-1]) if cutoff is None else min(cutoff, int(best_distances[-1]))
+            if cutoff is not None and bound > cutoff:
+                break
+
+            bucket = self.__buckets[length]
+            self.scanned_candidates += len(bucket.words)
+            distances = self.__scorer.get_distances([base], bucket.words, score_cutoff=cutoff)[0].astype(np.int64)
+
+            selected = np.frombuffer(bucket.alive, dtype=bool).copy()
+            selected[excluded_positions.get(length, [])] = False
+            if cutoff is not None:
+                selected &= distances <= cutoff
+
+            positions = np.flatnonzero(selected)
+            best_distances = np.concatenate([best_distances, distances[positions]])
+            best_ordinals = np.concatenate([best_ordinals, np.frombuffer(bucket.ordinals, dtype=np.int64)[positions]])
+            best_words = np.concatenate([best_words, np.array([bucket.words[x] for x in positions.tolist()], dtype=object)])
+
+            order = np.lexsort((best_ordinals, best_distances))[:count]
+            best_distances = best_distances[order]
+            best_ordinals = best_ordinals[order]
+            best_words = best_words[order]
+
+        return best_words.tolist()
+
+    @staticmethod
+    def __get_lower_bound(base_length: int, length: int) -> int:
+        if length >= base_length:
+            return (length - base_length) * _INSERT
+
+        return (base_length - length) * _DELETE
+
+    def __squeeze(self, length: int, bucket: _Bucket) -> None:
+        if bucket.dead_count == len(bucket.words):
+            del self.__buckets[length]
+            return
+
+        squeezed = _Bucket()
+        for word, ordinal, alive in zip(bucket.words, bucket.ordinals, bucket.alive):
+            if alive:
+                self.__positions[word] = (length, len(squeezed.words))
+                squeezed.words.append(word)
+                squeezed.ordinals.append(ordinal)
+                squeezed.alive.append(1)
+
+        self.__buckets[length] = squeezed
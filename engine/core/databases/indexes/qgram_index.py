@@ -0,0 +1,138 @@
+import array
+from typing import AbstractSet, Iterable, Optional
+
+import numpy as np
+
+from .common import WordsIndexBase
+from .scoring import WeightedScorer, select_top
+
+# word boundaries, so that short words and affixes have their own grams
+_BEGIN_MARK = "\x02"
+_END_MARK = "\x03"
+
+
+class QGramWordsIndex(WordsIndexBase):
+    """ An inverted index of q-grams used as a prefilter of the weighted distance scan.
+
+    A query counts grams it shares with every word, keeps `candidates` words with
+    the most shared grams and scores only them. The result is approximate: a word
+    may be close by the distance but share few grams with the query. The larger
+    `candidates` is, the closer the result is to the exact one.
+
+    Removed words are kept as dead entries until they outnumber the alive ones.
+    """
+
+    is_exact = False
+
+    def __init__(self, *, scorer: WeightedScorer, q: int, candidates: int) -> None:
+        assert q > 0 and candidates > 0
+        self.__scorer = scorer
+        self.__q = q
+        self.__candidates = candidates
+
+        # words by ids in order they were added; orders rank words of equal distance
+        self.__words: list[str] = []
+        self.__orders = array.array("q")
+        self.__next_order = 0
+        self.__alive = bytearray()
+        self.__ids: dict[str, int] = {}
+        self.__postings: dict[str, array.array] = {}
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def add_word(self, word: str, order: Optional[int] = None) -> None:
+        if word in self.__ids:
+            self.remove_word(word)
+
+        order = self.__next_order if order is None else order
+        self.__next_order = max(self.__next_order, order + 1)
+
+        word_id = len(self.__words)
+        self.__ids[word] = word_id
+        self.__words.append(word)
+        self.__orders.append(order)
+        self.__alive.append(1)
+
+        for gram in self.__get_grams(word):
+            postings = self.__postings.get(gram)
+            if postings is None:
+                postings = self.__postings[gram] = array.array("i")
+            postings.append(word_id)
+
+    def remove_word(self, word: str) -> None:
+        word_id = self.__ids.pop(word, None)
+        if word_id is None:
+            return
+
+        self.__alive[word_id] = 0
+        if 2 * len(self.__ids) < len(self.__words):
+            self.__rebuild()
+
+    def get_similar_words(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> Iterable[str]:
+        assert count > 0
+        candidates = self.__get_candidates(base, excluded)
+        if len(candidates) == 0:
+            return []
+
+        words = [self.__words[word_id] for word_id in candidates.tolist()]
+        self.scanned_candidates += len(words)
+        distances = self.__scorer.get_distances([base], words, score_cutoff=max_distance)[0]
+
+        orders = np.frombuffer(self.__orders, dtype=np.int64)[candidates]
+        top = select_top(distances, count, orders)
+        if max_distance is not None:
+            top = top[distances[top] <= max_distance]
+
+        return [words[x] for x in top.tolist()]
+
+    # ------------------| helpers
+
+    def __get_candidates(self, base: str, excluded: AbstractSet[str]) -> np.ndarray:
+        """ Returns ids of alive words sharing the most grams with the base, in ascending order.
+        """
+        alive = np.frombuffer(self.__alive, dtype=bool)
+        excluded_ids = [self.__ids[word] for word in excluded if word in self.__ids]
+        if len(excluded_ids) > 0:
+            alive = alive.copy()
+            alive[excluded_ids] = False
+
+        if len(self.__ids) - len(excluded_ids) <= self.__candidates:
+            return np.flatnonzero(alive)
+
+        postings = [
+            np.frombuffer(self.__postings[gram], dtype=np.int32)
+            for gram in self.__get_grams(base)
+            if gram in self.__postings
+        ]
+        if len(postings) > 0:
+            counts = np.bincount(np.concatenate(postings), minlength=len(self.__words))
+        else:
+            counts = np.zeros(len(self.__words), dtype=np.int64)
+
+        # dead and excluded words are ranked below any alive one
+        counts[~alive] = -1
+
+        candidates = np.argpartition(-counts, self.__candidates - 1)[:self.__candidates]
+        candidates.sort()
+        return candidates
+
+    def __get_grams(self, word: str) -> set[str]:
+        padded = _BEGIN_MARK + word + _END_MARK
+        if len(padded) <= self.__q:
+            return {padded}
+
+        return {padded[i:i + self.__q] for i in range(len(padded) - self.__q + 1)}
+
+    def __rebuild(self) -> None:
+        alive = [(word, order) for word, order, alive in zip(self.__words, self.__orders, self.__alive) if alive]
+
+        self.__words = []
+        self.__orders = array.array("q")
+        self.__alive = bytearray()
+        self.__ids = {}
+        self.__postings = {}
+        self.add_words([word for word, _ in alive], [order for _, order in alive])
@@ -0,0 +1,122 @@
+from typing import Optional, Sequence
+
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+from .common import DISTANCE_WEIGHTS
+
+# the weights of the distance from a word to a base, which equals the distance from the base to the word
+_REVERSED_WEIGHTS = (DISTANCE_WEIGHTS[1], DISTANCE_WEIGHTS[0], DISTANCE_WEIGHTS[2])
+
+# rapidfuzz splits the work among workers by queries, so a single query against
+# a long list of choices is transposed when more than one worker is allowed
+_TRANSPOSITION_THRESHOLD = 50_000
+
+# a limit for a distance matrix size of a single native call
+_MATRIX_CELLS_LIMIT = 16 * 1024 * 1024
+
+
+def select_top(distances: np.ndarray, count: int, orders: Optional[np.ndarray] = None) -> np.ndarray:
+    """ Returns positions of the `count` smallest distances ordered by the distance and the order.
+
+    NOTE: positions stand for orders if they are not given.
+    """
+    assert count > 0
+    if len(distances) <= count:
+        top = np.arange(len(distances))
+    else:
+        kth = np.partition(distances, count - 1)[count - 1]
+        better = np.flatnonzero(distances < kth)
+        equal = np.flatnonzero(distances == kth)
+        if orders is not None:
+            equal = equal[np.argsort(orders[equal], kind="stable")]
+
+        top = np.concatenate([better, equal[:count - len(better)]])
+
+    return top[np.lexsort((top if orders is None else orders[top], distances[top]))]
+
+
+class WeightedScorer:
+    """ Computes weighted Levenshtein distances for whole candidate arrays in native calls.
+    """
+
+    def __init__(self, *, workers: int = -1) -> None:
+        self.__workers = workers
+
+    def get_distances(
+        self, bases: Sequence[str], choices: Sequence[str], *,
+        score_cutoff: Optional[int] = None,
+    ) -> np.ndarray:
+        """ Returns a (bases x choices) matrix of distances.
+
+        NOTE: distances over the `score_cutoff` are reported as `score_cutoff + 1`.
+        """
+        if len(bases) == 1 and self.__workers != 1 and len(choices) >= _TRANSPOSITION_THRESHOLD:
+            distances = process.cdist(
+                choices, bases,
+                scorer=Levenshtein.distance,
+                weights=_REVERSED_WEIGHTS,
+                score_cutoff=score_cutoff,
+                dtype=np.int32,
+                workers=self.__workers,
+            )
+            return distances.T
+
+        return process.cdist(
+            bases, choices,
+            scorer=Levenshtein.distance,
+            weights=DISTANCE_WEIGHTS,
+            score_cutoff=score_cutoff,
+            dtype=np.int32,
+            workers=self.__workers,
+        )
+
+    def get_similar(
+        self, base: str, choices: Sequence[str], count: int, *,
+        mask: Optional[np.ndarray] = None,
+        max_distance: Optional[int] = None,
+        orders: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """ Returns positions of the most similar choices; choices out of the `mask` are skipped.
+
+        NOTE: choices of equal distance are ranked by their `orders` or positions.
+        """
+        if len(choices) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        distances = self.get_distances([base], choices, score_cutoff=max_distance)[0]
+        top = self.__get_masked_top(distances, count, mask, orders)
+        if max_distance is not None:
+            top = top[distances[top] <= max_distance]
+
+        return top
+
+    def get_similar_batch(
+        self, bases: Sequence[str], choices: Sequence[str], count: int, *,
+        mask: Optional[np.ndarray] = None,
+        orders: Optional[np.ndarray] = None,
+    ) -> list[np.ndarray]:
+        if len(choices) == 0:
+            return [np.empty(0, dtype=np.intp) for _ in bases]
+
+        # queries are scored by chunks to keep the distance matrix bounded
+        chunk_size = max(1, _MATRIX_CELLS_LIMIT // len(choices))
+
+        result: list[np.ndarray] = []
+        for begin in range(0, len(bases), chunk_size):
+            distances = self.get_distances(bases[begin:begin + chunk_size], choices)
+            result.extend(self.__get_masked_top(row, count, mask, orders) for row in distances)
+
+        return result
+
+    def __get_masked_top(
+        self, distances: np.ndarray, count: int,
+        mask: Optional[np.ndarray], orders: Optional[np.ndarray],
+    ) -> np.ndarray:
+        if mask is None:
+            return select_top(distances, count, orders)
+
+        distances[~mask] = np.iinfo(distances.dtype).max
+        top = select_top(distances, count, orders)
+        return top[mask[top]]
@@ -0,0 +1,319 @@
+import array
+from typing import AbstractSet, Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from .common import DISTANCE_WEIGHTS, WordsIndexBase
+from .scoring import select_top
+
+_INSERT, _DELETE, _REPLACE = DISTANCE_WEIGHTS
+
+_ROOT = 0
+_NO_ORDINAL = -1
+
+# rows of the last query characters a search keeps for erasing; the longest query only costs this many rows
+_KEPT_ROWS = 8
+# cells are kept in 16 bits, which holds distances of words up to thousands of characters
+_CELL_TYPE = np.uint16
+_MAX_CELL = int(np.iinfo(_CELL_TYPE).max)
+
+
+class _TrieLevel(NamedTuple):
+    nodes: np.ndarray
+    parents: np.ndarray
+    chars: np.ndarray
+
+
+class TrieWordsIndex(WordsIndexBase):
+    """ Prefix tree over words stored in flat arrays.
+
+    Removed words only lose their terminal mark, so node ids are never reused
+    and DP rows computed for the tree stay valid after any mutation.
+    """
+
+    def __init__(self) -> None:
+        # the root is the node 0
+        self.__parents = array.array("i", [0])
+        self.__chars = array.array("i", [0])
+        self.__depths = array.array("i", [0])
+        self.__ordinals = array.array("q", [_NO_ORDINAL])
+        self.__words: list[Optional[str]] = [None]
+
+        # the maps are only needed for mutations, so a tree loaded from arrays builds them lazily
+        self.__children: Optional[dict[tuple[int, str], int]] = {}
+        self.__terminals: Optional[dict[str, int]] = {}
+        self.__next_ordinal = 0
+
+        # numpy copies are made lazily after mutations
+        self.__depths_view: Optional[np.ndarray] = None
+        self.__levels: Optional[list[_TrieLevel]] = None
+        self.__alive: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], words: np.ndarray, orders: np.ndarray) -> "TrieWordsIndex":
+        """ Restores a tree saved by `to_arrays`; the words and their orders must be given by ascending orders.
+        """
+        trie = cls()
+        terminals = arrays["trie_terminals"]
+        assert len(terminals) == len(words) == len(orders)
+
+        ordinals = np.full(len(arrays["trie_parents"]), _NO_ORDINAL, dtype=np.int64)
+        ordinals[terminals] = orders
+
+        node_words = np.empty(len(ordinals), dtype=object)
+        node_words[terminals] = words
+
+        trie.__parents = array.array("i", arrays["trie_parents"].astype(np.int32).tobytes())
+        trie.__chars = array.array("i", arrays["trie_chars"].astype(np.int32).tobytes())
+        trie.__depths = array.array("i", arrays["trie_depths"].astype(np.int32).tobytes())
+        trie.__ordinals = array.array("q", ordinals.tobytes())
+        trie.__words = node_words.tolist()
+
+        trie.__children = None
+        trie.__terminals = None
+        trie.__next_ordinal = int(orders[-1]) + 1 if len(orders) > 0 else 0
+        return trie
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "trie_parents": np.array(self.__parents, dtype=np.int32),
+            "trie_chars": np.array(self.__chars, dtype=np.int32),
+            "trie_depths": self.depths,
+            "trie_terminals": self.get_alive_terminals().astype(np.int32),
+        }
+
+    def __len__(self) -> int:
+        return len(self.__get_terminals())
+
+    @property
+    def size(self) -> int:
+        """ A number of nodes; it never decreases.
+        """
+        return len(self.__parents)
+
+    @property
+    def depths(self) -> np.ndarray:
+        if self.__depths_view is None:
+            self.__depths_view = np.array(self.__depths, dtype=np.int32)
+
+        return self.__depths_view
+
+    def add_word(self, word: str, order: Optional[int] = None) -> None:
+        children = self.__get_children()
+        terminals = self.__get_terminals()
+
+        node = _ROOT
+        for char in word:
+            child = children.get((node, char))
+            if child is None:
+                child = self.__add_node(node, char)
+            node = child
+
+        ordinal = self.__next_ordinal if order is None else order
+        self.__ordinals[node] = ordinal
+        self.__next_ordinal = max(self.__next_ordinal, ordinal + 1)
+
+        self.__words[node] = word
+        terminals[word] = node
+        self.__alive = None
+
+    def remove_word(self, word: str) -> None:
+        node = self.__get_terminals().pop(word, None)
+        if node is not None:
+            self.__ordinals[node] = _NO_ORDINAL
+            self.__alive = None
+
+    def get_similar_words(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> Iterable[str]:
+        return TrieSearch(self).get_similar(base, count, max_distance, excluded)
+
+    def get_levels(self, nodes: Optional[np.ndarray] = None) -> list[_TrieLevel]:
+        """ Groups the nodes (all but the root by default) by their depth in ascending order.
+        """
+        if nodes is not None:
+            return self.__group_by_depth(nodes)
+
+        if self.__levels is None:
+            self.__levels = self.__group_by_depth(np.arange(1, self.size, dtype=np.int32))
+
+        return self.__levels
+
+    def get_alive_terminals(self) -> np.ndarray:
+        """ Returns terminal nodes of the words ordered by their orders.
+        """
+        if self.__alive is None:
+            ordinals = np.array(self.__ordinals, dtype=np.int64)
+            nodes = np.flatnonzero(ordinals != _NO_ORDINAL)
+            self.__alive = nodes[np.argsort(ordinals[nodes], kind="stable")]
+
+        return self.__alive
+
+    def get_terminals(self, words: Iterable[str]) -> np.ndarray:
+        """ Returns terminal nodes of the alive words among the given ones.
+        """
+        terminals = self.__get_terminals()
+        return np.array([terminals[word] for word in words if word in terminals], dtype=np.int64)
+
+    def get_words(self, nodes: np.ndarray) -> list[str]:
+        return [self.__words[node] for node in nodes.tolist()]  # type: ignore
+
+    def __add_node(self, parent: int, char: str) -> int:
+        node = len(self.__parents)
+
+        self.__parents.append(parent)
+        self.__chars.append(ord(char))
+        self.__depths.append(self.__depths[parent] + 1)
+        self.__ordinals.append(_NO_ORDINAL)
+        self.__words.append(None)
+
+        self.__get_children()[(parent, char)] = node
+        self.__depths_view = None
+        self.__levels = None
+        return node
+
+    def __get_children(self) -> dict[tuple[int, str], int]:
+        if self.__children is None:
+            self.__children = {
+                (parent, chr(char)): node
+                for node, (parent, char) in enumerate(zip(self.__parents, self.__chars))
+                if node != _ROOT
+            }
+
+        return self.__children
+
+    def __get_terminals(self) -> dict[str, int]:
+        if self.__terminals is None:
+            nodes = self.get_alive_terminals().tolist()
+            self.__terminals = {self.__words[node]: node for node in nodes}  # type: ignore
+
+        return self.__terminals
+
+    def __group_by_depth(self, nodes: np.ndarray) -> list[_TrieLevel]:
+        parents = np.array(self.__parents, dtype=np.int32)
+        chars = np.array(self.__chars, dtype=np.int32)
+
+        depths = self.depths[nodes]
+        order = np.argsort(depths, kind="stable")
+        bounds = np.flatnonzero(np.diff(depths[order])) + 1
+
+        return [
+            _TrieLevel(
+                nodes=level,
+                parents=parents[level],
+                chars=chars[level],
+            )
+            for level in np.split(nodes[order], bounds)
+            if len(level) > 0
+        ]
+
+
+class TrieSearch:
+    """ Incremental weighted Levenshtein search over a prefix tree.
+
+    Keeps DP rows of the last characters of the last query: a row holds distances
+    from the query prefix to prefixes of all nodes. A next query reuses rows of the
+    common prefix, so typing or erasing a character costs one row, i.e. O(tree size).
+    Erasing past the kept rows recomputes the prefix from the empty one.
+    Nodes added to the tree meanwhile get their cells computed on the next query.
+
+    NOTE: cells saturate at `_MAX_CELL`, so larger distances are ranked as equal.
+    """
+
+    def __init__(self, trie: TrieWordsIndex) -> None:
+        self.__trie = trie
+        self.__query = ""
+        # rows[i] belongs to the query prefix of `first + i` characters
+        self.__first = 0
+        self.__rows: list[np.ndarray] = []
+
+    def get_similar(
+        self, base: str, count: int, max_distance: Optional[int] = None,
+        excluded: AbstractSet[str] = frozenset(),
+    ) -> list[str]:
+        assert count > 0
+        self.__sync_nodes()
+
+        common = 0
+        for lhs, rhs in zip(self.__query, base):
+            if lhs != rhs:
+                break
+            common += 1
+
+        if common < self.__first:
+            self.__reset()
+
+        del self.__rows[common - self.__first + 1:]
+        for position in range(self.__first + len(self.__rows) - 1, len(base)):
+            self.__rows.append(self.__make_row(self.__rows[-1], base[position]))
+        self.__query = base
+
+        dropped = len(self.__rows) - _KEPT_ROWS
+        if dropped > 0:
+            del self.__rows[:dropped]
+            self.__first += dropped
+
+        terminals = self.__trie.get_alive_terminals()
+        if len(excluded) > 0:
+            terminals = terminals[~np.isin(terminals, self.__trie.get_terminals(excluded))]
+
+        distances = self.__rows[-1][terminals]
+        top = select_top(distances, count)
+        if max_distance is not None:
+            top = top[distances[top] <= max_distance]
+
+        return self.__trie.get_words(terminals[top])
+
+    def __reset(self) -> None:
+        self.__rows = [_saturate(self.__trie.depths * _INSERT)]
+        self.__first = 0
+        self.__query = ""
+
+    def __sync_nodes(self) -> None:
+        size = self.__trie.size
+        if len(self.__rows) == 0:
+            self.__reset()
+            return
+
+        known = len(self.__rows[0])
+        if known == size:
+            return
+
+        # cells of new nodes depend on rows of every prefix, which are not kept
+        if self.__first > 0:
+            self.__reset()
+            return
+
+        nodes = np.arange(known, size, dtype=np.int32)
+        levels = self.__trie.get_levels(nodes)
+
+        previous: Optional[np.ndarray] = None
+        for position, row in enumerate(self.__rows):
+            row = np.concatenate([row.astype(np.int32), np.empty(size - known, dtype=np.int32)])
+            if previous is None:
+                row[nodes] = self.__trie.depths[nodes] * _INSERT
+            else:
+                self.__fill_row(row, previous, self.__query[position - 1], levels)
+
+            self.__rows[position] = _saturate(row)
+            previous = row
+
+    def __make_row(self, previous: np.ndarray, char: str) -> np.ndarray:
+        previous = previous.astype(np.int32)
+        row = np.empty_like(previous)
+        row[_ROOT] = previous[_ROOT] + _DELETE
+        self.__fill_row(row, previous, char, self.__trie.get_levels())
+        return _saturate(row)
+
+    def __fill_row(self, row: np.ndarray, previous: np.ndarray, char: str, levels: list[_TrieLevel]) -> None:
+        code = ord(char)
+        for level in levels:
+            replace = previous[level.parents] + np.where(level.chars == code, 0, _REPLACE)
+            delete = previous[level.nodes] + _DELETE
+            insert = row[level.parents] + _INSERT
+            row[level.nodes] = np.minimum(np.minimum(replace, delete), insert)
+
+
+def _saturate(row: np.ndarray) -> np.ndarray:
+    return np.minimum(row, _MAX_CELL).astype(_CELL_TYPE)
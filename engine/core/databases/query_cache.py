@@ -0,0 +1,147 @@
+import collections
+import dataclasses
+import enum
+import threading
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from .indexes import weighted_distance
+
+# checking every cached query against more added words costs more than recomputing them
+_MAX_CHECKED_WORDS = 64
+
+
+class QueryKind(str, enum.Enum):
+    WORDS = "words"
+    FORMS = "forms"
+
+
+class QueryKey(NamedTuple):
+    kind: QueryKind
+    exact: bool  # exact and approximate results of a query differ, so they are cached apart
+    word: str  # empty for word queries
+    base: str
+    count: int
+    max_distance: Optional[int] = None
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class QueryCacheStats:
+    hits: int
+    misses: int
+    invalidations: int
+    size: int
+    generation: int
+
+
+@dataclasses.dataclass(kw_only=True)
+class _Entry:
+    variants: list[str]
+    bound: int  # a distance of the last variant
+
+
+class QueryCache:
+    """ LRU cache of similarity query results.
+
+    Every change bumps the generation; a result computed at an older generation is
+    not cached, as the change may have happened while it was computed. A change only
+    invalidates queries it may affect:
+    - an added word, queries of words that it is closer to than their last variant;
+    - a removed word, queries of words that it is a variant of;
+    - a changed form, queries of forms of its word.
+    """
+
+    def __init__(self, *, max_size: int) -> None:
+        self.__max_size = max_size
+        self.__mutex = threading.Lock()
+        self.__entries: collections.OrderedDict[QueryKey, _Entry] = collections.OrderedDict()
+        self.__generation = 0
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self.__generation
+
+    def get_stats(self) -> QueryCacheStats:
+        with self.__mutex:
+            return QueryCacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                invalidations=self.__invalidations,
+                size=len(self.__entries),
+                generation=self.__generation,
+            )
+
+    def get_or_compute(self, key: QueryKey, compute: Callable[[], Iterable[str]]) -> list[str]:
+        with self.__mutex:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return list(entry.variants)
+
+            self.__misses += 1
+            generation = self.__generation
+
+        variants = list(compute())
+        bound = weighted_distance(key.base, variants[-1]) if len(variants) > 0 else 0
+
+        with self.__mutex:
+            if generation == self.__generation and self.__max_size > 0:
+                self.__entries[key] = _Entry(variants=variants, bound=bound)
+                self.__entries.move_to_end(key)
+                if len(self.__entries) > self.__max_size:
+                    self.__entries.popitem(last=False)
+
+        return list(variants)
+
+    def invalidate(self, *, added_words: list[str], removed_words: list[str], changed_words: Iterable[str]) -> None:
+        """ Drops queries that are affected by the change; the words are given as they were changed.
+        """
+        removed = set(removed_words)
+        changed = set(changed_words)
+
+        with self.__mutex:
+            self.__generation += 1
+
+            stale = [
+                key for key, entry in self.__entries.items()
+                if self.__is_affected(key, entry, added_words, removed, changed)
+            ]
+            for key in stale:
+                del self.__entries[key]
+
+            self.__invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self.__mutex:
+            self.__generation += 1
+            self.__invalidations += len(self.__entries)
+            self.__entries.clear()
+
+    @staticmethod
+    def __is_affected(
+        key: QueryKey, entry: _Entry,
+        added_words: list[str], removed_words: set[str], changed_words: set[str],
+    ) -> bool:
+        match key.kind:
+            case QueryKind.FORMS:
+                return key.word in changed_words
+            case QueryKind.WORDS:
+                if any(variant in removed_words for variant in entry.variants):
+                    return True
+                if len(added_words) == 0:
+                    return False
+                if len(added_words) > _MAX_CHECKED_WORDS:
+                    return True
+
+                # added words come after the known ones, so they lose ties
+                if len(entry.variants) == key.count:
+                    return any(weighted_distance(key.base, word) < entry.bound for word in added_words)
+                if key.max_distance is not None:
+                    return any(weighted_distance(key.base, word) <= key.max_distance for word in added_words)
+                return True
+            case _:
+                raise NotImplementedError()
@@ -0,0 +1,207 @@
+import argparse
+import dataclasses
+import logging
+import pathlib
+import socketserver
+import threading
+from typing import Any, Callable, Optional
+
+from engine.core.protocols.words_databse_protocol import WordDatabaseProtocol, WordFormInfo
+
+from .remote_protocol import RemoteAddress, connect, encode_frame, read_frame
+
+_LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class _Method:
+    call: Callable[..., Any]
+    is_write: bool
+
+
+def _commit(database: WordDatabaseProtocol, changes: list[list[str]]) -> None:
+    with database.batch():
+        for kind, word, form, *description in changes:
+            match kind:
+                case "upsert":
+                    database.update_word_form(WordFormInfo(word=word, form=form, description=description[0]))
+                case "delete":
+                    database.delete_word_form(word, form)
+                case _:
+                    raise ValueError(f"unknown change '{kind}'")
+
+
+def _get_word_form_info(database: WordDatabaseProtocol, word: str, form: str) -> Optional[dict[str, str]]:
+    info = database.get_word_form_info(word, form)
+    return dataclasses.asdict(info) if info is not None else None
+
+
+_METHODS: dict[str, _Method] = {
+    "get_similar_words": _Method(
+        call=lambda db, base, count, max_distance: list(db.get_similar_words(base, count, max_distance)),
+        is_write=False,
+    ),
+    "get_similar_words_batch": _Method(
+        call=lambda db, bases, count: [list(x) for x in db.get_similar_words_batch(bases, count)],
+        is_write=False,
+    ),
+    "get_similar_forms": _Method(
+        call=lambda db, word, base, count, max_distance: list(db.get_similar_forms(word, base, count, max_distance)),
+        is_write=False,
+    ),
+    "get_word_form_info": _Method(call=_get_word_form_info, is_write=False),
+    "get_forms": _Method(call=lambda db, word: list(db.get_forms(word)), is_write=False),
+    "commit": _Method(call=_commit, is_write=True),
+}
+
+
+class QueryServer:
+    """ Serves one database to many local clients, see `RemoteWordDatabase`.
+
+    Every connection is served by its own thread; requests of a connection are
+    answered in order they were sent, so a client may pipeline them. Queries run
+    concurrently with each other and with changes, which are applied one at a time.
+
+    NOTE: the database must serve queries from many threads, as `WordsDatabase` does.
+
+    Frames are length-prefixed JSON documents:
+    - a request: {"id": int, "method": str, "args": list};
+    - a response: {"id": int, "result": any} or {"id": int, "error": {"kind": str, "message": str}}.
+
+    NOTE: a TCP server only listens on the loopback interface.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, *, database: WordDatabaseProtocol, address: RemoteAddress) -> None:
+        self.__database = database
+        self.__write_lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+
+        handler = self.__make_handler(address)
+        if isinstance(address, pathlib.Path):
+            self.__remove_stale_socket(address)
+            self.__server: socketserver.BaseServer = socketserver.ThreadingUnixStreamServer(str(address), handler)
+        else:
+            if address[0] not in _LOOPBACK_HOSTS:
+                raise ValueError(f"the server can only listen on a loopback host, not '{address[0]}'")
+            self.__server = socketserver.ThreadingTCPServer(address, handler)
+
+        self.__server.daemon_threads = True  # type: ignore
+        self.__address = address
+
+    @property
+    def address(self) -> RemoteAddress:
+        """ The address clients connect to; a TCP port 0 is resolved to the bound one.
+        """
+        if isinstance(self.__address, pathlib.Path):
+            return self.__address
+
+        host, port, *_ = self.__server.server_address  # type: ignore
+        return (host, port)
+
+    def serve_forever(self) -> None:
+        self.logger.info("query server is listening on '%s'", self.address)
+        self.__server.serve_forever()
+
+    def start(self) -> None:
+        """ Serves requests from a background thread.
+        """
+        assert self.__thread is None
+        self.__thread = threading.Thread(target=self.serve_forever, name="words-query-server", daemon=True)
+        self.__thread.start()
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+
+        self.__server.server_close()
+        if isinstance(self.__address, pathlib.Path):
+            self.__address.unlink(missing_ok=True)
+
+    def handle_request(self, request: Any) -> dict[str, Any]:
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            method = _METHODS.get(request["method"])
+            if method is None:
+                raise ValueError(f"unknown method '{request['method']}'")
+
+            if method.is_write:
+                with self.__write_lock:
+                    result = method.call(self.__database, *request["args"])
+            else:
+                result = method.call(self.__database, *request["args"])
+
+            return {"id": request_id, "result": result}
+        except Exception as error:
+            self.logger.debug("request '%s' has failed", request_id, exc_info=True)
+            return {"id": request_id, "error": {"kind": type(error).__name__, "message": str(error)}}
+
+    # ------------------| helpers
+
+    def __make_handler(self, address: RemoteAddress) -> type[socketserver.StreamRequestHandler]:
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            # answers are small and must not wait for more data
+            disable_nagle_algorithm = not isinstance(address, pathlib.Path)
+
+            def handle(self) -> None:
+                try:
+                    while (request := read_frame(self.rfile)) is not None:
+                        self.wfile.write(encode_frame(server.handle_request(request)))
+                except (ConnectionError, ValueError):
+                    server.logger.info("a client connection is dropped", exc_info=True)
+
+        return Handler
+
+    @staticmethod
+    def __remove_stale_socket(path: pathlib.Path) -> None:
+        if not path.exists():
+            return
+
+        try:
+            connect(path, timeout=1.0).close()
+        except OSError:
+            path.unlink()
+            return
+
+        raise OSError(f"'{path}' is served by another server")
+
+
+def main() -> None:
+    """ Runs a server of a database: python -m engine.core.databases.query_server {csv,journal,sqlite} PATH ...
+    """
+    from engine import Engine
+
+    parser = argparse.ArgumentParser(description="Serves a words database to local clients.")
+    parser.add_argument("storage", choices=["csv", "journal", "sqlite"])
+    parser.add_argument("path", type=pathlib.Path)
+    listen = parser.add_mutually_exclusive_group(required=True)
+    listen.add_argument("--unix", type=pathlib.Path, help="a Unix socket path")
+    listen.add_argument("--port", type=int, help="a localhost TCP port")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    engine = Engine()
+    open_database = {
+        "csv": engine.open_csv_database,
+        "journal": engine.open_journal_database,
+        "sqlite": engine.open_sqlite_database,
+    }[args.storage]
+
+    address: RemoteAddress = args.unix if args.unix is not None else ("127.0.0.1", args.port)
+    server = QueryServer(database=open_database(args.path), address=address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
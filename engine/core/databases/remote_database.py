@@ -0,0 +1,216 @@
+import contextlib
+import itertools
+import queue
+import socket
+import threading
+from typing import IO, Any, Iterable, Iterator, Optional, Sequence
+
+from engine.core.protocols.words_databse_protocol import (
+    WordDatabaseProtocol,
+    WordFormInfo,
+    WordSearchSessionProtocol,
+)
+
+from .remote_protocol import RemoteAddress, RemoteDatabaseError, connect, encode_frame, read_frame
+
+# a method name and its arguments
+RemoteCall = tuple[str, Sequence[Any]]
+
+
+class _Connection:
+    __slots__ = ("socket", "stream")
+
+    def __init__(self, address: RemoteAddress, timeout: Optional[float]) -> None:
+        self.socket = connect(address, timeout)
+        self.stream: IO[bytes] = self.socket.makefile("rb")
+
+    def close(self) -> None:
+        self.stream.close()
+        self.socket.close()
+
+
+class RemoteWordDatabase(WordDatabaseProtocol):
+    """ A client of a database served by `QueryServer`.
+
+    Connections are pooled, so threads of a client make requests in parallel; calls
+    given to `pipeline` are sent at once and answered in order over one connection.
+
+    NOTE: changes of a batch are collected by the client and sent in one request.
+    """
+
+    def __init__(self, *, address: RemoteAddress, max_connections: int = 4, timeout: Optional[float] = None) -> None:
+        assert max_connections > 0
+        self.__address = address
+        self.__timeout = timeout
+
+        self.__slots = threading.BoundedSemaphore(max_connections)
+        self.__idle = queue.LifoQueue[_Connection]()
+        self.__request_ids = itertools.count()
+
+        # changes of a batch open by the thread: ["upsert", word, form, description] or ["delete", word, form]
+        self.__local = threading.local()
+
+    def pipeline(self, calls: Iterable[RemoteCall]) -> list[Any]:
+        """ Sends the calls over one connection without waiting for answers; returns their results in order.
+        """
+        requests = [
+            {"id": next(self.__request_ids), "method": method, "args": list(args)}
+            for method, args in calls
+        ]
+        if len(requests) == 0:
+            return []
+
+        with self.__connection() as connection:
+            if len(requests) == 1:
+                connection.socket.sendall(encode_frame(requests[0]))
+                responses = [read_frame(connection.stream)]
+            else:
+                responses = self.__exchange(connection, requests)
+
+        results: list[Any] = []
+        for request, response in zip(requests, responses):
+            if response is None or response.get("id") != request["id"]:
+                raise ConnectionError("the server has closed the connection or answered out of order")
+            if "error" in response:
+                raise RemoteDatabaseError(response["error"]["kind"], response["error"]["message"])
+            results.append(response["result"])
+
+        return results
+
+    def close(self) -> None:
+        """ Closes idle connections; connections in use are closed once they are returned.
+        """
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return self.__call("get_similar_words", base, count, max_distance)
+
+    def get_similar_words_batch(self, bases: Iterable[str], count: int) -> Iterable[Iterable[str]]:
+        return self.__call("get_similar_words_batch", list(bases), count)
+
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return self.__call("get_similar_forms", word, base, count, max_distance)
+
+    def open_search_session(self) -> WordSearchSessionProtocol:
+        return _RemoteSearchSession(self)
+
+    def get_word_form_info(self, word: str, form: str) -> Optional[WordFormInfo]:
+        info = self.__call("get_word_form_info", word, form)
+        return WordFormInfo(**info) if info is not None else None
+
+    def get_forms(self, word: str) -> Iterable[str]:
+        return self.__call("get_forms", word)
+
+    def update_word_form(self, info: WordFormInfo) -> None:
+        self.update_word_forms([info])
+
+    def delete_word_form(self, word: str, form: str) -> None:
+        self.delete_word_forms([(word, form)])
+
+    def update_word_forms(self, infos: Iterable[WordFormInfo]) -> None:
+        with self.batch():
+            self.__local.batch.extend(["upsert", info.word, info.form, info.description] for info in infos)
+
+    def delete_word_forms(self, keys: Iterable[tuple[str, str]]) -> None:
+        with self.batch():
+            self.__local.batch.extend(["delete", word, form] for word, form in keys)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """ Collects changes and sends them at once on exit of the outermost batch.
+
+        NOTE: a batch collects changes of the thread that has opened it.
+        """
+        changes: Optional[list[list[str]]] = getattr(self.__local, "batch", None)
+        if changes is not None:
+            size = len(changes)
+            try:
+                yield
+            except BaseException:
+                del changes[size:]
+                raise
+            return
+
+        changes = self.__local.batch = []
+        try:
+            yield
+        finally:
+            self.__local.batch = None
+
+        if len(changes) > 0:
+            self.__call("commit", changes)
+
+    # ------------------| helpers
+
+    def __call(self, method: str, *args: Any) -> Any:
+        return self.pipeline([(method, args)])[0]
+
+    @staticmethod
+    def __exchange(connection: _Connection, requests: list[dict[str, Any]]) -> list[Any]:
+        """ Sends the requests while a thread reads their answers; returns the answers.
+
+        The server answers while it reads requests, so a client that stopped reading
+        would block both sides on full socket buffers, whatever sizes frames have.
+        """
+        responses: list[Any] = []
+        failures: list[BaseException] = []
+
+        def read() -> None:
+            try:
+                while len(responses) < len(requests):
+                    responses.append(read_frame(connection.stream))
+            except BaseException as error:
+                failures.append(error)
+
+        reader = threading.Thread(target=read, name="remote-database-reader", daemon=True)
+        reader.start()
+        try:
+            for request in requests:
+                connection.socket.sendall(encode_frame(request))
+        except BaseException:
+            # the reader is woken up by the shut connection, which is closed then
+            with contextlib.suppress(OSError):
+                connection.socket.shutdown(socket.SHUT_RDWR)
+            reader.join()
+            raise
+
+        reader.join()
+        if len(failures) > 0:
+            raise failures[0]
+
+        return responses
+
+    @contextlib.contextmanager
+    def __connection(self) -> Iterator[_Connection]:
+        with self.__slots:
+            try:
+                connection = self.__idle.get_nowait()
+            except queue.Empty:
+                connection = _Connection(self.__address, self.__timeout)
+
+            try:
+                yield connection
+            except BaseException:
+                # the connection may have unread responses, so it cannot be reused
+                connection.close()
+                raise
+
+            self.__idle.put(connection)
+
+
+class _RemoteSearchSession(WordSearchSessionProtocol):
+    """ A session of a remote database; results are cached by the server.
+    """
+
+    def __init__(self, database: RemoteWordDatabase) -> None:
+        self.__database = database
+
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return self.__database.get_similar_words(base, count, max_distance)
+
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return self.__database.get_similar_forms(word, base, count, max_distance)
@@ -0,0 +1,61 @@
+import json
+import pathlib
+import socket
+import struct
+from typing import Any, Optional
+
+# a Unix socket path or a (host, port) of a localhost TCP socket
+RemoteAddress = pathlib.Path | tuple[str, int]
+
+# a frame is a big-endian u32 size followed by a UTF-8 JSON document
+_HEADER = struct.Struct(">I")
+_MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class RemoteDatabaseError(RuntimeError):
+    """ An error raised by the server while it was serving a request.
+    """
+
+    def __init__(self, kind: str, message: str) -> None:
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+
+def connect(address: RemoteAddress, timeout: Optional[float] = None) -> socket.socket:
+    if isinstance(address, pathlib.Path):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(str(address))
+    else:
+        connection = socket.create_connection(address, timeout=timeout)
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    return connection
+
+
+def encode_frame(message: Any) -> bytes:
+    payload = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(payload) > _MAX_FRAME_SIZE:
+        raise ValueError(f"a frame of {len(payload)} bytes is too large")
+
+    return _HEADER.pack(len(payload)) + payload
+
+
+def read_frame(stream: Any) -> Optional[Any]:
+    """ Reads a frame from a buffered binary stream; returns None at the end of the stream.
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) == 0:
+        return None
+    if len(header) < _HEADER.size:
+        raise ConnectionError("a frame header is truncated")
+
+    (size,) = _HEADER.unpack(header)
+    if size > _MAX_FRAME_SIZE:
+        raise ConnectionError(f"a frame of {size} bytes is too large")
+
+    payload = stream.read(size)
+    if len(payload) < size:
+        raise ConnectionError("a frame is truncated")
+
+    return json.loads(payload)
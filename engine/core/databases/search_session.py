@@ -0,0 +1,74 @@
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+import numpy as np
+
+from engine.core.protocols.words_databse_protocol import WordSearchSessionProtocol
+
+from .indexes import TrieSearch, TrieWordsIndex
+from .query_cache import QueryCache, QueryKey, QueryKind
+from .vocabulary import VocabularySnapshot
+
+if TYPE_CHECKING:
+    from engine.core.system import Instrumentation
+
+_INSTRUMENTED_METHODS = ("get_similar_words", "get_similar_forms")
+
+
+class WordsSearchSession(WordSearchSessionProtocol):
+    """ Search session that keeps DP rows of the last word and form queries.
+
+    NOTE: results are shared with the database through its query cache.
+    NOTE: the words trie is changed in place by the database, so a query holds its mutex;
+    a session keeps rows of its own queries and belongs to one thread.
+    """
+
+    def __init__(
+        self, *,
+        words_trie: TrieWordsIndex, trie_mutex: threading.Lock,
+        get_vocabulary: Callable[[], VocabularySnapshot], query_cache: QueryCache,
+        instrumentation: Optional["Instrumentation"] = None,
+    ) -> None:
+        self.__get_vocabulary = get_vocabulary
+        self.__query_cache = query_cache
+        self.__trie_mutex = trie_mutex
+        self.__words_search = TrieSearch(words_trie)
+
+        self.__forms: Optional[np.ndarray] = None
+        self.__forms_search: Optional[TrieSearch] = None
+
+        if instrumentation is not None:
+            # queries of sessions are told apart from the ones of the database
+            for name in _INSTRUMENTED_METHODS:
+                setattr(self, name, instrumentation.wrap(f"session.{name}", getattr(self, name)))
+
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        key = QueryKey(kind=QueryKind.WORDS, exact=True, word="", base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar_words(base, count, max_distance),
+        )
+
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        key = QueryKey(kind=QueryKind.FORMS, exact=True, word=word, base=base, count=count, max_distance=max_distance)
+        return self.__query_cache.get_or_compute(
+            key, lambda: self.__get_similar_forms(word, base, count, max_distance),
+        )
+
+    def __get_similar_words(self, base: str, count: int, max_distance: Optional[int]) -> Iterable[str]:
+        with self.__trie_mutex:
+            return self.__words_search.get_similar(base, count, max_distance)
+
+    def __get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int]) -> Iterable[str]:
+        forms = self.__get_vocabulary().get_forms(word)
+        if len(forms) == 0:
+            return []
+
+        # a snapshot returns the same form array until the word is changed
+        if self.__forms_search is None or self.__forms is not forms:
+            forms_trie = TrieWordsIndex()
+            forms_trie.add_words(forms)
+
+            self.__forms = forms
+            self.__forms_search = TrieSearch(forms_trie)
+
+        return self.__forms_search.get_similar(base, count, max_distance)
@@ -1,8 +1,95 @@
 import abc
+import dataclasses
+import enum
+import pathlib
+from typing import Callable, Iterator, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 import pydantic
 
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+
+class DumpFields:
+    DESCRIPTION = "__desc__"
+    FORM = "__form__"
+    WORD = "__word__"
+
+
+class StorageChangeKind(str, enum.Enum):
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class StorageChange:
+    kind: StorageChangeKind
+    word: str
+    form: str
+    description: str = ""
+
+
+class DescriptionsReader(abc.ABC):
+    """ Reads descriptions of rows of a dump on demand.
+    """
+
+    @abc.abstractmethod
+    def read_description(self, row: int) -> str:
+        pass
+
+    def locate_description(self, row: int) -> tuple["DescriptionsReader", int]:
+        """ Returns the reader and its row the description is kept at.
+
+        NOTE: a storage copies descriptions kept by its own reader verbatim.
+        """
+        return self, row
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class LazyDump:
+    """ A dump whose descriptions are read from a storage on demand.
+
+    Storages write it row by row, so every description is never held in memory at once.
+    """
+
+    keys: pd.DataFrame  # words and forms
+    reader: DescriptionsReader
+    source_rows: np.ndarray  # rows of the reader; -1 for descriptions kept in `changed`
+    changed: dict[int, str]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get_description(self, row: int) -> str:
+        description = self.changed.get(row)
+        if description is not None:
+            return description
+
+        return self.reader.read_description(int(self.source_rows[row]))
+
+    def locate_description(self, row: int) -> tuple[DescriptionsReader, int] | str:
+        """ Returns a description kept in memory or the reader and its row the description is kept at.
+        """
+        description = self.changed.get(row)
+        if description is not None:
+            return description
+
+        return self.reader.locate_description(int(self.source_rows[row]))
+
+    def to_frame(self) -> pd.DataFrame:
+        """ Reads every description; for storages that cannot write rows one by one.
+        """
+        frame = self.keys.copy()
+        frame[DumpFields.DESCRIPTION] = [self.get_description(row) for row in range(len(self))]
+        return frame
+
+
+Dump = pd.DataFrame | LazyDump
+
+# builds the dump on demand, so storages that persist changes alone never pay for it
+DumpProvider = Callable[[], Dump]
+
 
 @pydantic.dataclasses.dataclass(kw_only=True)
 class StorageBase(abc.ABC):
@@ -11,5 +98,62 @@ class StorageBase(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def save_dump(self, dump: pd.DataFrame) -> None:
+    def save_dump(self, dump: Dump) -> None:
+        pass
+
+    def save_changes(self, dump: DumpProvider, changes: Sequence[StorageChange]) -> None:
+        """ Persists the dump after the changes have been applied to it.
+
+        NOTE: storages that can persist the changes alone should override the method.
+        """
+        self.save_dump(dump())
+
+    def read_keys(self) -> Optional[tuple[pd.DataFrame, DescriptionsReader]]:
+        """ Reads words and forms of the dump and a reader of their descriptions.
+
+        NOTE: None means that the storage cannot read descriptions lazily.
+        """
+        return None
+
+    def get_source_paths(self) -> Sequence[pathlib.Path]:
+        """ Returns files the dump is read from; caches derived from the dump are keyed by them.
+
+        NOTE: an empty list means that the storage cannot be used as a key of caches.
+        """
+        return []
+
+
+@pydantic.dataclasses.dataclass(kw_only=True)
+class RowStorageBase(StorageBase):
+    """ An abstract for storages that can read and write single rows.
+    """
+
+    @abc.abstractmethod
+    def upsert_row(self, info: WordFormInfo) -> None:
+        pass
+
+    @abc.abstractmethod
+    def delete_row(self, word: str, form: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def iter_rows(self) -> Iterator[WordFormInfo]:
+        pass
+
+    @abc.abstractmethod
+    def read_forms(self, word: str) -> list[WordFormInfo]:
         pass
+
+    def save_changes(self, dump: DumpProvider, changes: Sequence[StorageChange]) -> None:
+        for change in changes:
+            match change.kind:
+                case StorageChangeKind.UPSERT:
+                    self.upsert_row(WordFormInfo(
+                        description=change.description,
+                        form=change.form,
+                        word=change.word,
+                    ))
+                case StorageChangeKind.DELETE:
+                    self.delete_row(change.word, change.form)
+                case _:
+                    raise NotImplementedError()
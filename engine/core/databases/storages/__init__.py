@@ -1,8 +1,26 @@
-from .common import StorageBase
+from .common import (
+    DescriptionsReader,
+    LazyDump,
+    RowStorageBase,
+    StorageBase,
+    StorageChange,
+    StorageChangeKind,
+)
 from .csv_storage import CSVStorage, CSVStorageOptions
+from .journal_storage import JournalStorage, JournalStorageOptions
+from .sqlite_storage import SQLiteStorage, SQLiteStorageOptions
 
 __all__ = [
     "CSVStorage",
     "CSVStorageOptions",
+    "DescriptionsReader",
+    "JournalStorage",
+    "JournalStorageOptions",
+    "LazyDump",
+    "RowStorageBase",
+    "SQLiteStorage",
+    "SQLiteStorageOptions",
     "StorageBase",
+    "StorageChange",
+    "StorageChangeKind",
 ]
@@ -1,5 +1,23 @@
-from engine.core.databases.storage_base import StorageBase
+from engine.core.databases.storage_base import (
+    DescriptionsReader,
+    Dump,
+    DumpFields,
+    DumpProvider,
+    LazyDump,
+    RowStorageBase,
+    StorageBase,
+    StorageChange,
+    StorageChangeKind,
+)
 
 __all__ = [
+    "DescriptionsReader",
+    "Dump",
+    "DumpFields",
+    "DumpProvider",
+    "LazyDump",
+    "RowStorageBase",
     "StorageBase",
+    "StorageChange",
+    "StorageChangeKind",
 ]
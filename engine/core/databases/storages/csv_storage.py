@@ -1,10 +1,79 @@
+import io
+import mmap
+import os
 import pathlib
+import threading
 from dataclasses import InitVar
+from typing import Callable, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 import pydantic
 
-from .common import StorageBase
+from .common import DescriptionsReader, Dump, DumpFields, LazyDump, StorageBase
+
+_QUOTE = ord('"')
+_NEWLINE = ord("\n")
+_RETURN = ord("\r")
+_SCAN_CHUNK = 4 * 1024 * 1024
+_WRITE_CHUNK = 64 * 1024  # rows
+
+
+class _CSVDescriptionsReader(DescriptionsReader):
+    """ Reads descriptions from a memory-mapped file by offsets of their fields.
+
+    Rows are the ones of the file that has been read. Once the storage replaces the
+    file, the reader maps the new one and the offsets its rows have been copied to;
+    rows that have not been copied cannot be read any more.
+    """
+
+    def __init__(self, path: pathlib.Path, offsets: np.ndarray) -> None:
+        self.__mutex = threading.Lock()
+        self.__path = path
+        self.__buffer: Optional[mmap.mmap] = _map_file(path)
+        self.__offsets = offsets
+
+    def read_description(self, row: int) -> str:
+        field = self.read_field(row)
+        if field.startswith(b'"'):
+            field = field[1:-1].replace(b'""', b'"')
+
+        # the same as universal newlines of `read_dump`
+        return field.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    def read_field(self, row: int) -> bytes:
+        """ Returns the field of the description as it is written in the file.
+        """
+        with self.__mutex:
+            begin, end = self.__offsets[row]
+            if self.__buffer is None or begin < 0:
+                raise ValueError(f"the description of the row {row} is not in '{self.__path}' any more")
+
+            return self.__buffer[begin:end]
+
+    def get_size(self) -> int:
+        return len(self.__offsets)
+
+    def replace_file(self, replace: Callable[[], None], offsets: Optional[np.ndarray]) -> None:
+        """ Lets the file be replaced and maps the new one; None offsets detach the reader.
+
+        NOTE: a mapped file cannot be replaced on Windows, so the mapping is closed first.
+        """
+        with self.__mutex:
+            if self.__buffer is not None:
+                self.__buffer.close()
+                self.__buffer = None
+
+            try:
+                replace()
+            except BaseException:
+                # the old file is still in place
+                self.__buffer = _map_file(self.__path)
+                raise
+
+            if offsets is not None:
+                self.__buffer = _map_file(self.__path)
+                self.__offsets = offsets
 
 
 @pydantic.dataclasses.dataclass(kw_only=True)
@@ -21,12 +90,178 @@ class CSVStorage(StorageBase):
         self.__options = options
         self.__sep = "\t"
 
+        # the reader of the last `read_keys`; it is remapped whenever the file is replaced
+        self.__reader: Optional[_CSVDescriptionsReader] = None
+
     def read_dump(self) -> pd.DataFrame | None:
         if not self.__options.path.exists():
             return None
 
+        # values are kept verbatim: no numbers, no NaN for empty descriptions or words like "null"
         with self.__options.path.open("r", encoding=self.__encoding) as file:
-            return pd.read_csv(file, sep=self.__sep)
+            return pd.read_csv(file, sep=self.__sep, dtype=str, keep_default_na=False)
+
+    def save_dump(self, dump: Dump) -> None:
+        # the dump is written aside and then renamed, so a crash never leaves a truncated file
+        path = self.__options.path
+        temp = path.with_name(path.name + ".tmp")
+
+        offsets: Optional[np.ndarray] = None
+        if isinstance(dump, LazyDump):
+            with temp.open("wb") as file:
+                offsets = self.__write_lazy_dump(file, dump)
+                file.flush()
+                os.fsync(file.fileno())
+        else:
+            with temp.open("w", encoding=self.__encoding, newline="") as file:
+                dump.to_csv(file, sep=self.__sep, index=False)
+                file.flush()
+                os.fsync(file.fileno())
+
+        if self.__reader is None:
+            os.replace(temp, path)
+        else:
+            # rows of a written frame are unknown to the reader, so it is detached
+            self.__reader.replace_file(lambda: os.replace(temp, path), offsets)
+
+    def read_keys(self) -> Optional[tuple[pd.DataFrame, DescriptionsReader]]:
+        path = self.__options.path
+        if not path.exists() or path.stat().st_size == 0:
+            return None
+
+        with path.open("r", encoding=self.__encoding) as file:
+            keys = pd.read_csv(
+                file, sep=self.__sep, dtype=str, keep_default_na=False,
+                usecols=[DumpFields.WORD, DumpFields.FORM],
+            )
+
+        buffer = _map_file(path)
+        try:
+            offsets = self.__find_descriptions(buffer)
+        finally:
+            buffer.close()
+
+        if offsets is None or len(offsets) != len(keys):
+            # the file is not written the way `save_dump` writes it
+            return None
+
+        if self.__reader is not None:
+            # rows of the previous reader are not tracked any more
+            self.__reader.replace_file(lambda: None, None)
+
+        self.__reader = _CSVDescriptionsReader(path, offsets)
+        return keys, self.__reader
+
+    def get_source_paths(self) -> Sequence[pathlib.Path]:
+        return [self.__options.path]
+
+    def __write_lazy_dump(self, file: io.BufferedWriter, dump: LazyDump) -> np.ndarray:
+        """ Writes the dump as `to_csv` does; returns new offsets of the reader's rows.
+
+        Descriptions kept by the reader are copied from its file verbatim; rows that are
+        not written get (-1, -1) offsets.
+        """
+        reader = self.__reader
+        offsets = np.full((0 if reader is None else reader.get_size(), 2), -1, dtype=np.int64)
+
+        linesep = os.linesep.encode()
+        separator = self.__sep.encode()
+        header = separator.join(
+            field.encode(self.__encoding)
+            for field in [DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]
+        )
+        file.write(header + linesep)
+        position = len(header) + len(linesep)
+
+        words = dump.keys[DumpFields.WORD].tolist()
+        forms = dump.keys[DumpFields.FORM].tolist()
+        for begin in range(0, len(dump), _WRITE_CHUNK):
+            lines: list[bytes] = []
+            for row in range(begin, min(begin + _WRITE_CHUNK, len(dump))):
+                prefix = self.__encode_field(words[row]) + separator + self.__encode_field(forms[row]) + separator
+
+                located = dump.locate_description(row)
+                if isinstance(located, str):
+                    field = self.__encode_field(located)
+                elif located[0] is reader:
+                    assert reader is not None
+                    field = reader.read_field(located[1])
+                    offsets[located[1]] = (position + len(prefix), position + len(prefix) + len(field))
+                else:
+                    field = self.__encode_field(located[0].read_description(located[1]))
+
+                line = prefix + field + linesep
+                lines.append(line)
+                position += len(line)
+
+            file.write(b"".join(lines))
+
+        return offsets
+
+    def __encode_field(self, value: str) -> bytes:
+        # the minimal quoting of `to_csv`
+        if self.__sep in value or '"' in value or "\n" in value or "\r" in value:
+            value = '"' + value.replace('"', '""') + '"'
+
+        return value.encode(self.__encoding)
+
+    def __find_descriptions(self, buffer: mmap.mmap) -> Optional[np.ndarray]:
+        """ Returns [begin, end) offsets of description fields of every row.
+
+        Separators are found by numpy: a separator is a field one if an even number of
+        quotes precede it, as escaped quotes are doubled.
+        """
+        header_end = buffer.find(b"\n")
+        if header_end < 0:
+            return None
+        if header_end + 1 == len(buffer):
+            return np.empty((0, 2), dtype=np.int64)
+
+        header = buffer[:header_end].decode(self.__encoding).rstrip("\r").split(self.__sep)
+        if DumpFields.DESCRIPTION not in header:
+            return None
+
+        columns = len(header)
+        column = header.index(DumpFields.DESCRIPTION)
+        separator = ord(self.__sep)
+
+        terminators: list[np.ndarray] = []
+        is_newline: list[np.ndarray] = []
+        quotes_parity = 0
+        for begin in range(header_end + 1, len(buffer), _SCAN_CHUNK):
+            chunk = np.frombuffer(buffer, dtype=np.uint8, count=min(_SCAN_CHUNK, len(buffer) - begin), offset=begin)
+            # the sum may wrap around as only its parity matters
+            parity = (np.cumsum(chunk == _QUOTE, dtype=np.uint8) + quotes_parity) & 1
+            quotes_parity = int(parity[-1])
+
+            found = np.flatnonzero(((chunk == separator) | (chunk == _NEWLINE)) & (parity == 0))
+            terminators.append(found + begin)
+            is_newline.append(chunk[found] == _NEWLINE)
+
+        ends = np.concatenate([np.empty(0, dtype=np.int64), *terminators])
+        newlines = np.concatenate([np.empty(0, dtype=bool), *is_newline])
+        if len(ends) == 0 or not newlines[-1]:
+            # the last line has no line break
+            ends = np.append(ends, len(buffer))
+            newlines = np.append(newlines, True)
+
+        # every row must consist of the same number of fields
+        expected = np.zeros(columns, dtype=bool)
+        expected[-1] = True
+        if len(ends) % columns != 0 or not np.array_equal(newlines, np.tile(expected, len(ends) // columns)):
+            return None
+
+        begins = np.concatenate([[header_end], ends[:-1]]) + 1
+        offsets = np.stack([begins[column::columns], ends[column::columns]], axis=1)
+
+        # a line break may be "\r\n"
+        if column == columns - 1 and len(offsets) > 0:
+            has_return = np.frombuffer(buffer, dtype=np.uint8)[np.maximum(offsets[:, 1] - 1, 0)] == _RETURN
+            offsets[:, 1] -= has_return & (offsets[:, 1] > offsets[:, 0])
+
+        return offsets
+
 
-    def save_dump(self, dump: pd.DataFrame) -> None:
-        dump.to_csv(self.__options.path, sep=self.__sep, encoding=self.__encoding, index=False)
+def _map_file(path: pathlib.Path) -> mmap.mmap:
+    with path.open("rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
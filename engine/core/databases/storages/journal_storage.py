@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import pathlib
+import threading
+from dataclasses import InitVar
+from typing import IO, Any, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pydantic
+
+from .common import (
+    DescriptionsReader,
+    Dump,
+    DumpFields,
+    DumpProvider,
+    StorageBase,
+    StorageChange,
+    StorageChangeKind,
+)
+from .csv_storage import CSVStorage, CSVStorageOptions
+
+# a torn record is looked for from the end of a journal by chunks of this size
+_TAIL_CHUNK = 64 * 1024
+
+
+class _JournalDescriptionsReader(DescriptionsReader):
+    """ Reads descriptions of replayed rows from the snapshot or from journaled records.
+
+    A source of a row is its row of the snapshot or, if it is negative, -1 - its
+    position among journaled descriptions.
+    """
+
+    def __init__(self, snapshot: Optional[DescriptionsReader], sources: np.ndarray, journaled: list[str]) -> None:
+        self.__snapshot = snapshot
+        self.__sources = sources
+        self.__journaled = journaled
+
+    def read_description(self, row: int) -> str:
+        reader, source_row = self.locate_description(row)
+        if reader is self:
+            return self.__journaled[-1 - int(self.__sources[row])]
+
+        return reader.read_description(source_row)
+
+    def locate_description(self, row: int) -> tuple[DescriptionsReader, int]:
+        source = int(self.__sources[row])
+        if source < 0:
+            return self, row
+
+        assert self.__snapshot is not None
+        return self.__snapshot.locate_description(source)
+
+
+@pydantic.dataclasses.dataclass(kw_only=True)
+class JournalStorageOptions:
+    path: pathlib.Path
+    compaction_threshold: int = 4 * 1024 * 1024  # journal size in bytes
+    fsync: bool = True
+
+
+@pydantic.dataclasses.dataclass(kw_only=True)
+class JournalStorage(StorageBase):
+    """ Storage that keeps a TSV snapshot and appends every change to a journal.
+
+    The journal is replayed over the snapshot on read and folded into a new
+    snapshot by a background thread once it outgrows the compaction threshold.
+    """
+
+    options: InitVar[JournalStorageOptions]
+
+    logger = logging.getLogger()
+
+    class _Record:
+        OPERATION = "op"
+
+    def __post_init__(self, options: JournalStorageOptions) -> None:
+        self.__encoding = "utf-8"
+        self.__options = options
+        self.__snapshot = CSVStorage(
+            options=CSVStorageOptions(
+                path=options.path,
+            ),
+        )
+
+        path = options.path
+        self.__journal_path = path.with_name(path.name + ".journal")
+        self.__pending_path = path.with_name(path.name + ".journal.pending")
+
+        self.__mutex = threading.Lock()
+        self.__journal: Optional[IO[str]] = None
+        self.__compaction: Optional[threading.Thread] = None
+
+    def read_dump(self) -> pd.DataFrame | None:
+        self.wait_compaction()
+
+        with self.__mutex:
+            dump = self.__snapshot.read_dump()
+            records = [
+                *self.__read_journal(self.__pending_path),
+                *self.__read_journal(self.__journal_path),
+            ]
+
+        if len(records) == 0:
+            return dump
+
+        if dump is None:
+            dump = pd.DataFrame(columns=[
+                DumpFields.WORD,
+                DumpFields.FORM,
+                DumpFields.DESCRIPTION,
+            ])
+
+        return self.__replay(dump, records)
+
+    def read_keys(self) -> Optional[tuple[pd.DataFrame, DescriptionsReader]]:
+        self.wait_compaction()
+
+        with self.__mutex:
+            snapshot = self.__snapshot.read_keys()
+            if snapshot is None and self.__options.path.exists():
+                # the snapshot is not written the way `save_dump` writes it
+                return None
+
+            records = [
+                *self.__read_journal(self.__pending_path),
+                *self.__read_journal(self.__journal_path),
+            ]
+
+        if snapshot is None:
+            keys = pd.DataFrame(columns=[DumpFields.WORD, DumpFields.FORM], dtype=object)
+            reader = None
+        else:
+            keys, reader = snapshot
+
+        # descriptions are replayed as their sources, so the journaled ones alone are kept
+        journaled: list[str] = []
+        for record in records:
+            journaled.append(record[DumpFields.DESCRIPTION])
+            record[DumpFields.DESCRIPTION] = -len(journaled)
+
+        keys[DumpFields.DESCRIPTION] = np.arange(len(keys), dtype=np.int64)
+        if len(records) > 0:
+            keys = self.__replay(keys, records)
+
+        sources = keys.pop(DumpFields.DESCRIPTION).to_numpy(dtype=np.int64)
+        return keys.reset_index(drop=True), _JournalDescriptionsReader(reader, sources, journaled)
+
+    def save_dump(self, dump: Dump) -> None:
+        self.wait_compaction()
+
+        with self.__mutex:
+            self.__snapshot.save_dump(dump)
+
+            # the snapshot already contains every journaled change
+            self.__close_journal()
+            self.__journal_path.unlink(missing_ok=True)
+            self.__pending_path.unlink(missing_ok=True)
+
+    def save_changes(self, dump: DumpProvider, changes: Sequence[StorageChange]) -> None:
+        with self.__mutex:
+            journal = self.__open_journal()
+            for change in changes:
+                journal.write(json.dumps({
+                    self._Record.OPERATION: change.kind.value,
+                    DumpFields.WORD: change.word,
+                    DumpFields.FORM: change.form,
+                    DumpFields.DESCRIPTION: change.description,
+                }, ensure_ascii=False) + "\n")
+
+            journal.flush()
+            if self.__options.fsync:
+                os.fsync(journal.fileno())
+
+            if journal.tell() >= self.__options.compaction_threshold and self.__compaction is None:
+                self.__start_compaction(dump)
+
+    def get_source_paths(self) -> Sequence[pathlib.Path]:
+        return [self.__options.path, self.__pending_path, self.__journal_path]
+
+    def wait_compaction(self) -> None:
+        compaction = self.__compaction
+        if compaction is not None:
+            compaction.join()
+
+    # ------------------| journal
+
+    def __open_journal(self) -> IO[str]:
+        if self.__journal is None:
+            # a record appended to a torn one would make both unreadable
+            self.__truncate_torn_record(self.__journal_path)
+            self.__journal = self.__journal_path.open("a", encoding=self.__encoding, newline="\n")
+
+        return self.__journal
+
+    def __close_journal(self) -> None:
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
+
+    def __read_journal(self, path: pathlib.Path) -> Iterable[dict[str, Any]]:
+        if not path.exists():
+            return
+
+        with path.open("r", encoding=self.__encoding, newline="\n") as file:
+            for line in file:
+                if not line.endswith("\n"):
+                    # the record was torn by a crash and has never been acknowledged
+                    self.logger.warning("a torn record at the end of '%s' is ignored", path)
+                    return
+
+                yield json.loads(line)
+
+    def __truncate_torn_record(self, path: pathlib.Path) -> None:
+        """ Drops bytes after the last complete record of the journal, which a crash has left.
+        """
+        if not path.exists():
+            return
+
+        with path.open("rb+") as file:
+            end = file.seek(0, os.SEEK_END)
+            size = end
+            while size > 0:
+                begin = max(0, size - _TAIL_CHUNK)
+                file.seek(begin)
+                chunk = file.read(size - begin)
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    size = begin + newline + 1
+                    break
+                size = begin
+
+            if size == end:
+                return
+
+            self.logger.warning("a torn record at the end of '%s' is dropped", path)
+            file.truncate(size)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def __rotate_journal(self) -> None:
+        self.__close_journal()
+        if not self.__journal_path.exists():
+            return
+
+        if not self.__pending_path.exists():
+            os.replace(self.__journal_path, self.__pending_path)
+            return
+
+        # a previous compaction has failed, so its records must be kept as well
+        self.__truncate_torn_record(self.__pending_path)
+        with self.__pending_path.open("ab") as pending:
+            pending.write(self.__journal_path.read_bytes())
+            pending.flush()
+            os.fsync(pending.fileno())
+
+        self.__journal_path.unlink()
+
+    # ------------------| compaction
+
+    def __start_compaction(self, dump: DumpProvider) -> None:
+        self.__rotate_journal()
+
+        self.__compaction = threading.Thread(
+            target=self.__compact,
+            args=(dump(),),
+            name="journal-compaction",
+        )
+        self.__compaction.start()
+
+    def __compact(self, dump: Dump) -> None:
+        try:
+            self.__snapshot.save_dump(dump)
+            with self.__mutex:
+                self.__pending_path.unlink(missing_ok=True)
+        except Exception:
+            self.logger.exception("journal compaction has failed; the pending journal is kept")
+        finally:
+            self.__compaction = None
+
+    # ------------------| replay
+
+    def __replay(self, dump: pd.DataFrame, records: list[dict[str, Any]]) -> pd.DataFrame:
+        """ Applies the records in order: an upsert keeps the row in place unless it was
+        deleted before, and a created row follows all rows, as the store of a database does.
+        """
+        keys = [DumpFields.WORD, DumpFields.FORM]
+        changes = pd.DataFrame(records)
+        codes, uniques = pd.MultiIndex.from_frame(changes[keys]).factorize()
+
+        sequence = np.arange(len(changes))
+        deletes = (changes[self._Record.OPERATION] == StorageChangeKind.DELETE.value).to_numpy()
+
+        # the last record of a key gives its final state and the last delete splits its lifetimes
+        last = np.full(len(uniques), -1)
+        np.maximum.at(last, codes, sequence)
+        last_delete = np.full(len(uniques), -1)
+        np.maximum.at(last_delete, codes[deletes], sequence[deletes])
+
+        # a row is created by the first upsert after the last delete of its key
+        creating = ~deletes & (sequence > last_delete[codes])
+        created_at = np.full(len(uniques), len(changes))
+        np.minimum.at(created_at, codes[creating], sequence[creating])
+
+        upserted = ~deletes[last]
+        recreated = last_delete >= 0
+        descriptions = changes[DumpFields.DESCRIPTION].to_numpy()[last]
+        positions = pd.MultiIndex.from_frame(dump[keys]).get_indexer(uniques)
+        existing = positions >= 0
+
+        updated = upserted & existing & ~recreated
+        column = dump.columns.get_loc(DumpFields.DESCRIPTION)
+        dump.iloc[positions[updated], column] = descriptions[updated]
+
+        dropped = existing & (recreated | ~upserted)
+        dump = dump.drop(index=dump.index[positions[dropped]])
+
+        created = np.flatnonzero(upserted & (recreated | ~existing))
+        created = created[np.argsort(created_at[created], kind="stable")]
+        patch = pd.DataFrame({
+            DumpFields.WORD: uniques.get_level_values(0)[created],
+            DumpFields.FORM: uniques.get_level_values(1)[created],
+            DumpFields.DESCRIPTION: descriptions[created],
+        })
+
+        return pd.concat([dump, patch], ignore_index=True)
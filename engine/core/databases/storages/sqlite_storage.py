@@ -0,0 +1,238 @@
+import contextlib
+import itertools
+import pathlib
+import sqlite3
+import threading
+from dataclasses import InitVar
+from typing import Callable, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pydantic
+
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+from .common import (
+    DescriptionsReader,
+    Dump,
+    DumpFields,
+    DumpProvider,
+    LazyDump,
+    RowStorageBase,
+    StorageBase,
+    StorageChange,
+    StorageChangeKind,
+)
+
+
+class _SQLiteDescriptionsReader(DescriptionsReader):
+    """ Reads descriptions by rowids of rows that were read.
+    """
+
+    def __init__(self, read: Callable[[int], str], rowids: np.ndarray) -> None:
+        self.__read = read
+        self.__rowids = rowids
+
+    def read_description(self, row: int) -> str:
+        return self.__read(int(self.__rowids[row]))
+
+
+@pydantic.dataclasses.dataclass(kw_only=True)
+class SQLiteStorageOptions:
+    path: pathlib.Path
+    fetch_size: int = 10_000
+
+
+@pydantic.dataclasses.dataclass(kw_only=True)
+class SQLiteStorage(RowStorageBase):
+    """ Storage that keeps word forms in a SQLite table in WAL mode.
+
+    Rows are read in order they were created; an update keeps the row in place.
+    """
+
+    options: InitVar[SQLiteStorageOptions]
+
+    __UPSERT = """
+        INSERT INTO word_forms (word, form, description) VALUES (?, ?, ?)
+        ON CONFLICT (word, form) DO UPDATE SET description = excluded.description
+    """
+    __DELETE = "DELETE FROM word_forms WHERE word = ? AND form = ?"
+
+    def __post_init__(self, options: SQLiteStorageOptions) -> None:
+        self.__options = options
+        self.__mutex = threading.RLock()
+
+        self.__connection = sqlite3.connect(
+            options.path,
+            isolation_level=None,  # transactions are managed explicitly
+            check_same_thread=False,
+        )
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS word_forms (
+                word TEXT NOT NULL,
+                form TEXT NOT NULL,
+                description TEXT NOT NULL,
+                UNIQUE (word, form)
+            )
+        """)
+
+    def close(self) -> None:
+        with self.__mutex:
+            self.__connection.close()
+
+    def read_dump(self) -> pd.DataFrame | None:
+        with self.__mutex:
+            rows = self.__connection.execute(
+                "SELECT word, form, description FROM word_forms ORDER BY rowid"
+            ).fetchall()
+
+        return pd.DataFrame(rows, columns=[
+            DumpFields.WORD,
+            DumpFields.FORM,
+            DumpFields.DESCRIPTION,
+        ], dtype=object)
+
+    def read_keys(self) -> Optional[tuple[pd.DataFrame, DescriptionsReader]]:
+        with self.__mutex:
+            rows = self.__connection.execute(
+                "SELECT rowid, word, form FROM word_forms ORDER BY rowid"
+            ).fetchall()
+
+        frame = pd.DataFrame(rows, columns=["rowid", DumpFields.WORD, DumpFields.FORM], dtype=object)
+        rowids = frame.pop("rowid").to_numpy(dtype=np.int64)
+        return frame, _SQLiteDescriptionsReader(self.__read_description, rowids)
+
+    def save_dump(self, dump: Dump) -> None:
+        if isinstance(dump, LazyDump):
+            dump = dump.to_frame()
+
+        rows = dump[[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]].itertuples(index=False, name=None)
+
+        with self.__mutex, self.__transaction():
+            self.__connection.execute("DELETE FROM word_forms")
+            self.__connection.executemany(
+                "INSERT INTO word_forms (word, form, description) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def save_changes(self, dump: DumpProvider, changes: Sequence[StorageChange]) -> None:
+        with self.__mutex, self.__transaction():
+            # runs of changes of the same kind are executed at once
+            for kind, run in itertools.groupby(changes, key=lambda change: change.kind):
+                match kind:
+                    case StorageChangeKind.UPSERT:
+                        self.__connection.executemany(
+                            self.__UPSERT,
+                            ((change.word, change.form, change.description) for change in run),
+                        )
+                    case StorageChangeKind.DELETE:
+                        self.__connection.executemany(
+                            self.__DELETE,
+                            ((change.word, change.form) for change in run),
+                        )
+                    case _:
+                        raise NotImplementedError()
+
+    def upsert_row(self, info: WordFormInfo) -> None:
+        with self.__mutex:
+            self.__connection.execute(
+                self.__UPSERT,
+                (info.word, info.form, info.description),
+            )
+
+    def delete_row(self, word: str, form: str) -> None:
+        with self.__mutex:
+            self.__connection.execute(
+                self.__DELETE,
+                (word, form),
+            )
+
+    def iter_rows(self) -> Iterator[WordFormInfo]:
+        # rows are fetched by pages, so the table is never loaded at once
+        last_rowid = 0
+        while True:
+            with self.__mutex:
+                rows = self.__connection.execute(
+                    """
+                    SELECT rowid, word, form, description FROM word_forms
+                    WHERE rowid > ? ORDER BY rowid LIMIT ?
+                    """,
+                    (last_rowid, self.__options.fetch_size),
+                ).fetchall()
+
+            if len(rows) == 0:
+                return
+
+            for last_rowid, word, form, description in rows:
+                yield WordFormInfo(
+                    description=description,
+                    form=form,
+                    word=word,
+                )
+
+    def read_forms(self, word: str) -> list[WordFormInfo]:
+        with self.__mutex:
+            rows = self.__connection.execute(
+                "SELECT form, description FROM word_forms WHERE word = ? ORDER BY rowid",
+                (word,),
+            ).fetchall()
+
+        return [
+            WordFormInfo(
+                description=description,
+                form=form,
+                word=word,
+            )
+            for form, description in rows
+        ]
+
+    def get_source_paths(self) -> Sequence[pathlib.Path]:
+        path = self.__options.path
+        return [path, path.with_name(path.name + "-wal")]
+
+    def import_dump(self, source: StorageBase) -> int:
+        """ Replaces the content of the storage by the source's one; returns a number of imported rows.
+        """
+        dump = source.read_dump()
+        if dump is None:
+            dump = pd.DataFrame(columns=[
+                DumpFields.WORD,
+                DumpFields.FORM,
+                DumpFields.DESCRIPTION,
+            ])
+
+        dump = dump[[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]]
+        self.save_dump(dump)
+
+        imported = self.read_dump()
+        assert imported is not None
+        if not imported.equals(dump.reset_index(drop=True).astype(object)):
+            raise RuntimeError("the imported dump differs from the source one")
+
+        return len(imported)
+
+    def __read_description(self, rowid: int) -> str:
+        with self.__mutex:
+            (description,) = self.__connection.execute(
+                "SELECT description FROM word_forms WHERE rowid = ?",
+                (rowid,),
+            ).fetchone()
+
+        return description
+
+    @contextlib.contextmanager
+    def __transaction(self) -> Iterator[None]:
+        if self.__connection.in_transaction:
+            yield
+            return
+
+        self.__connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+        else:
+            self.__connection.execute("COMMIT")
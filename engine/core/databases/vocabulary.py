@@ -0,0 +1,426 @@
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+_EMPTY_FORMS = np.empty(0, dtype=object)
+
+# a separator of strings in serialized blobs
+_SEPARATOR = "\0"
+
+
+class _BaseForms:
+    """ Forms of the words a vocabulary had at its last rebuild; it is never changed.
+
+    Forms restored from a serialized blob stay encoded: forms of a word are decoded
+    on its lookup, so a warm start does not make a string object per form.
+    """
+
+    def __init__(
+        self, words: np.ndarray, bounds: np.ndarray, *,
+        forms: Optional[np.ndarray] = None, blob: Optional[np.ndarray] = None,
+    ) -> None:
+        assert (forms is None) != (blob is None)
+        self.words = words
+        self.bounds = bounds
+        self.__forms = forms
+        self.__blob = blob
+
+        # the maps are built on the first lookup, which keeps a cold start cheap
+        self.__positions: Optional[dict[str, int]] = None
+        self.__offsets: Optional[np.ndarray] = None
+
+    def get_position(self, word: str) -> Optional[int]:
+        if self.__positions is None:
+            self.__positions = dict(zip(self.words.tolist(), range(len(self.words))))
+
+        return self.__positions.get(word)
+
+    def get_forms(self, position: int) -> np.ndarray:
+        begin, end = int(self.bounds[position]), int(self.bounds[position + 1])
+        if self.__forms is not None:
+            return self.__forms[begin:end]
+        if begin == end:
+            return _EMPTY_FORMS
+
+        offsets = self.__get_offsets()
+        forms = np.empty(end - begin, dtype=object)
+        forms[:] = self.__blob[offsets[begin]:offsets[end] - 1].tobytes().decode("utf-8").split(_SEPARATOR)
+        return forms
+
+    def get_blob(self) -> Optional[np.ndarray]:
+        """ Returns the forms serialized into one blob; returns None if they cannot be serialized.
+        """
+        if self.__blob is not None:
+            return self.__blob
+
+        assert self.__forms is not None
+        return _encode(self.__forms)
+
+    def __get_offsets(self) -> np.ndarray:
+        """ Returns byte offsets of forms in the blob; a form ends a separator before the next one.
+        """
+        if self.__offsets is None:
+            assert self.__blob is not None
+            separators = np.flatnonzero(self.__blob == ord(_SEPARATOR))
+            self.__offsets = np.concatenate([[0], separators + 1, [len(self.__blob) + 1]])
+
+        return self.__offsets
+
+
+class VocabularySnapshot:
+    """ A read-only view of a vocabulary at some moment; it is not affected by later changes.
+    """
+
+    def __init__(
+        self, *,
+        words: np.ndarray, mask: Optional[np.ndarray], orders: np.ndarray,
+        base: _BaseForms, changed: dict[str, tuple[int, np.ndarray]],
+    ) -> None:
+        self.__words = words
+        self.__mask = mask
+        self.__orders = orders
+        self.__base = base
+        self.__changed = changed
+        self.__forms: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.__words) if self.__mask is None else int(self.__mask.sum())
+
+    def has_word(self, word: str) -> bool:
+        return len(self.get_forms(word)) > 0
+
+    def has_form(self, word: str, form: str) -> bool:
+        return form in self.get_forms(word)
+
+    def get_words(self) -> np.ndarray:
+        """ Returns words that may contain removed ones, see `get_words_mask`.
+        """
+        return self.__words
+
+    def get_words_mask(self) -> Optional[np.ndarray]:
+        """ Returns a mask of alive words or None if all of them are alive.
+        """
+        return self.__mask
+
+    def get_orders(self) -> np.ndarray:
+        """ Returns orders of words, see `WordsVocabulary`.
+        """
+        return self.__orders
+
+    def get_order(self, word: str) -> int:
+        return int(self.__orders[_get_position(word, self.__base, self.__changed)])
+
+    def get_forms(self, word: str) -> np.ndarray:
+        """ Returns forms of the word; the array is the same for every call of the snapshot.
+        """
+        forms = self.__forms.get(word)
+        if forms is None:
+            forms = _get_forms(word, self.__base, self.__changed)
+            self.__forms[word] = forms
+
+        return forms
+
+
+class WordsVocabulary:
+    """ Materialized distinct words and forms of every word.
+
+    Words are kept in a contiguous buffer in order they have entered the vocabulary.
+    A removed word stays in the buffer and is masked out from queries; removed words
+    are squeezed out once they outnumber alive ones.
+
+    Forms of the words the vocabulary had at its last rebuild are kept in one flat
+    array sliced by word bounds; a changed word gets its own form array, which is
+    replaced on every change of the word. Forms of a word are kept in order they
+    have been added.
+
+    Words of equal distance are ranked by their orders: an order of a word is the one
+    of the first stored row of its forms, so a word whose first form is deleted may
+    move past later words. Orders of words ascend by their positions after a rebuild.
+
+    Readers use snapshots, see `get_snapshot`: the vocabulary only appends words
+    past the end of a published buffer, replaces form arrays instead of changing
+    them and copies the mask, so a snapshot never sees a half-made change.
+    """
+
+    def __init__(
+        self, words: np.ndarray, bounds: np.ndarray, orders: np.ndarray, *,
+        forms: Optional[np.ndarray] = None, forms_blob: Optional[np.ndarray] = None,
+    ) -> None:
+        """ Takes forms of all words either as strings or as a blob made by `to_arrays`.
+        """
+        self.__buffer = np.asarray(words, dtype=object)
+        self.__size = len(self.__buffer)
+        self.__alive = np.ones(self.__size, dtype=bool)
+        self.__alive_count = self.__size
+
+        # orders are changed in place unless a snapshot shares them
+        self.__orders = np.array(orders, dtype=np.int64)
+        self.__orders_shared = False
+        self.__next_order = int(self.__orders.max()) + 1 if self.__size > 0 else 0
+
+        self.__base = _BaseForms(
+            self.__buffer,
+            np.asarray(bounds, dtype=np.int64),
+            forms=None if forms is None else np.asarray(forms, dtype=object),
+            blob=forms_blob,
+        )
+        self.__changed: dict[str, tuple[int, np.ndarray]] = {}  # positions and forms of changed words
+
+        self.__snapshot: Optional[VocabularySnapshot] = None
+
+    @classmethod
+    def from_rows(cls, words: np.ndarray, forms: np.ndarray) -> "WordsVocabulary":
+        # a vocabulary of the index cache is used by headless queries, which do without pandas
+        import pandas as pd
+
+        codes, uniques = pd.factorize(words)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(uniques)), out=bounds[1:])
+
+        # words are numbered by their first rows, so the first rows ascend
+        _, first_rows = np.unique(codes, return_index=True)
+        return cls(np.asarray(uniques, dtype=object), bounds, first_rows, forms=forms[order])
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "WordsVocabulary":
+        # words are needed by the first query anyway, while forms are only looked up by words
+        bounds = arrays["form_bounds"]
+        words = cls.__decode(arrays["words"], len(bounds) - 1)
+        return cls(words, bounds, arrays["word_orders"], forms_blob=arrays["forms"])
+
+    def to_arrays(self) -> Optional[dict[str, np.ndarray]]:
+        """ Serializes the vocabulary; returns None if it cannot be serialized.
+        """
+        self.__squeeze()
+
+        words = _encode(self.__base.words)
+        forms = self.__base.get_blob()
+        if words is None or forms is None:
+            return None
+
+        return {
+            "words": words,
+            "forms": forms,
+            "form_bounds": self.__base.bounds,
+            "word_orders": self.__orders[:self.__size],
+        }
+
+    def __len__(self) -> int:
+        return self.__alive_count
+
+    def get_snapshot(self) -> VocabularySnapshot:
+        """ Returns the current state; the same snapshot is returned until the vocabulary is changed.
+        """
+        if self.__snapshot is None:
+            self.__snapshot = VocabularySnapshot(
+                words=self.__buffer[:self.__size],
+                mask=None if self.__alive_count == self.__size else self.__alive[:self.__size].copy(),
+                orders=self.__orders[:self.__size],
+                base=self.__base,
+                changed=dict(self.__changed),
+            )
+            self.__orders_shared = True
+
+        return self.__snapshot
+
+    def has_word(self, word: str) -> bool:
+        return len(self.get_forms(word)) > 0
+
+    def has_form(self, word: str, form: str) -> bool:
+        return form in self.get_forms(word)
+
+    def get_words(self) -> np.ndarray:
+        """ Returns words that may contain removed ones, see `get_words_mask`.
+        """
+        return self.__buffer[:self.__size]
+
+    def get_words_mask(self) -> Optional[np.ndarray]:
+        """ Returns a mask of alive words or None if all of them are alive.
+        """
+        return None if self.__alive_count == self.__size else self.__alive[:self.__size]
+
+    def get_orders(self) -> np.ndarray:
+        return self.__orders[:self.__size]
+
+    def get_order(self, word: str) -> int:
+        return int(self.__orders[self.__get_position(word)])
+
+    def set_order(self, word: str, order: int) -> None:
+        """ Moves the word among words of equal distance, e.g. once its first form is removed.
+        """
+        if self.__orders_shared:
+            self.__orders = self.__orders.copy()
+            self.__orders_shared = False
+
+        self.__orders[self.__get_position(word)] = order
+        self.__next_order = max(self.__next_order, order + 1)
+        self.__snapshot = None
+
+    def get_forms(self, word: str) -> np.ndarray:
+        return _get_forms(word, self.__base, self.__changed)
+
+    def add_form(self, word: str, form: str, order: Optional[int] = None) -> bool:
+        """ Adds the form; returns True if the word is new to the vocabulary.
+        """
+        return len(self.add_forms([(word, form)], None if order is None else [order])) > 0
+
+    def add_forms(self, pairs: Iterable[tuple[str, str]], orders: Optional[Sequence[int]] = None) -> list[str]:
+        """ Adds (word, form) pairs; returns words that are new to the vocabulary.
+
+        NOTE: a new word gets the order of its first pair; pairs without orders follow all words.
+        """
+        grouped: dict[str, list[str]] = {}
+        first_orders: dict[str, int] = {}
+        for at, (word, form) in enumerate(pairs):
+            grouped.setdefault(word, []).append(form)
+            if orders is not None:
+                first_orders.setdefault(word, orders[at])
+
+        added: list[str] = []
+        for word, new_forms in grouped.items():
+            forms = self.get_forms(word)
+            position = self.__get_position(word)
+            if len(forms) == 0:
+                added.append(word)
+                position = self.__add_word(word, first_orders.get(word, self.__next_order))
+
+            existing = set(forms.tolist())
+            new_forms = [form for form in dict.fromkeys(new_forms) if form not in existing]
+            if len(new_forms) > 0:
+                self.__changed[word] = (position, np.concatenate([forms, np.array(new_forms, dtype=object)]))
+                self.__snapshot = None
+
+        return added
+
+    def remove_form(self, word: str, form: str) -> bool:
+        """ Removes the form; returns True if it was the last form of the word.
+        """
+        forms = self.get_forms(word)
+        if len(forms) == 0:
+            return False
+
+        position = self.__get_position(word)
+        forms = forms[forms != form]
+        self.__snapshot = None
+
+        if len(forms) > 0:
+            self.__changed[word] = (position, forms)
+            return False
+
+        self.__changed[word] = (-1, _EMPTY_FORMS)
+        self.__remove_word(position)
+        return True
+
+    # ------------------| helpers
+
+    def __get_position(self, word: str) -> int:
+        return _get_position(word, self.__base, self.__changed)
+
+    def __add_word(self, word: str, order: int) -> int:
+        if self.__size == len(self.__buffer):
+            self.__reserve(max(16, 2 * self.__size))
+
+        position = self.__size
+        self.__buffer[position] = word
+        self.__orders[position] = order
+        self.__next_order = max(self.__next_order, order + 1)
+        self.__alive[position] = True
+        self.__alive_count += 1
+        self.__size += 1
+        return position
+
+    def __remove_word(self, position: int) -> None:
+        # the word stays in the buffer, as published snapshots may still refer to it
+        self.__alive[position] = False
+        self.__alive_count -= 1
+
+        if 2 * self.__alive_count < self.__size:
+            self.__squeeze()
+
+    def __reserve(self, capacity: int) -> None:
+        """ Moves words to new arrays; snapshots keep the old ones.
+        """
+        buffer = np.empty(capacity, dtype=object)
+        buffer[:self.__size] = self.__buffer[:self.__size]
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.__size] = self.__alive[:self.__size]
+
+        orders = np.zeros(capacity, dtype=np.int64)
+        orders[:self.__size] = self.__orders[:self.__size]
+
+        self.__buffer = buffer
+        self.__alive = alive
+        self.__orders = orders
+        self.__orders_shared = False
+
+    def __squeeze(self) -> None:
+        """ Drops removed words, sorts words by orders and gathers forms of all words into the flat array again.
+        """
+        if self.__alive_count == self.__size and len(self.__changed) == 0:
+            return
+
+        alive = self.__alive[:self.__size]
+        orders = self.__orders[:self.__size][alive]
+        by_orders = np.argsort(orders, kind="stable")
+        words = self.__buffer[:self.__size][alive][by_orders]
+        forms = [self.get_forms(word) for word in words.tolist()]
+
+        bounds = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in forms], out=bounds[1:])
+
+        self.__size = len(words)
+        self.__buffer = words
+        self.__alive = np.ones(self.__size, dtype=bool)
+        self.__alive_count = self.__size
+        self.__orders = orders[by_orders]
+        self.__orders_shared = False
+
+        self.__base = _BaseForms(words, bounds, forms=np.concatenate([_EMPTY_FORMS, *forms]))
+        self.__changed = {}
+        self.__snapshot = None
+
+    @staticmethod
+    def __decode(blob: np.ndarray, count: int) -> np.ndarray:
+        if count == 0:
+            return _EMPTY_FORMS
+
+        strings = np.empty(count, dtype=object)
+        strings[:] = blob.tobytes().decode("utf-8").split(_SEPARATOR)
+        return strings
+
+
+def _encode(strings: np.ndarray) -> Optional[np.ndarray]:
+    """ Joins the strings into a UTF-8 blob; returns None if a string contains the separator.
+    """
+    joined = _SEPARATOR.join(strings.tolist())
+    if joined.count(_SEPARATOR) != max(0, len(strings) - 1):
+        return None
+
+    return np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+
+
+def _get_position(word: str, base: _BaseForms, changed: dict[str, tuple[int, np.ndarray]]) -> int:
+    """ Returns a position of the word in the buffer or -1.
+    """
+    overridden = changed.get(word)
+    if overridden is not None:
+        return overridden[0]
+
+    position = base.get_position(word)
+    return -1 if position is None else position
+
+
+def _get_forms(word: str, base: _BaseForms, changed: dict[str, tuple[int, np.ndarray]]) -> np.ndarray:
+    """ Returns forms of the word; forms of changed words override the base ones.
+    """
+    overridden = changed.get(word)
+    if overridden is not None:
+        return overridden[1]
+
+    position = base.get_position(word)
+    if position is None:
+        return _EMPTY_FORMS
+
+    return base.get_forms(position)
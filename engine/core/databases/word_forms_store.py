@@ -0,0 +1,316 @@
+import array
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .descriptions import LazyDescriptions
+from .storage_base import Dump, DumpFields
+
+# a separator of forms in the buffer; forms that contain it are decoded one by one
+_SEPARATOR = b"\0"
+
+# marks of slots of the rows table
+_EMPTY = -1
+_REMOVED = -2
+
+
+class WordFormsStore:
+    """ Rows of word forms kept in compact arrays in order they were created.
+
+    Words are interned and rows refer to them by ids; forms are kept in one UTF-8
+    buffer sliced by offsets; descriptions are kept apart from the keys, either in
+    a list or in a `LazyDescriptions`. A deleted row stays in place as a dead one
+    until dead rows outnumber alive ones.
+
+    Alive rows are found by hashes of their (word id, form) keys in an open addressing
+    table of row numbers with linear probing; a row of the same hash is checked against
+    the buffer. The table is kept at most half full; with the hash of every row it costs
+    16 to 40 bytes per row, where a dict of the keys costs about 220.
+
+    Every row has an ordinal that ascends in order rows were created and survives
+    compactions, so ordinals of rows can be compared at any time.
+    """
+
+    def __init__(self) -> None:
+        self.__words: list[str] = []
+        self.__word_ids: dict[str, int] = {}
+
+        self.__row_words = array.array("i")
+        self.__row_ordinals = array.array("q")
+        self.__next_ordinal = 0
+        self.__form_buffer = bytearray()
+        self.__form_offsets = array.array("q", [0])
+        self.__descriptions: list[str] | LazyDescriptions = []
+        self.__alive = bytearray()
+        self.__alive_count = 0
+        self.__has_separator = False
+
+        # hashes of keys of rows and the table of alive rows by them
+        self.__row_hashes = array.array("q")
+        self.__table = array.array("i", [_EMPTY] * 8)
+        self.__table_used = 0  # a number of slots that are not empty including removed ones
+
+    @classmethod
+    def from_frame(
+        cls, dump: pd.DataFrame,
+        descriptions: Optional[LazyDescriptions] = None,
+        ordinals: Optional[np.ndarray] = None,
+    ) -> "WordFormsStore":
+        """ Makes a store of the dump; descriptions are taken from the dump if they are not given.
+
+        NOTE: rows of the dump are numbered by their positions if their ordinals are not given.
+        """
+        if dump.duplicated([DumpFields.WORD, DumpFields.FORM]).any():
+            raise ValueError("the dump has duplicated word forms")
+
+        store = cls()
+
+        codes, uniques = pd.factorize(dump[DumpFields.WORD].to_numpy())
+        store.__words = uniques.tolist()
+        store.__word_ids = {word: word_id for word_id, word in enumerate(store.__words)}
+        store.__row_words = array.array("i", codes.astype(np.int32).tobytes())
+        if ordinals is None:
+            ordinals = np.arange(len(dump), dtype=np.int64)
+        store.__row_ordinals = array.array("q", np.asarray(ordinals, dtype=np.int64).tobytes())
+        store.__next_ordinal = int(ordinals[-1]) + 1 if len(ordinals) > 0 else 0
+
+        decoded = dump[DumpFields.FORM].tolist()
+        hashes = np.fromiter(map(hash, zip(codes.tolist(), decoded)), dtype=np.int64, count=len(decoded))
+        store.__row_hashes = array.array("q", hashes.tobytes())
+
+        forms = [form.encode("utf-8") for form in decoded]
+        store.__form_buffer = bytearray(b"".join(form + _SEPARATOR for form in forms))
+        offsets = np.zeros(len(forms) + 1, dtype=np.int64)
+        np.cumsum([len(form) + 1 for form in forms], out=offsets[1:])
+        store.__form_offsets = array.array("q", offsets.tobytes())
+        store.__has_separator = any(_SEPARATOR in form for form in forms)
+
+        store.__descriptions = dump[DumpFields.DESCRIPTION].tolist() if descriptions is None else descriptions
+        assert len(store.__descriptions) == len(forms)
+        store.__alive = bytearray(b"\1" * len(forms))
+        store.__alive_count = len(forms)
+        store.__rebuild_table()
+        return store
+
+    def to_frame(self) -> pd.DataFrame:
+        dump = self.to_dump()
+        return dump if isinstance(dump, pd.DataFrame) else dump.to_frame()
+
+    def to_dump(self) -> Dump:
+        """ Returns alive rows; lazy descriptions are referred to by the dump rather than read.
+        """
+        keys = self.__get_keys_frame()
+        rows = np.flatnonzero(self.__get_alive_mask())
+        if isinstance(self.__descriptions, LazyDescriptions):
+            return self.__descriptions.take(rows).to_dump(keys)
+
+        keys[DumpFields.DESCRIPTION] = [self.__descriptions[row] for row in rows.tolist()]
+        return keys
+
+    def __len__(self) -> int:
+        return self.__alive_count
+
+    @property
+    def size(self) -> int:
+        """ A number of rows including dead ones.
+        """
+        return len(self.__row_words)
+
+    def find(self, word: str, form: str) -> int:
+        """ Returns a row of the alive word form or -1.
+        """
+        word_id = self.__word_ids.get(word)
+        if word_id is None:
+            return -1
+
+        # the loop is inlined, since it is run by every change
+        table, offsets = self.__table, self.__form_offsets
+        key_hash = hash((word_id, form))
+        mask = len(table) - 1
+        slot = key_hash & mask
+        while (row := table[slot]) != _EMPTY:
+            if row >= 0 and self.__row_hashes[row] == key_hash and self.__row_words[row] == word_id:
+                if self.__form_buffer[offsets[row]:offsets[row + 1] - 1] == form.encode("utf-8"):
+                    return row
+
+            slot = (slot + 1) & mask
+
+        return -1
+
+    def get_description(self, row: int) -> str:
+        return self.__descriptions[row]
+
+    def get_ordinal(self, row: int) -> int:
+        return self.__row_ordinals[row]
+
+    def set_description(self, row: int, description: str) -> None:
+        self.__descriptions[row] = description
+
+    def append(self, word: str, form: str, description: str) -> int:
+        word_id = self.__word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.__words)
+            self.__words.append(word)
+            self.__word_ids[word] = word_id
+
+        encoded = form.encode("utf-8")
+        self.__has_separator = self.__has_separator or _SEPARATOR in encoded
+
+        row = len(self.__row_words)
+        self.__row_words.append(word_id)
+        self.__row_ordinals.append(self.__next_ordinal)
+        self.__next_ordinal += 1
+        self.__form_buffer += encoded + _SEPARATOR
+        self.__form_offsets.append(len(self.__form_buffer))
+        self.__descriptions.append(description)
+        self.__alive.append(1)
+        self.__alive_count += 1
+
+        self.__row_hashes.append(hash((word_id, form)))
+        self.__insert_row(row)
+        return row
+
+    def delete(self, row: int) -> str:
+        """ Marks the row as dead; returns its description, which is needed to restore the row.
+        """
+        assert self.__alive[row]
+        description = self.__descriptions[row]
+
+        self.__alive[row] = 0
+        self.__alive_count -= 1
+        self.__descriptions[row] = ""
+        self.__remove_row(row)
+        return description
+
+    def restore(self, row: int, description: str) -> None:
+        """ Undoes `delete` of the row.
+        """
+        assert not self.__alive[row]
+        self.__alive[row] = 1
+        self.__alive_count += 1
+        self.__descriptions[row] = description
+        self.__insert_row(row)
+
+    def truncate(self, size: int) -> None:
+        """ Drops rows appended after the store had the size; undoes `append`.
+        """
+        for row in range(size, self.size):
+            if self.__alive[row]:
+                self.__remove_row(row)
+
+        self.__alive_count -= sum(self.__alive[size:])
+        del self.__row_words[size:]
+        del self.__row_ordinals[size:]
+        del self.__row_hashes[size:]
+        del self.__form_buffer[self.__form_offsets[size]:]
+        del self.__form_offsets[size + 1:]
+        del self.__descriptions[size:]
+        del self.__alive[size:]
+
+    def compact(self) -> None:
+        """ Drops dead rows once they outnumber alive ones.
+
+        NOTE: rows are renumbered, so rows got before cannot be restored or truncated.
+        """
+        if 2 * self.__alive_count < self.size:
+            keys = self.__get_keys_frame()
+            rows = np.flatnonzero(self.__get_alive_mask())
+            ordinals = np.frombuffer(self.__row_ordinals, dtype=np.int64)[rows]
+            if isinstance(self.__descriptions, LazyDescriptions):
+                store = WordFormsStore.from_frame(keys, self.__descriptions.take(rows), ordinals)
+            else:
+                keys[DumpFields.DESCRIPTION] = [self.__descriptions[row] for row in rows.tolist()]
+                store = WordFormsStore.from_frame(keys, ordinals=ordinals)
+
+            # ordinals of rows appended and truncated since are never reused
+            next_ordinal = self.__next_ordinal
+            self.__dict__.update(store.__dict__)
+            self.__next_ordinal = next_ordinal
+
+    # ------------------| rows table
+
+    def __probe(self, key_hash: int) -> Iterator[int]:
+        """ Yields slots of the table in order they are probed for the hash.
+        """
+        mask = len(self.__table) - 1
+        slot = key_hash & mask
+        for _ in range(len(self.__table)):
+            yield slot
+            slot = (slot + 1) & mask
+
+    def __insert_row(self, row: int) -> None:
+        for slot in self.__probe(self.__row_hashes[row]):
+            if self.__table[slot] in (_EMPTY, _REMOVED):
+                break
+
+        if self.__table[slot] == _EMPTY:
+            self.__table_used += 1
+
+        self.__table[slot] = row
+        if 2 * self.__table_used > len(self.__table):
+            self.__rebuild_table()
+
+    def __remove_row(self, row: int) -> None:
+        # a removed slot keeps probes of rows placed after it going
+        for slot in self.__probe(self.__row_hashes[row]):
+            if self.__table[slot] == row:
+                self.__table[slot] = _REMOVED
+                return
+
+        raise AssertionError(f"row {row} is not in the rows table")
+
+    def __rebuild_table(self) -> None:
+        """ Places alive rows in a new table, which is a quarter full; removed slots are dropped.
+        """
+        rows = np.flatnonzero(self.__get_alive_mask()).astype(np.int32)
+        size = 8
+        while size < 4 * len(rows):
+            size *= 2
+
+        table = np.full(size, _EMPTY, dtype=np.int32)
+        slots = np.frombuffer(self.__row_hashes, dtype=np.int64)[rows] & (size - 1)
+
+        # every round places rows at free slots, one row per slot; the others probe the next slots
+        while len(rows) > 0:
+            free = np.flatnonzero(table[slots] == _EMPTY)
+            taken, first = np.unique(slots[free], return_index=True)
+            table[taken] = rows[free[first]]
+
+            pending = np.ones(len(rows), dtype=bool)
+            pending[free[first]] = False
+            rows = rows[pending]
+            slots = (slots[pending] + 1) & (size - 1)
+
+        self.__table = array.array("i", table.tobytes())
+        self.__table_used = self.__alive_count
+
+    # ------------------| helpers
+
+    def __get_keys_frame(self) -> pd.DataFrame:
+        alive = self.__get_alive_mask()
+        words = np.asarray(self.__words, dtype=object)
+        forms = self.__decode_forms()
+
+        return pd.DataFrame({
+            DumpFields.WORD: words[np.frombuffer(self.__row_words, dtype=np.int32)[alive]],
+            DumpFields.FORM: forms[alive],
+        }, columns=[DumpFields.WORD, DumpFields.FORM])
+
+    def __get_form_bytes(self, row: int) -> bytes:
+        return bytes(self.__form_buffer[self.__form_offsets[row]:self.__form_offsets[row + 1] - 1])
+
+    def __decode_forms(self) -> np.ndarray:
+        forms = np.empty(self.size, dtype=object)
+        if self.size == 0:
+            return forms
+
+        if self.__has_separator:
+            forms[:] = [self.__get_form_bytes(row).decode("utf-8") for row in range(self.size)]
+        else:
+            forms[:] = self.__form_buffer[:-1].decode("utf-8").split(_SEPARATOR.decode())
+
+        return forms
+
+    def __get_alive_mask(self) -> np.ndarray:
+        return np.frombuffer(self.__alive, dtype=bool)
@@ -0,0 +1,75 @@
+import dataclasses
+from typing import Optional
+
+import numpy as np
+
+from .indexes import WeightedScorer, WordsIndexBase, weighted_distance
+from .vocabulary import VocabularySnapshot
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class WordsSnapshot:
+    """ A published state of a database; queries of a snapshot never see later changes.
+
+    A words index is expensive to build, so it is shared by many snapshots and is
+    never changed once built: words changed since it was built are kept aside, and
+    queries exclude removed words from the index walk and scan added ones.
+    """
+
+    version: int
+    vocabulary: VocabularySnapshot
+
+    index: Optional[WordsIndexBase] = None
+    added_words: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, dtype=object))
+    added_orders: np.ndarray = dataclasses.field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    removed_words: frozenset[str] = frozenset()
+
+    @property
+    def delta_size(self) -> int:
+        """ A number of words the index is behind the vocabulary.
+        """
+        return len(self.added_words) + len(self.removed_words)
+
+    def get_words(self) -> np.ndarray:
+        """ Returns alive words in order of their positions in the vocabulary.
+        """
+        words = self.vocabulary.get_words()
+        mask = self.vocabulary.get_words_mask()
+        return words if mask is None else words[mask]
+
+    def get_similar_words(
+        self, scorer: WeightedScorer, base: str, count: int, max_distance: Optional[int],
+    ) -> tuple[list[str], int]:
+        """ Returns the most similar words and a number of scanned candidates.
+        """
+        assert count > 0
+        if self.index is None:
+            words = self.vocabulary.get_words()
+            top = scorer.get_similar(
+                base, words, count,
+                mask=self.vocabulary.get_words_mask(),
+                max_distance=max_distance,
+                orders=self.vocabulary.get_orders(),
+            )
+            return words[top].tolist(), len(words)
+
+        scanned = self.index.scanned_candidates
+        # removed words are skipped by the walk, so they do not widen the pruning bound of the index
+        indexed = list(self.index.get_similar_words(base, count, max_distance, excluded=self.removed_words))
+        # NOTE: concurrent queries may count candidates of each other
+        scanned = self.index.scanned_candidates - scanned + len(self.added_words)
+
+        if len(self.added_words) == 0:
+            return indexed[:count], scanned
+
+        top = scorer.get_similar(base, self.added_words, count, max_distance=max_distance, orders=self.added_orders)
+
+        # ties are broken by orders of words, as the index and the scan do
+        ranked = sorted(
+            [(weighted_distance(base, word), self.vocabulary.get_order(word), word) for word in indexed]
+            + [
+                (weighted_distance(base, word), int(order), word)
+                for word, order in zip(self.added_words[top].tolist(), self.added_orders[top].tolist())
+            ]
+        )
+        return [word for *_, word in ranked[:count]], scanned
@@ -1,14 +1,14 @@
 import abc
+import contextlib
 import dataclasses
-from typing import Iterable
+from typing import Iterable, Optional
 
 import pydantic
 
-# , Optional
-
 __all__ = [
     "WordDatabaseProtocol",
     "WordFormInfo",
+    "WordSearchSessionProtocol",
 ]
 
 
@@ -19,19 +19,44 @@ class WordFormInfo:
     word: str
 
 
+class WordSearchSessionProtocol(abc.ABC):
+    """ A stateful search that may reuse work of previous queries, e.g. while a user is typing.
+    """
+
+    @abc.abstractmethod
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return []
+
+    @abc.abstractmethod
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return []
+
+
 @pydantic.dataclasses.dataclass(kw_only=True)
 class WordDatabaseProtocol(abc.ABC):
     @abc.abstractmethod
-    def get_similar_words(self, base: str, count: int) -> Iterable[str]:
+    def get_similar_words(self, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
         return []
 
     @abc.abstractmethod
-    def get_similar_forms(self, word: str, base: str, count: int) -> Iterable[str]:
+    def get_similar_words_batch(self, bases: Iterable[str], count: int) -> Iterable[Iterable[str]]:
         return []
 
-    # @abc.abstractmethod
-    # def get_word_form_info(self, word: str, form: str) -> Optional[WordFormInfo]:
-    #     return WordFormInfo()
+    @abc.abstractmethod
+    def get_similar_forms(self, word: str, base: str, count: int, max_distance: Optional[int] = None) -> Iterable[str]:
+        return []
+
+    @abc.abstractmethod
+    def open_search_session(self) -> WordSearchSessionProtocol:
+        pass
+
+    @abc.abstractmethod
+    def get_word_form_info(self, word: str, form: str) -> Optional[WordFormInfo]:
+        return None
+
+    @abc.abstractmethod
+    def get_forms(self, word: str) -> Iterable[str]:
+        return []
 
     @abc.abstractmethod
     def update_word_form(self, info: WordFormInfo) -> None:
@@ -40,3 +65,21 @@ class WordDatabaseProtocol(abc.ABC):
     @abc.abstractmethod
     def delete_word_form(self, word: str, form: str) -> None:
         pass
+
+    @abc.abstractmethod
+    def update_word_forms(self, infos: Iterable[WordFormInfo]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def delete_word_forms(self, keys: Iterable[tuple[str, str]]) -> None:
+        """ Deletes word forms given by (word, form) pairs.
+        """
+        pass
+
+    @abc.abstractmethod
+    def batch(self) -> contextlib.AbstractContextManager[None]:
+        """ Returns a context that collects changes and commits them at once on exit.
+
+        NOTE: if the context exits with an exception, the collected changes are discarded.
+        """
+        pass
@@ -1,5 +1,12 @@
-from .loggers import AnyLogger, KVLoggerAdapter
-from .system_bus import BUS, BusDeviceId, BusEventType, BusListener, BusMessage
+from typing import TYPE_CHECKING
+
+from .lazy_imports import make_lazy_exports
+
+if TYPE_CHECKING:
+    from .bus_queue import BusOverflowPolicy, BusQueueOptions, BusQueueStats
+    from .instrumentation import Instrumentation
+    from .loggers import AnyLogger, KVLoggerAdapter
+    from .system_bus import BUS, BusDeviceId, BusEventType, BusListener, BusMessage
 
 __all__ = [
     "AnyLogger",
@@ -8,5 +15,24 @@ __all__ = [
     "BusEventType",
     "BusListener",
     "BusMessage",
+    "BusOverflowPolicy",
+    "BusQueueOptions",
+    "BusQueueStats",
+    "Instrumentation",
     "KVLoggerAdapter",
 ]
+
+# the bus and the instrumentation pull in asyncio and prometheus_client, so they are imported on demand
+__getattr__, __dir__ = make_lazy_exports(__name__, {
+    "AnyLogger": ".loggers",
+    "BUS": ".system_bus",
+    "BusDeviceId": ".system_bus",
+    "BusEventType": ".system_bus",
+    "BusListener": ".system_bus",
+    "BusMessage": ".system_bus",
+    "BusOverflowPolicy": ".bus_queue",
+    "BusQueueOptions": ".bus_queue",
+    "BusQueueStats": ".bus_queue",
+    "Instrumentation": ".instrumentation",
+    "KVLoggerAdapter": ".loggers",
+})
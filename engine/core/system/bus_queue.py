@@ -0,0 +1,137 @@
+import asyncio
+import dataclasses
+import enum
+import logging
+from typing import Awaitable, Callable
+
+from .loggers import KVLoggerAdapter
+
+BusDeliver = Callable[[str, object], Awaitable[None]]
+
+
+class BusOverflowPolicy(str, enum.Enum):
+    BLOCK = "block"  # a sender waits for a free slot
+    DROP_NEWEST = "drop-newest"  # a new message is dropped
+    DROP_OLDEST = "drop-oldest"  # the oldest pending message is dropped
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class BusQueueOptions:
+    max_size: int = 1024
+    workers: int = 1  # NOTE: messages are delivered out of order if there are several workers
+    overflow_policy: BusOverflowPolicy = BusOverflowPolicy.BLOCK
+
+    # a pending message of these types is replaced by a newer one of the same type
+    coalesced_event_types: frozenset[str] = frozenset()
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class BusQueueStats:
+    depth: int
+    max_depth: int
+    enqueued: int
+    delivered: int
+    dropped: int
+    coalesced: int
+
+
+# a queue item of a coalesced event type; its message is kept apart, so it can be replaced
+_COALESCED = object()
+
+
+class BusDeviceQueue:
+    """ A bounded queue of messages of a device delivered by a pool of worker tasks.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, *, device_id: str, options: BusQueueOptions, deliver: BusDeliver) -> None:
+        assert options.max_size > 0 and options.workers > 0
+        self.__options = options
+        self.__deliver = deliver
+        self.__logger = KVLoggerAdapter(self.logger, device_id=device_id)
+
+        self.__queue = asyncio.Queue[tuple[str, object]](maxsize=options.max_size)
+        self.__pending: dict[str, object] = {}
+        self.__workers = [
+            asyncio.create_task(self.__run(), name=f"bus-queue-{device_id}-{i}")
+            for i in range(options.workers)
+        ]
+
+        self.__max_depth = 0
+        self.__enqueued = 0
+        self.__delivered = 0
+        self.__dropped = 0
+        self.__coalesced = 0
+
+    def get_stats(self) -> BusQueueStats:
+        return BusQueueStats(
+            depth=self.__queue.qsize(),
+            max_depth=self.__max_depth,
+            enqueued=self.__enqueued,
+            delivered=self.__delivered,
+            dropped=self.__dropped,
+            coalesced=self.__coalesced,
+        )
+
+    async def put(self, event_type: str, message: object) -> None:
+        item: tuple[str, object] = (event_type, message)
+        if event_type in self.__options.coalesced_event_types:
+            if event_type in self.__pending:
+                self.__pending[event_type] = message
+                self.__coalesced += 1
+                return
+
+            # the message is pending before the item is queued, so newer ones replace it while the sender waits
+            self.__pending[event_type] = message
+            item = (event_type, _COALESCED)
+
+        if self.__queue.full():
+            match self.__options.overflow_policy:
+                case BusOverflowPolicy.BLOCK:
+                    pass
+                case BusOverflowPolicy.DROP_NEWEST:
+                    self.__take_message(item)
+                    self.__dropped += 1
+                    return
+                case BusOverflowPolicy.DROP_OLDEST:
+                    self.__take_message(self.__queue.get_nowait())
+                    self.__queue.task_done()
+                    self.__dropped += 1
+                case _:
+                    raise NotImplementedError()
+
+        await self.__queue.put(item)
+        self.__enqueued += 1
+        self.__max_depth = max(self.__max_depth, self.__queue.qsize())
+
+    async def close(self, *, drain: bool = True) -> None:
+        """ Stops the workers; pending messages are delivered first if `drain` is set.
+        """
+        if drain:
+            await self.__queue.join()
+
+        for worker in self.__workers:
+            worker.cancel()
+
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+
+    # ------------------| helpers
+
+    async def __run(self) -> None:
+        while True:
+            item = await self.__queue.get()
+            try:
+                await self.__deliver(item[0], self.__take_message(item))
+                self.__delivered += 1
+            except Exception:
+                self.__logger.exception("a message of event type '%s' has not been delivered", item[0])
+            finally:
+                self.__queue.task_done()
+
+    def __take_message(self, item: tuple[str, object]) -> object:
+        event_type, message = item
+        if message is _COALESCED:
+            return self.__pending.pop(event_type)
+
+        return message
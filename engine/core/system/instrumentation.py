@@ -0,0 +1,187 @@
+import bisect
+import contextlib
+import functools
+import pathlib
+import threading
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+import prometheus_client
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is for values over all bounds
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def get_cumulative_buckets(self) -> list[tuple[str, int]]:
+        buckets: list[tuple[str, int]] = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else str(bound), total))
+
+        return buckets
+
+
+class Instrumentation(Collector):
+    """ Collects latencies and sizes of operations labeled by their names.
+
+    - `measure` records a latency of a call and counts its failures;
+    - `wrap` measures calls of an entry point that are not made by another one;
+    - `observe` records a size, e.g. a number of scanned candidates or written bytes.
+
+    Stats are exported as a snapshot dict or in the Prometheus text format.
+
+    NOTE: the instrumentation is meant to be installed only if it is enabled,
+    so that a disabled one costs nothing.
+    """
+
+    def __init__(self, *, namespace: str) -> None:
+        self.__namespace = namespace
+        self.__mutex = threading.Lock()
+        self.__latencies: dict[str, _Histogram] = {}
+        self.__failures: dict[str, int] = {}
+        self.__sizes: dict[tuple[str, str], _Histogram] = {}
+        self.__local = threading.local()  # whether a wrapped entry point is running in the thread
+
+        self.__registry = prometheus_client.CollectorRegistry(auto_describe=False)
+        self.__registry.register(self)
+
+    @contextlib.contextmanager
+    def measure(self, operation: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            with self.__mutex:
+                self.__failures[operation] = self.__failures.get(operation, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - begin
+            with self.__mutex:
+                self.__get_latency(operation).observe(elapsed)
+
+    def wrap(self, operation: str, function: T) -> T:
+        """ Returns the function measured as the operation.
+
+        NOTE: a call made by another wrapped function is a part of the outer operation,
+        e.g. `update_word_form` that calls `update_word_forms` is measured once.
+        """
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwds: Any) -> Any:
+            if getattr(self.__local, "active", False):
+                return function(*args, **kwds)
+
+            self.__local.active = True
+            try:
+                with self.measure(operation):
+                    return function(*args, **kwds)
+            finally:
+                self.__local.active = False
+
+        return wrapper  # type: ignore
+
+    def observe(self, metric: str, operation: str, value: float) -> None:
+        with self.__mutex:
+            histogram = self.__sizes.get((metric, operation))
+            if histogram is None:
+                histogram = self.__sizes[(metric, operation)] = _Histogram(SIZE_BUCKETS)
+            histogram.observe(value)
+
+    def get_snapshot(self) -> dict[str, Any]:
+        with self.__mutex:
+            return {
+                "latency_seconds": {
+                    operation: self.__get_histogram_snapshot(histogram)
+                    for operation, histogram in self.__latencies.items()
+                },
+                "failures": dict(self.__failures),
+                **{
+                    metric: {
+                        operation: self.__get_histogram_snapshot(histogram)
+                        for (metric_, operation), histogram in self.__sizes.items()
+                        if metric_ == metric
+                    }
+                    for metric in sorted({metric for metric, _ in self.__sizes})
+                },
+            }
+
+    def to_prometheus(self) -> bytes:
+        return prometheus_client.generate_latest(self.__registry)
+
+    def write_prometheus(self, path: pathlib.Path) -> None:
+        """ Writes the stats to the file atomically, e.g. for the textfile collector of the node exporter.
+        """
+        prometheus_client.write_to_textfile(str(path), self.__registry)
+
+    def collect(self) -> Iterator[Any]:
+        with self.__mutex:
+            latency = HistogramMetricFamily(
+                f"{self.__namespace}_latency_seconds",
+                "Latency of operations",
+                labels=["operation"],
+            )
+            for operation, histogram in self.__latencies.items():
+                latency.add_metric([operation], histogram.get_cumulative_buckets(), histogram.sum)
+
+            failures = CounterMetricFamily(
+                f"{self.__namespace}_failures",
+                "Failed operations",
+                labels=["operation"],
+            )
+            for operation, count in self.__failures.items():
+                failures.add_metric([operation], count)
+
+            sizes: dict[str, HistogramMetricFamily] = {}
+            for (metric, operation), histogram in self.__sizes.items():
+                family = sizes.get(metric)
+                if family is None:
+                    family = sizes[metric] = HistogramMetricFamily(
+                        f"{self.__namespace}_{metric}",
+                        f"Distribution of {metric.replace('_', ' ')}",
+                        labels=["operation"],
+                    )
+                family.add_metric([operation], histogram.get_cumulative_buckets(), histogram.sum)
+
+        yield latency
+        yield failures
+        yield from sizes.values()
+
+    # ------------------| helpers
+
+    def __get_latency(self, operation: str) -> _Histogram:
+        histogram = self.__latencies.get(operation)
+        if histogram is None:
+            histogram = self.__latencies[operation] = _Histogram(LATENCY_BUCKETS)
+
+        return histogram
+
+    @staticmethod
+    def __get_histogram_snapshot(histogram: _Histogram) -> dict[str, Any]:
+        return {
+            "count": histogram.count,
+            "sum": histogram.sum,
+            "buckets": dict(histogram.get_cumulative_buckets()),
+        }
@@ -0,0 +1,25 @@
+import importlib
+from typing import Any, Callable
+
+
+def make_lazy_exports(package: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """ Returns `__getattr__` and `__dir__` of a package that imports its exports on first access.
+
+    The exports map names to modules relative to the package; an export named as
+    its module is the module itself. An imported export is cached in the package.
+    """
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+        module = importlib.import_module(module_name, package)
+        value = module if module_name == f".{name}" else getattr(module, name)
+
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(exports)
+
+    return __getattr__, __dir__
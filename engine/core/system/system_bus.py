@@ -1,11 +1,14 @@
 import abc
+import asyncio
 import collections
 import dataclasses
+import functools
 import logging
 from typing import Awaitable, Callable, Iterable, Optional
 
 import aiorwlock
 
+from .bus_queue import BusDeviceQueue, BusQueueOptions, BusQueueStats
 from .loggers import KVLoggerAdapter
 
 
@@ -20,62 +23,57 @@ BusDeviceId = str
 BusListener = Callable[[BusEventType, BusMessage], Awaitable[None]]
 
 
-@dataclasses.dataclass(kw_only=True)
-class _BusListenerDispatcher:
-    event_type: Optional[BusEventType]
-    listener: BusListener
-
-    def dispatch(self, event_type: BusEventType, message: BusMessage) -> bool:
-        if self.event_type is None or self.event_type == event_type:
-            self.listener(event_type, message)
-            return True
-
-        return False
+# a key of listeners of a device; None stands for listeners of every event type
+_BusListenersKey = tuple[BusDeviceId, Optional[BusEventType]]
 
 
 @dataclasses.dataclass(kw_only=True)
 class AsyncIOMessageBusController:
     """ Class that provides a simple message bus interface.
 
+    Listeners are kept in tables keyed by (device_id, event_type); listeners of every
+    event type of a device are kept apart. A message is delivered to all of its
+    listeners concurrently, and an error of one listener does not affect the others.
+
+    By default messages are delivered on the sender's stack. A device may have a
+    queue instead, see `enable_queue`; then a sender only waits for a queue slot.
+
     NOTE: The bus is expected to be used in a async io singlethreaded context.
     """
 
-    dispatchers = collections.defaultdict[BusDeviceId, list[_BusListenerDispatcher]](list)
     logger = logging.getLogger()
 
     def __post_init__(self) -> None:
         self.__mutex = aiorwlock.RWLock()
+        self.__listeners = dict[_BusListenersKey, list[BusListener]]()
+        self.__device_event_types = collections.defaultdict[BusDeviceId, set[Optional[BusEventType]]](set)
+        self.__queues = dict[BusDeviceId, BusDeviceQueue]()
 
     async def register(
         self, device_id: BusDeviceId, listener: BusListener, *,
         event_types: Optional[Iterable[BusEventType]] = None,
     ) -> None:
-        with self.__mutex.writer_lock:
+        async with self.__mutex.writer_lock:
             logger = KVLoggerAdapter(self.logger, device_id=device_id)
 
-            all_event_types = list(event_types or [None])
-            new_event_types = set(event_types or [None])
+            for event_type in set(event_types or [None]):
+                listeners = self.__listeners.setdefault((device_id, event_type), [])
+                if listener in listeners:
+                    logger.info(f"event type '{event_type}' is already registred")
+                    continue
 
-            dispatchers = self.dispatchers[device_id]
-            for dispatcher in dispatchers:
-                if dispatcher.listener == listener:
-                    if dispatcher.event_type in all_event_types:
-                        logger.info(f"event type '{dispatcher.event_type}' is already registred")
-                        new_event_types.remove(dispatcher.event_type)
-
-            for event_type in new_event_types:
                 logger.info("registing a listener for event type '%s'", event_type)
-                dispatchers.append(_BusListenerDispatcher(
-                    event_type=event_type,
-                    listener=listener,
-                ))
+                self.__device_event_types[device_id].add(event_type)
+
+                # the list is replaced, so messages being sent keep their listeners
+                self.__listeners[(device_id, event_type)] = listeners + [listener]
 
     async def unregister(
         self, device_id: BusDeviceId, listener: BusListener, *,
         event_types: Optional[Iterable[BusEventType]] = None,
         remove_all: bool = False,
     ) -> None:
-        with self.__mutex.writer_lock:
+        async with self.__mutex.writer_lock:
             logger = KVLoggerAdapter(self.logger, device_id=device_id)
 
             if remove_all and event_types is not None:
@@ -84,39 +82,92 @@ class AsyncIOMessageBusController:
                     "all events for the device will be removed"
                 )
 
-            all_event_types = list(event_types or [None])
-
-            def must_be_removed(dispatcher: _BusListenerDispatcher) -> bool:
-                if dispatcher.listener != listener:
-                    return False
-
-                on_remove = remove_all or dispatcher.event_type in all_event_types
-                if on_remove:
-                    logger.info("registing a listener for event type '%s'", dispatcher.event_type)
+            device_event_types = self.__device_event_types.get(device_id, set())
+            if remove_all:
+                removed_event_types = set(device_event_types)
+            else:
+                removed_event_types = device_event_types.intersection(event_types or [None])
+
+            for event_type in removed_event_types:
+                listeners = self.__listeners[(device_id, event_type)]
+                if listener not in listeners:
+                    continue
+
+                logger.info("unregisting a listener for event type '%s'", event_type)
+                listeners = [x for x in listeners if x != listener]
+                if len(listeners) > 0:
+                    self.__listeners[(device_id, event_type)] = listeners
+                    continue
+
+                del self.__listeners[(device_id, event_type)]
+                device_event_types.discard(event_type)
+
+            if len(device_event_types) == 0 and device_id in self.__device_event_types:
+                logger.info("divice has no listeners and will be removed from bus")
+                del self.__device_event_types[device_id]
+
+    async def enable_queue(self, device_id: BusDeviceId, options: BusQueueOptions) -> None:
+        """ Makes messages of the device be delivered from a bounded queue by worker tasks of the running loop.
+        """
+        async with self.__mutex.writer_lock:
+            if device_id in self.__queues:
+                raise ValueError(f"device '{device_id}' already has a queue")
+
+            self.__queues[device_id] = BusDeviceQueue(
+                device_id=device_id,
+                options=options,
+                deliver=functools.partial(self.__deliver, device_id),
+            )
+
+    async def disable_queue(self, device_id: BusDeviceId, *, drain: bool = True) -> None:
+        """ Returns the device to inline delivery; pending messages are dropped unless `drain` is set.
+        """
+        async with self.__mutex.writer_lock:
+            queue = self.__queues.pop(device_id, None)
+
+        if queue is not None:
+            await queue.close(drain=drain)
+
+    def get_queue_stats(self, device_id: BusDeviceId) -> Optional[BusQueueStats]:
+        queue = self.__queues.get(device_id)
+        return queue.get_stats() if queue is not None else None
 
-                return on_remove
-
-            dispatchers = self.dispatchers[device_id]
-            dispatchers = [clb for clb in dispatchers if not must_be_removed(clb)]
-
-            if len(dispatchers) > 0:
-                self.dispatchers[device_id] = dispatchers
+    async def send_message(self, device_id: BusDeviceId, event_type: str, message: BusMessage) -> None:
+        queue = self.__queues.get(device_id)
+        if queue is not None:
+            await queue.put(event_type, message)
+        else:
+            await self.__deliver(device_id, event_type, message)
+
+    async def __deliver(self, device_id: BusDeviceId, event_type: str, message: BusMessage) -> None:
+        async with self.__mutex.reader_lock:
+            if device_id not in self.__device_event_types:
+                KVLoggerAdapter(self.logger, device_id=device_id).warning("device_id was not found")
                 return
 
-            logger.info("divice has no listeners and will be removed from bus")
-            del self.dispatchers[device_id]
-
-    async def send_message(self, device_id: BusDeviceId, event_type: str, message: BusMessage) -> None:
-        with self.__mutex.reader_lock:
-            logger = KVLoggerAdapter(self.logger, device_id=device_id)
+            # listeners are called out of the lock, so they may (un)register themselves
+            listeners = self.__listeners.get((device_id, event_type), []) + self.__listeners.get((device_id, None), [])
 
-            if device_id not in self.dispatchers:
-                logger.warning("device_id was not found")
-                return
+        if len(listeners) == 1:
+            await self.__notify(listeners[0], device_id, event_type, message)
+        elif len(listeners) > 1:
+            await asyncio.gather(*(
+                self.__notify(listener, device_id, event_type, message)
+                for listener in listeners
+            ))
 
-            for dispatcher in self.dispatchers[device_id]:
-                if dispatcher.event_type == event_type:
-                    dispatcher.listener(event_type, message)
+    async def __notify(
+        self, listener: BusListener,
+        device_id: BusDeviceId, event_type: BusEventType, message: BusMessage,
+    ) -> None:
+        try:
+            await listener(event_type, message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            KVLoggerAdapter(self.logger, device_id=device_id).exception(
+                "a listener of event type '%s' has failed", event_type,
+            )
 
 
 BUS = AsyncIOMessageBusController()
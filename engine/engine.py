@@ -1,34 +1,120 @@
 import pathlib
+from typing import TYPE_CHECKING, Callable
 
 from engine.core import databases
-from engine.core.databases import storages
-from engine.core.protocols.words_databse_protocol import WordDatabaseProtocol
-from engine.views import notebook_io
+from engine.core.protocols.words_databse_protocol import WordDatabaseProtocol, WordSearchSessionProtocol
+
+if TYPE_CHECKING:
+    from engine.views.notebook_io_impl import WordInputForm
 
 
 class Engine:
     def open_csv_database(self, path: pathlib.Path) -> WordDatabaseProtocol:
-        storage = storages.CSVStorage(
-            options=storages.CSVStorageOptions(
+        storage = databases.storages.CSVStorage(
+            options=databases.storages.CSVStorageOptions(
                 path=path,
             ),
         )
 
-        words_database = databases.WordsDatabase(
-            storage=storage,
-            options=databases.WordsDatabaseOptions(),
+        return self.__open_database(storage)
+
+    def open_journal_database(self, path: pathlib.Path) -> WordDatabaseProtocol:
+        storage = databases.storages.JournalStorage(
+            options=databases.storages.JournalStorageOptions(
+                path=path,
+            ),
         )
 
-        return words_database
+        return self.__open_database(storage)
+
+    def open_sqlite_database(self, path: pathlib.Path) -> WordDatabaseProtocol:
+        storage = databases.storages.SQLiteStorage(
+            options=databases.storages.SQLiteStorageOptions(
+                path=path,
+            ),
+        )
+
+        return self.__open_database(storage)
+
+    def migrate_csv_database(self, csv_path: pathlib.Path, sqlite_path: pathlib.Path) -> WordDatabaseProtocol:
+        """ Copies a database created by `open_csv_database` to a SQLite file and opens it.
+        """
+        source = databases.storages.CSVStorage(
+            options=databases.storages.CSVStorageOptions(
+                path=csv_path,
+            ),
+        )
+
+        storage = databases.storages.SQLiteStorage(
+            options=databases.storages.SQLiteStorageOptions(
+                path=sqlite_path,
+            ),
+        )
+        storage.import_dump(source)
+
+        return self.__open_database(storage)
+
+    def open_headless_csv_database(self, path: pathlib.Path) -> WordSearchSessionProtocol:
+        """ Opens read-only queries of a database created by `open_csv_database` without loading pandas.
+
+        NOTE: if the index cache of the database is missing or stale, the database is loaded once to rebuild it.
+        """
+        return self.__open_headless_database([path], lambda: self.open_csv_database(path))
+
+    def open_headless_sqlite_database(self, path: pathlib.Path) -> WordSearchSessionProtocol:
+        """ Opens read-only queries of a database created by `open_sqlite_database` without loading pandas.
+
+        NOTE: if the index cache of the database is missing or stale, the database is loaded once to rebuild it.
+        """
+        sources = [path, path.with_name(path.name + "-wal")]
+        return self.__open_headless_database(sources, lambda: self.open_sqlite_database(path))
+
+    def connect_remote_database(self, address: pathlib.Path | tuple[str, int]) -> WordDatabaseProtocol:
+        """ Connects to a database served by `python -m engine.core.databases.query_server` on a Unix socket or a localhost port.
+        """
+        return databases.RemoteWordDatabase(address=address)
+
+    def open_words_input(self, words_database: WordDatabaseProtocol) -> "WordInputForm":
+        """ Displays an input form of the database; `close` the form once it is not needed anymore.
+        """
+        # the widget stack is only loaded for the input form
+        from engine.views import notebook_io
 
-    def open_words_input(self, words_database: WordDatabaseProtocol) -> None:
         controller = notebook_io.NotebookIO(
             view_config=notebook_io.ElementConfig(
                 show_debug_frames=False,
             ),
         )
 
-        controller.open_word_input_form(
+        # the form follows changes made elsewhere if the database sends change events
+        events_device_id = None
+        if isinstance(words_database, databases.WordsDatabase):
+            events_device_id = words_database.get_events_device_id()
+
+        return controller.open_word_input_form(
             database=words_database,
-            options=notebook_io.WordInputFormOptions(),
+            options=notebook_io.WordInputFormOptions(
+                events_device_id=events_device_id,
+            ),
         )
+
+    def __open_headless_database(
+        self, sources: list[pathlib.Path], open_database: Callable[[], WordDatabaseProtocol],
+    ) -> WordSearchSessionProtocol:
+        if database := databases.HeadlessWordsDatabase.open(sources):
+            return database
+
+        # the database saves the index cache once it is loaded
+        open_database()
+        if database := databases.HeadlessWordsDatabase.open(sources):
+            return database
+
+        raise RuntimeError(f"index cache of '{sources[0]}' cannot be built")
+
+    def __open_database(self, storage: "databases.storages.StorageBase") -> WordDatabaseProtocol:
+        words_database = databases.WordsDatabase(
+            storage=storage,
+            options=databases.WordsDatabaseOptions(),
+        )
+
+        return words_database
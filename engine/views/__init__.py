@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING
+
+from engine.core.system.lazy_imports import make_lazy_exports
+
+if TYPE_CHECKING:
+    from . import notebook_io
+
+__all__ = [
+    "notebook_io",
+]
+
+# the views load IPython and ipywidgets, so they are imported on first access
+__getattr__, __dir__ = make_lazy_exports(__name__, {
+    "notebook_io": ".notebook_io",
+})
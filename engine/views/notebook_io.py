@@ -21,7 +21,9 @@ class NotebookIO:
         self, *,
         database: words_databse_protocol.WordDatabaseProtocol,
         options: WordInputFormOptions,
-    ) -> None:
+    ) -> notebook_io_impl.WordInputForm:
+        """ Displays a new form; the form holds a BUS listener and a worker thread until it is closed.
+        """
         form = notebook_io_impl.WordInputForm(
             word_input_options=options,
             database=database,
@@ -29,3 +31,4 @@ class NotebookIO:
         )
 
         IPython.display.display(form.get_widget())
+        return form
@@ -0,0 +1,153 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import logging
+from typing import Callable, Optional
+
+from engine.core.databases.change_events import BatchCommitted
+from engine.core.system import BUS, BusDeviceId, BusEventType, BusMessage
+
+SuggestionSearch = Callable[[], list[str]]
+SuggestionSink = Callable[[list[str]], None]
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class SuggestionQueryChanged(BusMessage):
+    generation: int
+    search: SuggestionSearch
+
+
+class SuggestionPipeline:
+    """ Runs suggestion searches off the widget callbacks.
+
+    Every query is sent over the BUS; its listener waits for the debounce delay,
+    runs the search in a single worker thread and applies the result only if no
+    newer query has arrived meanwhile. A pending query is cancelled by a newer one.
+
+    If a device of change events of the database is given, the last query is searched
+    again once a batch of changes is committed, e.g. by another form of the database.
+
+    The pipeline holds listeners on the BUS and a worker thread until `close` is called.
+
+    NOTE: without a running event loop (e.g. out of a notebook) searches are run inline.
+    """
+
+    EVENT_TYPE: BusEventType = "suggestion-query-changed"
+
+    logger = logging.getLogger()
+
+    def __init__(
+        self, *, device_id: BusDeviceId, debounce: float, sink: SuggestionSink,
+        changes_device_id: Optional[BusDeviceId] = None,
+    ) -> None:
+        self.__device_id = device_id
+        self.__debounce = debounce
+        self.__sink = sink
+        self.__changes_device_id = changes_device_id
+
+        # a single worker keeps searches of a form serialized
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.__generation = 0
+        self.__last_search: Optional[SuggestionSearch] = None
+        self.__registration: Optional[asyncio.Task[None]] = None  # listeners are registered in its loop
+        self.__task: Optional[asyncio.Task[None]] = None
+        self.__closed = False
+
+    def submit(self, search: SuggestionSearch) -> None:
+        if self.__closed:
+            return
+
+        self.__last_search = search
+        self.__generation += 1
+        message = SuggestionQueryChanged(
+            generation=self.__generation,
+            search=search,
+        )
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.__sink(search())
+            return
+
+        if self.__task is not None:
+            self.__task.cancel()
+
+        self.__task = loop.create_task(self.__send(message))
+
+    def close(self) -> None:
+        """ Unregisters the listeners from the BUS and stops the worker; pending searches are dropped.
+        """
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__generation += 1  # makes results of running searches stale
+
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+        registration, self.__registration = self.__registration, None
+        if registration is None or registration.get_loop().is_closed():
+            return
+
+        loop = registration.get_loop()
+        unregister = self.__unregister(registration)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            loop.create_task(unregister)
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(unregister, loop)
+        else:
+            loop.run_until_complete(unregister)
+
+    async def __send(self, message: SuggestionQueryChanged) -> None:
+        # the registration is shielded, so a newer query does not cancel it midway
+        if self.__registration is None:
+            self.__registration = asyncio.get_running_loop().create_task(self.__register())
+        await asyncio.shield(self.__registration)
+
+        await BUS.send_message(self.__device_id, self.EVENT_TYPE, message)
+
+    async def __register(self) -> None:
+        await BUS.register(self.__device_id, self.__on_query_changed, event_types=[self.EVENT_TYPE])
+        if self.__changes_device_id is not None:
+            await BUS.register(self.__changes_device_id, self.__on_changes_committed, event_types=[BatchCommitted.EVENT_TYPE])
+
+    async def __unregister(self, registration: asyncio.Task[None]) -> None:
+        await asyncio.wait([registration])
+
+        await BUS.unregister(self.__device_id, self.__on_query_changed, event_types=[self.EVENT_TYPE])
+        if self.__changes_device_id is not None:
+            await BUS.unregister(self.__changes_device_id, self.__on_changes_committed, event_types=[BatchCommitted.EVENT_TYPE])
+
+    async def __on_changes_committed(self, event_type: BusEventType, message: BusMessage) -> None:
+        if self.__last_search is not None:
+            self.submit(self.__last_search)
+
+    async def __on_query_changed(self, event_type: BusEventType, message: BusMessage) -> None:
+        assert isinstance(message, SuggestionQueryChanged)
+
+        if self.__debounce > 0:
+            await asyncio.sleep(self.__debounce)
+
+        if message.generation != self.__generation:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            variants = await loop.run_in_executor(self.__executor, message.search)
+        except Exception:
+            self.logger.exception("suggestion search has failed")
+            return
+
+        # the result is stale if a newer query has arrived while the search was running
+        if message.generation == self.__generation:
+            self.__sink(variants)
@@ -1,6 +1,6 @@
 import dataclasses
 import enum
-from typing import Any
+from typing import Any, Optional
 
 from ipywidgets import widgets
 
@@ -10,6 +10,7 @@ from engine.core.protocols.words_databse_protocol import (
 )
 
 from .element_base import ElementBase
+from .suggestion_pipeline import SuggestionPipeline
 from .word_input_form_card import WordInputCard
 from .word_input_form_suggestion import WordInputSuggestion
 
@@ -23,6 +24,11 @@ class _InputMode(str, enum.Enum):
 class WordInputFormOptions:
     similar_words_count: int = 20
     similar_forms_count: int = 20
+    suggestions_debounce: float = 0.15  # seconds
+    suggestions_page_size: int = 50  # variants shown at once; larger counts are paged
+
+    # suggestions are searched again once the database sends `BatchCommitted` to the device
+    events_device_id: Optional[str] = None
 
 
 @dataclasses.dataclass(kw_only=True)
@@ -32,6 +38,7 @@ class WordInputForm(ElementBase):
 
     def __post_init__(self):
         self.__input_mode = _InputMode.WORD
+        self.__search_session = self.database.open_search_session()
 
         self.__form_title = self._wrap_element(
             widgets.Label("Word input and update form")
@@ -43,6 +50,14 @@ class WordInputForm(ElementBase):
 
         self.__suggestions = WordInputSuggestion(
             config=self.config,
+            page_size=self.word_input_options.suggestions_page_size,
+        )
+
+        self.__suggestion_pipeline = SuggestionPipeline(
+            device_id=f"word-input-form-{id(self)}",
+            debounce=self.word_input_options.suggestions_debounce,
+            sink=self.__show_suggestions,
+            changes_device_id=self.word_input_options.events_device_id,
         )
 
         self.__form_layout = widgets.AppLayout(
@@ -75,6 +90,12 @@ class WordInputForm(ElementBase):
     def get_widget(self) -> widgets.Widget:
         return self.__form_layout
 
+    def close(self) -> None:
+        """ Releases the suggestion pipeline and closes the layout of the form.
+        """
+        self.__suggestion_pipeline.close()
+        self.__form_layout.close()
+
     def __mode_updater(self, mode: _InputMode):
         def callback(value: str, couser: Any) -> None:
             if self.__input_mode != mode:
@@ -90,11 +111,17 @@ class WordInputForm(ElementBase):
                     self.__word_card.word.set_value(value, self)
                 case _InputMode.FORM:
                     self.__word_card.form.set_value(value, self)
+                    self.__prefill_description()
                 case _:
                     raise NotImplementedError()
 
         self.__suggestions.selected.observe(callback)
 
+    def __prefill_description(self) -> None:
+        info = self.database.get_word_form_info(self.__word_card.word.value, self.__word_card.form.value)
+        if info is not None:
+            self.__word_card.description.set_value(info.description, self)
+
     def __add_mode_detector_action(self):
         self.__word_card.word.observe(self.__mode_updater(_InputMode.WORD))
         self.__word_card.form.observe(self.__mode_updater(_InputMode.FORM))
@@ -107,14 +134,19 @@ class WordInputForm(ElementBase):
 
     def __update_words_list(self, word: str, couser: Any) -> None:
         limit = self.word_input_options.similar_words_count
-        words = self.database.get_similar_words(word, limit)
-        self.__suggestions.variants.set_value(list(words), self)
+        self.__suggestion_pipeline.submit(
+            lambda: list(self.__search_session.get_similar_words(word, limit))
+        )
 
     def __update_forms_list(self, form: str, couser: Any) -> None:
         word = self.__word_card.word.value
         limit = self.word_input_options.similar_words_count
-        forms = self.database.get_similar_forms(word, form, limit)
-        self.__suggestions.variants.set_value(list(forms), self)
+        self.__suggestion_pipeline.submit(
+            lambda: list(self.__search_session.get_similar_forms(word, form, limit))
+        )
+
+    def __show_suggestions(self, variants: list[str]) -> None:
+        self.__suggestions.variants.set_value(variants, self)
 
     def __update_suggestion_form(self) -> None:
         match self.__input_mode:
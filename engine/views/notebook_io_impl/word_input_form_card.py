@@ -121,6 +121,16 @@ class WordInputCard(ElementBase):
     def _(self, new_value: str, couser: ElementBase) -> None:
         self.__form.set_value(new_value, couser)
 
+    @element_property
+    def description(self) -> str:
+        value = self.__description.value
+        assert isinstance(value, str)
+        return value
+
+    @description.setter
+    def _(self, new_value: str, couser: ElementBase) -> None:
+        self.__description.set_value(new_value, couser)
+
     @element_property
     def on_word_submit(self) -> words_databse_protocol.WordFormInfo:
         return words_databse_protocol.WordFormInfo(
@@ -1,5 +1,6 @@
+import asyncio
 import dataclasses
-from typing import Iterable, Optional
+from typing import Optional
 
 from ipywidgets import widgets
 
@@ -12,12 +13,31 @@ from .element_base import (
 
 _EMPTY_VALUE = ""
 
+# options are sent to the frontend at most once a frame; newer variants replace pending ones
+_FRAME_INTERVAL = 1 / 60  # seconds
+
 
 @dataclasses.dataclass(kw_only=True)
 class WordInputSuggestion(ElementBase):
+    """ A list of suggested variants shown by pages.
+
+    Every change of options is sent to the frontend whole, so the list only holds a
+    page of variants and is not updated if the page is unchanged. Variants set while
+    an update is pending replace the pending ones.
+
+    NOTE: without a running event loop (e.g. out of a notebook) options are updated at once.
+    """
+
+    page_size: int = 50
+
     def __post_init__(self):
+        assert self.page_size > 0
         DEFAULT_TEXT_WIDTH = "99%"
 
+        self.__variants: list[str] = []
+        self.__page = 0
+        self.__render_handle: Optional[asyncio.TimerHandle] = None
+
         self.__sudgestions_title = self._wrap_element(
             widgets.Label("")
         )
@@ -25,7 +45,7 @@ class WordInputSuggestion(ElementBase):
         self.__sudgestions_list = ChangableWidget[widgets.Select](
             config=self.config,
             widget=widgets.Select(
-                options=[],
+                options=[_EMPTY_VALUE],
                 layout={
                     "height": "99%",
                     "width": DEFAULT_TEXT_WIDTH,
@@ -33,10 +53,32 @@ class WordInputSuggestion(ElementBase):
             )
         ).add_callback(self.__on_value_selected)
 
+        self.__previous_page = self._wrap_element(
+            widgets.Button(description="◀", tooltip="previous variants", layout={"width": "40px"})
+        )
+        self.__previous_page.on_click(lambda _: self.__turn_page(-1))
+
+        self.__next_page = self._wrap_element(
+            widgets.Button(description="▶", tooltip="next variants", layout={"width": "40px"})
+        )
+        self.__next_page.on_click(lambda _: self.__turn_page(+1))
+
+        self.__page_title = self._wrap_element(
+            widgets.Label("")
+        )
+
+        self.__pager = self._wrap_element(
+            widgets.HBox(
+                [self.__previous_page, self.__page_title, self.__next_page],
+                layout={"display": "none"},
+            )
+        )
+
         self.__sudgestions_layout = self._wrap_element(
             widgets.VBox([
                 self.__sudgestions_title,
                 self.__sudgestions_list.get_widget(),
+                self.__pager,
             ])
         )
 
@@ -60,13 +102,51 @@ class WordInputSuggestion(ElementBase):
 
     @element_property
     def variants(self) -> list[str]:
-        options = self.__sudgestions_list.widget.options
-        assert isinstance(options, Iterable)
-        return list(options)  # type: ignore
+        return list(self.__variants)
 
     @variants.setter
     def _(self, new_value: list[str], couser: ElementBase) -> None:
-        self.__sudgestions_list.widget.options = [_EMPTY_VALUE] + new_value
+        if new_value == self.__variants:
+            return
+
+        self.__variants = list(new_value)
+        self.__page = 0
+        self.__schedule_render()
+
+    # ------------------| rendering
+
+    def __turn_page(self, step: int) -> None:
+        page = min(max(self.__page + step, 0), self.__get_page_count() - 1)
+        if page != self.__page:
+            self.__page = page
+            self.__schedule_render()
+
+    def __get_page_count(self) -> int:
+        return max(1, -(-len(self.__variants) // self.page_size))
+
+    def __schedule_render(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.__render()
+            return
+
+        if self.__render_handle is None:
+            self.__render_handle = loop.call_later(_FRAME_INTERVAL, self.__render)
+
+    def __render(self) -> None:
+        self.__render_handle = None
+
+        begin = self.__page * self.page_size
+        options = (_EMPTY_VALUE, *self.__variants[begin:begin + self.page_size])
+        if options != tuple(self.__sudgestions_list.widget.options):
+            self.__sudgestions_list.widget.options = options
+
+        page_count = self.__get_page_count()
+        self.__previous_page.disabled = self.__page == 0
+        self.__next_page.disabled = self.__page + 1 >= page_count
+        self.__page_title.value = f"{self.__page + 1} / {page_count}"
+        self.__pager.layout.display = None if page_count > 1 else "none"
 
     # ------------------| callbacks
 
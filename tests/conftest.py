@@ -0,0 +1,8 @@
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# the engine is imported from the repository
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
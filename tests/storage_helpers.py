@@ -0,0 +1,24 @@
+""" Rows and changes shared by tests of storages.
+"""
+
+import pandas as pd
+
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import StorageChange, StorageChangeKind
+
+
+def make_frame(rows: list[tuple[str, str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION])
+
+
+def get_rows(dump: pd.DataFrame | None) -> list[tuple[str, str, str]]:
+    assert dump is not None
+    return [tuple(row) for row in dump[[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]].itertuples(index=False)]
+
+
+def make_upsert(word: str, form: str, description: str) -> StorageChange:
+    return StorageChange(kind=StorageChangeKind.UPSERT, word=word, form=form, description=description)
+
+
+def make_delete(word: str, form: str) -> StorageChange:
+    return StorageChange(kind=StorageChangeKind.DELETE, word=word, form=form)
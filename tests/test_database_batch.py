@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from engine.core import databases
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import SQLiteStorage, SQLiteStorageOptions
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+
+def _open(path) -> databases.WordsDatabase:
+    return databases.WordsDatabase(
+        storage=SQLiteStorage(options=SQLiteStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(index_cache=False),
+    )
+
+
+def _rows(database: databases.WordsDatabase) -> list[tuple[str, str, str]]:
+    dump = database.storage.read_dump()
+    assert dump is not None
+    return [tuple(row) for row in dump[[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]].itertuples(index=False)]
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "words.sqlite"
+    SQLiteStorage(options=SQLiteStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [("cat", "cat", "a pet"), ("cat", "cats", "pets"), ("dog", "dog", "a pet")],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    return _open(path)
+
+
+def test_batch_is_rolled_back_if_save_fails(database, monkeypatch):
+    def fail(self, dump, changes):
+        raise OSError("disk is full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(SQLiteStorage, "save_changes", fail)
+        with pytest.raises(OSError):
+            with database.batch():
+                database.update_word_form(WordFormInfo(word="cat", form="cat", description="a cat"))
+                database.update_word_form(WordFormInfo(word="owl", form="owl", description="a bird"))
+                database.delete_word_form("dog", "dog")
+                database.delete_word_form("cat", "cats")
+
+    # neither the rows nor the indexes see a change
+    assert database.get_word_form_info("cat", "cat") == WordFormInfo(word="cat", form="cat", description="a pet")
+    assert database.get_word_form_info("owl", "owl") is None
+    assert list(database.get_forms("cat")) == ["cat", "cats"]
+    assert list(database.get_forms("dog")) == ["dog"]
+    assert list(database.get_similar_words("owl", 3)) == ["cat", "dog"]
+    assert _rows(database) == [("cat", "cat", "a pet"), ("cat", "cats", "pets"), ("dog", "dog", "a pet")]
+
+    # the database stays usable after the rollback
+    with database.batch():
+        database.delete_word_form("dog", "dog")
+        database.update_word_form(WordFormInfo(word="owl", form="owl", description="a bird"))
+
+    assert list(database.get_similar_words("owl", 3)) == ["owl", "cat"]
+    assert _rows(database) == [("cat", "cat", "a pet"), ("cat", "cats", "pets"), ("owl", "owl", "a bird")]
+
+
+def test_batch_is_discarded_if_its_body_fails(database):
+    with pytest.raises(RuntimeError):
+        with database.batch():
+            database.delete_word_form("dog", "dog")
+            raise RuntimeError("cancelled")
+
+    assert list(database.get_forms("dog")) == ["dog"]
+    assert _rows(database) == [("cat", "cat", "a pet"), ("cat", "cats", "pets"), ("dog", "dog", "a pet")]
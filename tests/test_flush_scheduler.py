@@ -0,0 +1,27 @@
+import threading
+import time
+
+from engine.core.databases.flush_scheduler import FlushScheduler
+
+
+def test_failed_flush_is_retried_without_new_edits():
+    calls: list[float] = []
+    flushed = threading.Event()
+
+    def flush() -> None:
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise OSError("disk is full")
+
+        flushed.set()
+
+    # the edits reach `max_edits` at once, but the retry still waits for the delay
+    scheduler = FlushScheduler(flush=flush, delay=0.2, max_edits=1, name="flush-test")
+    scheduler.notify(1)
+    try:
+        assert flushed.wait(5)
+    finally:
+        scheduler.close()
+
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.2
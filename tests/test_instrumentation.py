@@ -0,0 +1,45 @@
+import pandas as pd
+
+from engine.core import databases
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+
+def _counts(database: databases.WordsDatabase) -> dict[str, int]:
+    instrumentation = database.get_instrumentation()
+    assert instrumentation is not None
+    return {
+        operation: histogram["count"]
+        for operation, histogram in instrumentation.get_snapshot()["latency_seconds"].items()
+        if not operation.startswith("storage.")
+    }
+
+
+def test_only_outermost_calls_are_measured(tmp_path):
+    path = tmp_path / "words.tsv"
+    CSVStorage(options=CSVStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [("cat", "cat", "a pet"), ("dog", "dog", "a pet")],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    database = databases.WordsDatabase(
+        storage=CSVStorage(options=CSVStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(index_cache=False, instrumentation=True),
+    )
+
+    database.update_word_form(WordFormInfo(word="owl", form="owl", description="a bird"))
+    database.delete_word_form("dog", "dog")
+    database.get_similar_words("cax", 2)
+
+    session = database.open_search_session()
+    session.get_similar_words("ca", 2)
+    session.get_similar_forms("cat", "ca", 2)
+
+    assert _counts(database) == {
+        "update_word_form": 1,
+        "delete_word_form": 1,
+        "get_similar_words": 1,
+        "open_search_session": 1,
+        "session.get_similar_words": 1,
+        "session.get_similar_forms": 1,
+    }
@@ -0,0 +1,89 @@
+import pytest
+from storage_helpers import get_rows, make_delete, make_frame, make_upsert
+
+from engine.core.databases.storages import (
+    CSVStorage,
+    CSVStorageOptions,
+    JournalStorage,
+    JournalStorageOptions,
+)
+
+
+def test_journal_is_replayed_after_crash_during_compaction(tmp_path, monkeypatch):
+    path = tmp_path / "words.tsv"
+    storage = JournalStorage(options=JournalStorageOptions(path=path, compaction_threshold=1))
+    storage.save_dump(make_frame([("cat", "cat", "a pet"), ("dog", "dog", "a pet")]))
+
+    # the snapshot is never replaced, as if the process died while writing it
+    def crash(self, dump):
+        path.with_name(path.name + ".tmp").write_text("torn", encoding="utf-8")
+        raise OSError("crashed")
+
+    monkeypatch.setattr(CSVStorage, "save_dump", crash)
+    state = [("cat", "cat", "a cat"), ("dog", "dog", "a pet")]
+    storage.save_changes(lambda: make_frame(state), [make_upsert("cat", "cat", "a cat")])
+    storage.wait_compaction()
+    assert path.with_name(path.name + ".journal.pending").exists()
+
+    # changes journaled after the failed compaction are replayed on top of the pending ones
+    storage.save_changes(lambda: make_frame(state), [make_delete("dog", "dog"), make_upsert("owl", "owl", "a bird")])
+    storage.wait_compaction()
+    monkeypatch.undo()
+
+    reopened = JournalStorage(options=JournalStorageOptions(path=path))
+    assert get_rows(reopened.read_dump()) == [("cat", "cat", "a cat"), ("owl", "owl", "a bird")]
+
+
+def test_torn_journal_record_is_ignored(tmp_path):
+    path = tmp_path / "words.tsv"
+    storage = JournalStorage(options=JournalStorageOptions(path=path))
+    storage.save_dump(make_frame([("cat", "cat", "a pet")]))
+    storage.save_changes(lambda: pytest.fail("the dump is not needed"), [make_upsert("cat", "cat", "a cat")])
+
+    with path.with_name(path.name + ".journal").open("a", encoding="utf-8") as journal:
+        journal.write('{"op": "upsert", "__word__": "owl"')
+
+    reopened = JournalStorage(options=JournalStorageOptions(path=path))
+    assert get_rows(reopened.read_dump()) == [("cat", "cat", "a cat")]
+
+    # a record appended after the torn one replaces it
+    reopened.save_changes(lambda: pytest.fail("the dump is not needed"), [make_upsert("dog", "dog", "a pet")])
+    reopened = JournalStorage(options=JournalStorageOptions(path=path))
+    assert get_rows(reopened.read_dump()) == [("cat", "cat", "a cat"), ("dog", "dog", "a pet")]
+
+
+def test_replayed_rows_keep_order_of_creation(tmp_path):
+    path = tmp_path / "words.tsv"
+    storage = JournalStorage(options=JournalStorageOptions(path=path))
+    storage.save_dump(make_frame([("cat", "cat", "a pet"), ("dog", "dog", "a pet")]))
+    storage.save_changes(lambda: pytest.fail("the dump is not needed"), [
+        make_upsert("ab", "ab", "first"),
+        make_upsert("cd", "cd", "second"),
+        make_upsert("ab", "ab", "updated"),
+        make_upsert("cat", "cat", "a cat"),
+        make_delete("dog", "dog"),
+        make_upsert("dog", "dog", "re-added"),
+        make_upsert("ef", "ef", "deleted"),
+        make_delete("ef", "ef"),
+    ])
+
+    # an update keeps the row in place, a re-added row goes last
+    reopened = JournalStorage(options=JournalStorageOptions(path=path))
+    expected = [("cat", "cat", "a cat"), ("ab", "ab", "updated"), ("cd", "cd", "second"), ("dog", "dog", "re-added")]
+    assert get_rows(reopened.read_dump()) == expected
+
+    keys, reader = reopened.read_keys()
+    assert [(word, form, reader.read_description(row)) for row, (word, form) in enumerate(keys.itertuples(index=False))] == expected
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = tmp_path / "words.tsv"
+    storage = JournalStorage(options=JournalStorageOptions(path=path, compaction_threshold=1))
+    storage.save_dump(make_frame([("cat", "cat", "a pet")]))
+
+    state = [("cat", "cat", "a cat")]
+    storage.save_changes(lambda: make_frame(state), [make_upsert("cat", "cat", "a cat")])
+    storage.wait_compaction()
+
+    assert not path.with_name(path.name + ".journal.pending").exists()
+    assert get_rows(CSVStorage(options=CSVStorageOptions(path=path)).read_dump()) == state
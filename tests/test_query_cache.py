@@ -0,0 +1,29 @@
+import pandas as pd
+
+from engine.core import databases
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions
+
+
+def test_exact_and_approximate_results_are_cached_apart(tmp_path):
+    path = tmp_path / "words.tsv"
+    words = ["cat", "cab", "car", "dog", "owl"]
+    CSVStorage(options=CSVStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [(word, word, "") for word in words],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    database = databases.WordsDatabase(
+        storage=CSVStorage(options=CSVStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(
+            words_index=databases.WordsIndexKind.QGRAM,
+            qgram_candidates=1,
+            index_cache=False,
+        ),
+    )
+
+    # the session searches a trie, which is exact
+    assert list(database.open_search_session().get_similar_words("cax", 3)) == ["cat", "cab", "car"]
+
+    # the q-gram index scores one candidate, so it misses words the session has found
+    assert len(list(database.get_similar_words("cax", 3))) == 1
+    assert database.get_query_cache_stats().misses == 2
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from engine.core import databases
+from engine.core.databases.query_server import QueryServer
+from engine.core.databases.remote_database import RemoteWordDatabase
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions
+
+
+def test_pipeline_of_large_frames_is_not_blocked(tmp_path):
+    path = tmp_path / "words.tsv"
+    words = [f"word{i}" for i in range(2000)]
+    CSVStorage(options=CSVStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [(word, word, "") for word in words],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    database = databases.WordsDatabase(
+        storage=CSVStorage(options=CSVStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(index_cache=False),
+    )
+
+    server = QueryServer(database=database, address=tmp_path / "words.sock")
+    server.start()
+    try:
+        # requests and answers of hundreds of kilobytes overfill socket buffers
+        client = RemoteWordDatabase(address=server.address, timeout=10)
+        bases = words * 2
+        results = client.pipeline([("get_similar_words_batch", [bases, 20])] * 4)
+        client.close()
+    finally:
+        server.close()
+
+    assert len(results) == 4
+    assert all(len(result) == len(bases) and result[0][0] == "word0" for result in results)
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+from storage_helpers import get_rows, make_delete, make_frame, make_upsert
+
+from engine.core.databases.storages import (
+    SQLiteStorage,
+    SQLiteStorageOptions,
+    StorageChange,
+    StorageChangeKind,
+)
+
+
+def test_upserts_and_deletes_are_saved_in_one_transaction(tmp_path):
+    path = tmp_path / "words.sqlite"
+    storage = SQLiteStorage(options=SQLiteStorageOptions(path=path))
+    storage.save_dump(make_frame([("cat", "cat", "a pet"), ("dog", "dog", "a pet")]))
+
+    storage.save_changes(make_frame, [
+        make_upsert("cat", "cat", "a cat"),
+        make_upsert("owl", "owl", "a bird"),
+        make_delete("dog", "dog"),
+        make_upsert("dog", "dogs", "pets"),
+        make_delete("owl", "owl"),
+    ])
+    storage.close()
+
+    # an update keeps the row in place, a re-added row goes last
+    reopened = SQLiteStorage(options=SQLiteStorageOptions(path=path))
+    assert get_rows(reopened.read_dump()) == [("cat", "cat", "a cat"), ("dog", "dogs", "pets")]
+    reopened.close()
+
+
+def test_failed_changes_are_rolled_back(tmp_path):
+    path = tmp_path / "words.sqlite"
+    storage = SQLiteStorage(options=SQLiteStorageOptions(path=path))
+    storage.save_dump(make_frame([("cat", "cat", "a pet"), ("dog", "dog", "a pet")]))
+
+    # the last change violates the NOT NULL constraint of descriptions
+    broken = StorageChange(kind=StorageChangeKind.UPSERT, word="owl", form="owl", description=None)  # type: ignore[arg-type]
+    with pytest.raises(sqlite3.IntegrityError):
+        storage.save_changes(make_frame, [make_upsert("cat", "cat", "a cat"), make_delete("dog", "dog"), broken])
+
+    assert get_rows(storage.read_dump()) == [("cat", "cat", "a pet"), ("dog", "dog", "a pet")]
+
+    # the connection is usable after the rollback
+    storage.save_changes(make_frame, [make_delete("dog", "dog")])
+    assert get_rows(storage.read_dump()) == [("cat", "cat", "a pet")]
+    storage.close()
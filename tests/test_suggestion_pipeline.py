@@ -0,0 +1,77 @@
+import asyncio
+import logging
+
+import pandas as pd
+import pytest
+
+from engine.core import databases
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+from engine.core.system import BUS
+from engine.views.notebook_io_impl.suggestion_pipeline import SuggestionPipeline, SuggestionQueryChanged
+
+
+# the BUS is bound to the event loop it is used in first
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_closed_pipeline_leaves_the_bus(loop, caplog):
+    shown: list[list[str]] = []
+
+    async def run() -> None:
+        pipeline = SuggestionPipeline(device_id="pipeline-test", debounce=0, sink=shown.append)
+        pipeline.submit(lambda: ["cat"])
+        await asyncio.sleep(0.1)
+
+        pipeline.close()
+        await asyncio.sleep(0.1)
+
+        # neither a new query nor a message sent to the device reaches the sink
+        pipeline.submit(lambda: ["dog"])
+        with caplog.at_level(logging.WARNING):
+            await BUS.send_message("pipeline-test", SuggestionPipeline.EVENT_TYPE, SuggestionQueryChanged(
+                generation=0,
+                search=lambda: ["owl"],
+            ))
+
+    loop.run_until_complete(run())
+
+    assert shown == [["cat"]]
+    assert "device_id was not found" in caplog.text
+
+
+def test_last_query_is_searched_again_once_changes_are_committed(loop, tmp_path):
+    path = tmp_path / "words.tsv"
+    CSVStorage(options=CSVStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [("cat", "cat", "a pet")],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    database = databases.WordsDatabase(
+        storage=CSVStorage(options=CSVStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(index_cache=False, events_device_id="database-test"),
+    )
+    shown: list[list[str]] = []
+
+    async def run() -> None:
+        pipeline = SuggestionPipeline(
+            device_id="refresh-test", debounce=0, sink=shown.append,
+            changes_device_id=database.get_events_device_id(),
+        )
+        pipeline.submit(lambda: list(database.get_similar_words("ca", 2)))
+        await asyncio.sleep(0.1)
+
+        # another form of the database adds a word
+        database.update_word_form(WordFormInfo(word="cab", form="cab", description="a car"))
+        await asyncio.sleep(0.1)
+
+        pipeline.close()
+        await asyncio.sleep(0.1)
+
+    loop.run_until_complete(run())
+
+    assert shown == [["cat"], ["cat", "cab"]]
@@ -0,0 +1,101 @@
+import random
+
+import pandas as pd
+import pytest
+
+from engine.core import databases
+from engine.core.databases.indexes import weighted_distance
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions, JournalStorage, JournalStorageOptions
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+FIELDS = databases.WordsDatabase.Fields
+
+
+class _FrameModel:
+    """ Rows kept as the original frame-based database kept them: words are ranked by their first rows.
+    """
+
+    def __init__(self, rows: list[tuple[str, str, str]]) -> None:
+        self.rows = list(rows)
+
+    def update(self, word: str, form: str, description: str) -> None:
+        for at, (row_word, row_form, _) in enumerate(self.rows):
+            if (row_word, row_form) == (word, form):
+                self.rows[at] = (word, form, description)
+                return
+
+        self.rows.append((word, form, description))
+
+    def delete(self, word: str, form: str) -> None:
+        self.rows = [row for row in self.rows if row[:2] != (word, form)]
+
+    def get_similar_words(self, base: str, count: int) -> list[str]:
+        words = list(dict.fromkeys(word for word, _, _ in self.rows))
+        ranked = sorted((weighted_distance(base, word), at, word) for at, word in enumerate(words))
+        return [word for *_, word in ranked[:count]]
+
+    def get_similar_forms(self, word: str, base: str, count: int) -> list[str]:
+        forms = [form for row_word, form, _ in self.rows if row_word == word]
+        ranked = sorted((weighted_distance(base, form), at, form) for at, form in enumerate(forms))
+        return [form for *_, form in ranked[:count]]
+
+
+def _open_storage(storage: str, path) -> databases.storages.StorageBase:
+    if storage == "journal":
+        return JournalStorage(options=JournalStorageOptions(path=path))
+
+    return CSVStorage(options=CSVStorageOptions(path=path))
+
+
+@pytest.mark.parametrize("storage", ["csv", "journal"])
+@pytest.mark.parametrize("words_index", ["scan", "bk-tree", "length-buckets"])
+@pytest.mark.parametrize("index_cache", [False, True])
+def test_ties_follow_row_order_after_deletes_and_re_adds(tmp_path, storage, words_index, index_cache):
+    draws = random.Random(1)
+    words = sorted({"".join(draws.choices("abc", k=draws.randint(2, 4))) for _ in range(60)})
+    rows = [(word, word + suffix, "") for word in words for suffix in draws.sample(["", "x", "y"], draws.randint(1, 3))]
+    draws.shuffle(rows)
+
+    path = tmp_path / "words.tsv"
+    _open_storage(storage, path).save_dump(
+        pd.DataFrame(rows, columns=[FIELDS.WORD, FIELDS.FORM, FIELDS.DESCRIPTION])
+    )
+
+    def open_database() -> databases.WordsDatabase:
+        return databases.WordsDatabase(
+            storage=_open_storage(storage, path),
+            options=databases.WordsDatabaseOptions(
+                words_index=databases.WordsIndexKind(words_index),
+                index_cache=index_cache,
+            ),
+        )
+
+    if index_cache:
+        open_database().open_search_session()  # saves the cache with the trie
+
+    database = open_database()
+    session = database.open_search_session()
+    model = _FrameModel(rows)
+    for _ in range(200):
+        word = draws.choice(words)
+        form = word + draws.choice(["", "x", "y"])
+        if draws.random() < 0.5:
+            database.delete_word_form(word, form)
+            model.delete(word, form)
+        else:
+            database.update_word_form(WordFormInfo(word=word, form=form, description="changed"))
+            model.update(word, form, "changed")
+
+        base = "".join(draws.choices("abc", k=draws.randint(1, 4)))
+        assert list(database.get_similar_words(base, 7)) == model.get_similar_words(base, 7)
+        assert list(session.get_similar_words(base + "c", 7)) == model.get_similar_words(base + "c", 7)
+        assert list(database.get_similar_forms(word, base, 3)) == model.get_similar_forms(word, base, 3)
+
+    # a reopened database ranks ties as the live one did
+    database = open_database()
+    session = database.open_search_session()
+    for base in ["a", "ab", "ba", "cab", "abca"]:
+        assert list(database.get_similar_words(base, 7)) == model.get_similar_words(base, 7)
+        assert list(session.get_similar_words(base, 7)) == model.get_similar_words(base, 7)
+        for word in words[:10]:
+            assert list(database.get_similar_forms(word, base, 3)) == model.get_similar_forms(word, base, 3)
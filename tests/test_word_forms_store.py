@@ -0,0 +1,84 @@
+import pandas as pd
+
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.word_forms_store import WordFormsStore
+
+
+def _store(rows: list[tuple[str, str, str]]) -> WordFormsStore:
+    return WordFormsStore.from_frame(pd.DataFrame(rows, columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION]))
+
+
+def _rows(store: WordFormsStore) -> list[tuple[str, str, str]]:
+    return [tuple(row) for row in store.to_frame().itertuples(index=False)]
+
+
+def test_find_append_and_delete():
+    store = _store([("cat", "cat", "a pet"), ("cat", "cats", "pets"), ("dog", "dog", "a pet")])
+    assert store.find("cat", "cats") == 1
+    assert store.find("cat", "dog") == -1
+    assert store.find("owl", "owl") == -1
+
+    row = store.append("owl", "owl", "a bird")
+    assert store.find("owl", "owl") == row == 3
+    assert store.get_description(row) == "a bird"
+
+    # a deleted row stays as a tombstone, so rows keep their numbers
+    assert store.delete(1) == "pets"
+    assert store.find("cat", "cats") == -1
+    assert store.find("dog", "dog") == 2
+    assert (len(store), store.size) == (3, 4)
+
+    # a form deleted and added again gets a new row
+    row = store.append("cat", "cats", "more pets")
+    assert store.find("cat", "cats") == row == 4
+    assert _rows(store) == [("cat", "cat", "a pet"), ("dog", "dog", "a pet"), ("owl", "owl", "a bird"), ("cat", "cats", "more pets")]
+
+
+def test_delete_is_undone_by_restore_and_truncate():
+    store = _store([("cat", "cat", "a pet"), ("dog", "dog", "a pet")])
+    size = store.size
+
+    description = store.delete(0)
+    store.append("owl", "owl", "a bird")
+    store.truncate(size)
+    store.restore(0, description)
+
+    assert store.find("cat", "cat") == 0
+    assert store.find("owl", "owl") == -1
+    assert _rows(store) == [("cat", "cat", "a pet"), ("dog", "dog", "a pet")]
+
+
+def test_compaction_drops_tombstones_and_keeps_ordinals():
+    store = _store([(f"w{i}", f"f{i}", f"d{i}") for i in range(6)])
+    for row in range(4):
+        store.delete(row)
+    row = store.append("w0", "f0", "again")
+    ordinal = store.get_ordinal(row)
+
+    store.compact()
+    assert (len(store), store.size) == (3, 3)
+    assert [store.find(f"w{i}", f"f{i}") for i in range(6)] == [2, -1, -1, -1, 0, 1]
+    assert store.get_ordinal(2) == ordinal
+    assert store.get_ordinal(0) < store.get_ordinal(1) < ordinal
+
+    # ordinals are never reused after a compaction
+    assert store.get_ordinal(store.append("w1", "f1", "new")) > ordinal
+
+
+def test_rows_are_found_after_many_changes():
+    store = _store([(f"w{i % 7}", f"f{i}", "") for i in range(100)])
+    expected = {(f"w{i % 7}", f"f{i}"): i for i in range(100)}
+
+    # the rows table is rebuilt both by growth and by removed slots
+    for i in range(100, 1100):
+        expected[f"w{i % 7}", f"f{i}"] = store.append(f"w{i % 7}", f"f{i}", "")
+    for i in range(0, 1100, 3):
+        store.delete(expected.pop((f"w{i % 7}", f"f{i}")))
+    size = store.size
+    for i in range(0, 1100, 3):
+        store.append(f"w{i % 7}", f"g{i}", "")
+    store.truncate(size)
+
+    assert all(store.find(word, form) == row for (word, form), row in expected.items())
+    assert all(store.find(f"w{i % 7}", f"f{i}") == -1 for i in range(0, 1100, 3))
+    assert all(store.find(f"w{i % 7}", f"g{i}") == -1 for i in range(0, 1100, 3))
@@ -0,0 +1,58 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from engine.core import databases
+from engine.core.databases import database as database_module
+from engine.core.databases.storage_base import DumpFields
+from engine.core.databases.storages import CSVStorage, CSVStorageOptions
+from engine.core.protocols.words_databse_protocol import WordFormInfo
+
+_GROUP = 10
+_COMMITS = 60
+
+
+def _group(generation: int) -> list[str]:
+    return [f"g{generation}_{i}" for i in range(_GROUP)]
+
+
+@pytest.mark.parametrize("words_index", ["scan", "bk-tree", "length-buckets", "q-gram"])
+def test_reader_sees_consistent_snapshots_while_writer_commits(tmp_path, monkeypatch, words_index):
+    # the index is rebuilt every few commits, so readers see both rebuilt and delta snapshots
+    monkeypatch.setattr(database_module, "_MIN_INDEX_DELTA", 3 * _GROUP)
+
+    path = tmp_path / "words.tsv"
+    fillers = [f"filler{i}xxxxxxxxxxxx" for i in range(50)]
+    CSVStorage(options=CSVStorageOptions(path=path)).save_dump(pd.DataFrame(
+        [(word, word, "") for word in fillers + _group(0)],
+        columns=[DumpFields.WORD, DumpFields.FORM, DumpFields.DESCRIPTION],
+    ))
+    database = databases.WordsDatabase(
+        storage=CSVStorage(options=CSVStorageOptions(path=path)),
+        options=databases.WordsDatabaseOptions(
+            words_index=databases.WordsIndexKind(words_index),
+            index_cache=False,
+            query_cache_size=0,
+        ),
+    )
+
+    # every commit replaces the group of words by the next generation at once
+    def write() -> None:
+        for generation in range(1, _COMMITS + 1):
+            with database.batch():
+                database.delete_word_forms((word, word) for word in _group(generation - 1))
+                database.update_word_forms(WordFormInfo(word=word, form=word, description="") for word in _group(generation))
+
+    seen: set[int] = set()
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive() or len(seen) == 0:
+        # fillers are much farther from the query than any word of a group
+        found = list(database.get_similar_words("g", _GROUP))
+        generations = {int(word[1:word.index("_")]) for word in found}
+        assert len(generations) == 1 and sorted(found) == sorted(_group(*generations)), found
+        seen |= generations
+    writer.join()
+
+    assert sorted(database.get_similar_words("g", _GROUP)) == sorted(_group(_COMMITS))